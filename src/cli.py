@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""latex2astro: headless command line entry point.
+
+Only the standard library is imported at startup; the conversion core is
+imported inside each command so `latex2astro --help` and argument errors
+return immediately and no GUI toolkit is ever loaded.
+
+Usage:
+    python src/cli.py convert path/to/main.tex -o path/to/site
+    python src/cli.py analyze path/to/main.tex --json
+    python src/cli.py plan path/to/main.tex -o path/to/site --check
+    python src/cli.py clean -o path/to/site
+    python src/cli.py library path/to/books -o path/to/site --workers 8
+    python src/cli.py watch path/to/main.tex -o path/to/site
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Make the sibling packages (core, models, utils) importable when run as a script
+SRC_DIR = Path(__file__).resolve().parent
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+EXIT_OK = 0
+EXIT_FAILURE = 1     # Conversion or I/O error
+EXIT_USAGE = 2       # Bad arguments, missing input or invalid metadata file
+EXIT_CHANGES = 3     # `plan --check` found pending changes
+EXIT_INTERRUPTED = 130
+
+METADATA_FIELDS = ("title", "author", "description", "lang", "type", "slug", "publish_date",
+                   "updated_date", "draft", "categories", "tags", "cover_image", "pdf_url", "order")
+
+class UsageError(Exception):
+    """Raised for user errors that should exit with EXIT_USAGE."""
+
+def _load_metadata_file(path: Path) -> dict:
+    try:
+        import yaml
+    except ImportError:
+        raise UsageError("PyYAML is required for --metadata (pip install pyyaml)")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError) as e:
+        raise UsageError(f"Cannot read metadata file {path}: {e}")
+    if not isinstance(data, dict):
+        raise UsageError(f"Metadata file {path} must contain a mapping")
+    unknown = sorted(set(data) - set(METADATA_FIELDS))
+    if unknown:
+        raise UsageError(f"Unknown metadata field(s) in {path}: {', '.join(unknown)}")
+    return data
+
+def _metadata_overrides(args: argparse.Namespace) -> dict:
+    """Merges the metadata file (if any) with flags; flags win."""
+    overrides = _load_metadata_file(Path(args.metadata)) if args.metadata else {}
+    for name in ("title", "author", "description", "lang", "type", "slug", "publish_date", "order"):
+        value = getattr(args, name, None)
+        if value is not None:
+            overrides[name] = value
+    if args.tags is not None:
+        overrides["tags"] = [t.strip() for t in args.tags.split(",") if t.strip()]
+    if args.draft is not None:
+        overrides["draft"] = args.draft
+    return overrides
+
+def _apply_metadata(book, overrides: dict):
+    for key, value in overrides.items():
+        if key in ("tags", "categories") and isinstance(value, str):
+            value = [t.strip() for t in value.split(",") if t.strip()]
+        setattr(book.metadata, key, value)
+
+def _require_file(path: str) -> Path:
+    main_tex = Path(path)
+    if not main_tex.is_file():
+        raise UsageError(f"Input file not found: {main_tex}")
+    return main_tex
+
+def _progress_callback(args: argparse.Namespace):
+    """Prints warnings, and chapter progress with --progress, to stderr."""
+    show_chapters = getattr(args, "progress", False)
+
+    def report(event):
+        if event.kind == "warning":
+            print(f"warning: {event.message}", file=sys.stderr)
+        elif event.kind == "chapter_converted" and show_chapters:
+            print(f"[{event.current}/{event.total}] {event.message}", file=sys.stderr)
+    return report
+
+def _transliterator(args: argparse.Namespace):
+    if not args.ascii_slugs:
+        return None
+    from utils.transliterate import Transliterator
+    return Transliterator()
+
+def _prepare(args: argparse.Namespace, token=None):
+    """Parses the project, applies metadata overrides and returns an orchestrator."""
+    main_tex = _require_file(args.main_tex)
+    overrides = _metadata_overrides(args)
+
+    from core.orchestrator import ConversionOrchestrator
+    orchestrator = ConversionOrchestrator(main_tex, Path(args.output), prune=args.prune,
+                                          progress=_progress_callback(args), token=token,
+                                          resume=getattr(args, "resume", True),
+                                          transliterator=_transliterator(args), normalize=args.normalize,
+                                          split_size=args.split_size)
+    orchestrator.parse()
+    _apply_metadata(orchestrator.book, overrides)
+    return orchestrator
+
+def cmd_convert(args: argparse.Namespace) -> int:
+    from core.progress import CancellationToken, ConversionCancelled
+    orchestrator = _prepare(args, CancellationToken())
+    try:
+        orchestrator.run()
+    except ConversionCancelled:
+        return EXIT_INTERRUPTED
+
+    stats = orchestrator.writer.stats
+    if orchestrator.resumed:
+        print("Resumed an interrupted run")
+    print(f"Converted '{orchestrator.book.metadata.title}' -> {orchestrator.content_dir}")
+    print(f"  files written: {stats['written']}, unchanged: {stats['skipped']}, pruned: {len(orchestrator.pruned)}")
+    if args.normalize:
+        print(f"  normalized: {orchestrator.normalized} character(s)")
+    if args.verbose:
+        for stage, seconds in orchestrator.timings.items():
+            print(f"  {stage:<10} {seconds:.3f}s")
+        print("  critical path: " + " -> ".join(f"{name} ({seconds:.3f}s)" for name, seconds in orchestrator.critical_path))
+    return EXIT_OK
+
+def cmd_analyze(args: argparse.Namespace) -> int:
+    main_tex = _require_file(args.main_tex)
+    from core.parser import LatexParser
+    book = LatexParser(main_tex).parse()
+
+    if args.json:
+        print(json.dumps({
+            "title": book.metadata.title,
+            "author": book.metadata.author,
+            "description": book.metadata.description,
+            "tags": book.metadata.tags,
+            "chapters": [ch.title for ch in book.chapters],
+            "appendices": [app.title for app in book.appendices],
+            "labels": len(book.label_registry),
+            "sources": sorted(book.source_files),
+        }, ensure_ascii=False, indent=2))
+    else:
+        print(f"Title: {book.metadata.title}")
+        print(f"Author: {book.metadata.author}")
+        print(f"Chapters: {len(book.chapters)}")
+        for i, ch in enumerate(book.chapters, start=1):
+            print(f"  {i:2d}. {ch.title}")
+        if book.appendices:
+            print(f"Appendices: {len(book.appendices)}")
+            for app in book.appendices:
+                print(f"  {chr(64 + app.number)}. {app.title}")
+        print(f"Labels: {len(book.label_registry)}")
+        print(f"Source files: {len(book.source_files)}")
+    return EXIT_OK
+
+def cmd_plan(args: argparse.Namespace) -> int:
+    orchestrator = _prepare(args)
+    changes = orchestrator.plan_changes()
+
+    pending = 0
+    for change in changes:
+        pending += change["status"] != "unchanged"
+        if change["status"] != "unchanged" or args.verbose:
+            print(f"{change['status']:<9} {change['type']:<9} {change['target']}")
+    print(f"{pending} change(s), {len(changes) - pending} file(s) unchanged")
+
+    if args.check and pending:
+        return EXIT_CHANGES
+    return EXIT_OK
+
+def cmd_clean(args: argparse.Namespace) -> int:
+    output_root = Path(args.output)
+    from core.manifest import ManifestGenerator
+    from core.cache import cache_dir
+    from core.writer import remove_empty_dirs
+
+    # One manifest per book under manifests/, plus the shared manifest.json of older versions
+    manifests = output_root / "manifests"
+    paths = [output_root / "manifest.json", *(sorted(manifests.rglob("*.json")) if manifests.is_dir() else [])]
+    removed = 0
+    root = output_root.resolve()
+    for manifest_path in paths:
+        manifest = ManifestGenerator(output_root, manifest_path)
+        for target in manifest.previous:
+            path = output_root / target
+            if root in path.resolve().parents and path.is_file():
+                path.unlink()
+                removed += 1
+                remove_empty_dirs(path.parent, output_root)
+        if manifest_path.exists():
+            manifest_path.unlink()
+            remove_empty_dirs(manifest_path.parent, output_root)
+    if not args.keep_cache and cache_dir(output_root).exists():
+        import shutil
+        shutil.rmtree(cache_dir(output_root))
+    print(f"Removed {removed} generated file(s) from {output_root}")
+    return EXIT_OK
+
+def cmd_library(args: argparse.Namespace) -> int:
+    from core.library import LibraryRunner
+
+    projects = []
+    for path in args.projects:
+        found = LibraryRunner.discover(Path(path))
+        if not found:
+            raise UsageError(f"No main.tex found under {path}")
+        projects.extend(found)
+
+    from core.progress import CancellationToken, ConversionCancelled
+    runner = LibraryRunner(projects, Path(args.output), workers=args.workers, prune=args.prune,
+                           progress=_progress_callback(args), token=CancellationToken(), resume=args.resume,
+                           ascii_slugs=args.ascii_slugs, normalize=args.normalize, split_size=args.split_size)
+    try:
+        results = runner.run()
+    except ConversionCancelled:
+        return EXIT_INTERRUPTED
+    for result in results:
+        if result.status == "ok":
+            print(f"ok      {result.slug:<30} {result.chapters:3d} chapters, {result.written} written, "
+                  f"{result.skipped} unchanged ({result.duration:.2f}s)")
+        else:
+            print(f"failed  {result.project}: {result.error}")
+    print(f"{len(results) - len(runner.failed)}/{len(results)} books converted")
+    return EXIT_FAILURE if runner.failed else EXIT_OK
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    main_tex = _require_file(args.main_tex)
+    overrides = _metadata_overrides(args)
+    from core.watch import WatchSession
+
+    def report(chapters, seconds):
+        names = ", ".join(ch.filename for ch in chapters) or "no chapters"
+        print(f"Rebuilt {names} in {seconds:.2f}s")
+
+    session = WatchSession(main_tex, Path(args.output), interval=args.interval, debounce=args.debounce,
+                           configure=lambda book: _apply_metadata(book, overrides), on_rebuild=report,
+                           prune=args.prune, transliterator=_transliterator(args), normalize=args.normalize,
+                           split_size=args.split_size, progress=_progress_callback(args))
+    print(f"Watching {main_tex.parent} (Ctrl+C to stop)")
+    try:
+        session.run()
+    except KeyboardInterrupt:
+        session.stop()
+    return EXIT_OK
+
+def _add_conversion_args(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("conversion options")
+    group.add_argument("--ascii-slugs", action="store_true",
+                       help="Transliterate Persian titles into ASCII slugs for books and chapters")
+    group.add_argument("--normalize", action="store_true",
+                       help="Normalize Arabic ye/kaf/digits and ZWNJ usage in the Persian text before converting")
+    group.add_argument("--split-size", type=int, default=0, metavar="BYTES",
+                       help="Split chapters with more LaTeX than this into one page per \\section (default: never)")
+
+def _add_metadata_args(parser: argparse.ArgumentParser):
+    group = parser.add_argument_group("metadata overrides")
+    group.add_argument("--metadata", metavar="FILE", help="YAML file with metadata fields (title, slug, tags, ...)")
+    group.add_argument("--title")
+    group.add_argument("--author")
+    group.add_argument("--description")
+    group.add_argument("--lang", choices=["fa", "en"])
+    group.add_argument("--type", choices=["Book", "Article", "Markdown"])
+    group.add_argument("--slug", help="English slug used for the output folder")
+    group.add_argument("--publish-date", dest="publish_date", metavar="YYYY-MM-DD")
+    group.add_argument("--order", type=int)
+    group.add_argument("--tags", help="Comma separated list of tags")
+    group.add_argument("--draft", dest="draft", action="store_true", default=None)
+    group.add_argument("--publish", dest="draft", action="store_false", help="Mark the book as not draft")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="latex2astro", description="Convert LaTeX books to Astro markdown.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    convert = sub.add_parser("convert", help="Convert a LaTeX project into the output tree")
+    convert.add_argument("main_tex")
+    convert.add_argument("-o", "--output", default="output", help="Output (site) root, default: ./output")
+    convert.add_argument("--prune", choices=["delete", "trash", "off"], default="delete",
+                         help="What to do with outputs of the previous run that are no longer produced")
+    convert.add_argument("-v", "--verbose", action="store_true")
+    convert.add_argument("--progress", action="store_true", help="Print chapter progress to stderr")
+    convert.add_argument("--no-resume", dest="resume", action="store_false",
+                         help="Ignore the journal of an interrupted run and redo everything")
+    _add_conversion_args(convert)
+    _add_metadata_args(convert)
+    convert.set_defaults(func=cmd_convert)
+
+    analyze = sub.add_parser("analyze", help="Parse a project and print its structure")
+    analyze.add_argument("main_tex")
+    analyze.add_argument("--json", action="store_true", help="Print machine readable JSON")
+    analyze.set_defaults(func=cmd_analyze)
+
+    plan = sub.add_parser("plan", help="Dry run: list the files a conversion would create, update or delete")
+    plan.add_argument("main_tex")
+    plan.add_argument("-o", "--output", default="output")
+    plan.add_argument("--prune", choices=["delete", "trash", "off"], default="delete")
+    plan.add_argument("--check", action="store_true", help=f"Exit with {EXIT_CHANGES} if anything would change")
+    plan.add_argument("-v", "--verbose", action="store_true", help="Also list unchanged files")
+    _add_conversion_args(plan)
+    _add_metadata_args(plan)
+    plan.set_defaults(func=cmd_plan)
+
+    library = sub.add_parser("library", help="Convert many books in one process with a shared worker pool")
+    library.add_argument("projects", nargs="+", help="Library directories (one main.tex per sub directory) or main.tex files")
+    library.add_argument("-o", "--output", default="output")
+    library.add_argument("-j", "--workers", type=int, default=None, help="Worker threads (default: CPU count)")
+    library.add_argument("--prune", choices=["delete", "trash", "off"], default="delete")
+    library.add_argument("--progress", action="store_true", help="Print chapter progress to stderr")
+    library.add_argument("--no-resume", dest="resume", action="store_false",
+                         help="Ignore the journals of interrupted runs and redo everything")
+    _add_conversion_args(library)
+    library.set_defaults(func=cmd_library)
+
+    watch = sub.add_parser("watch", help="Convert once, then re-convert changed chapters on every save")
+    watch.add_argument("main_tex")
+    watch.add_argument("-o", "--output", default="output")
+    watch.add_argument("--prune", choices=["delete", "trash", "off"], default="delete")
+    watch.add_argument("--interval", type=float, default=0.2, help="Polling interval in seconds")
+    watch.add_argument("--debounce", type=float, default=0.3, help="Quiet period before rebuilding, in seconds")
+    _add_conversion_args(watch)
+    _add_metadata_args(watch)
+    watch.set_defaults(func=cmd_watch)
+
+    clean = sub.add_parser("clean", help="Remove every file recorded in the output manifests")
+    clean.add_argument("-o", "--output", default="output")
+    clean.add_argument("--keep-cache", action="store_true", help="Keep the .latex2astro cache directory")
+    clean.set_defaults(func=cmd_clean)
+    return parser
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except UsageError as e:
+        print(f"latex2astro: error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        print(f"latex2astro: conversion failed: {e}", file=sys.stderr)
+        return EXIT_FAILURE
+
+if __name__ == "__main__":
+    # Set UTF-8 encoding for stdout to handle Persian titles in the terminal
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(encoding='utf-8')
+    sys.exit(main())
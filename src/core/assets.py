@@ -0,0 +1,110 @@
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from utils.hashing import hash_file
+
+# ioctl request number for FICLONE (copy-on-write clone) on Linux.
+FICLONE = 0x40049409
+
+class AssetCopier:
+    """Copies binary assets (images, PDFs) into the output tree.
+
+    Files whose size, mtime and hash match the previous manifest are skipped.
+    When source and output live on the same filesystem a reflink or hardlink
+    is attempted before falling back to a byte copy.
+    """
+
+    def __init__(self, output_root: Path, previous: Optional[Dict[str, Dict[str, Any]]] = None,
+                 allow_links: bool = True):
+        self.output_root = output_root
+        self.previous = previous or {}
+        self.allow_links = allow_links
+        self.stats = {"skipped": 0, "reflinked": 0, "hardlinked": 0, "copied": 0}
+        self.lock = threading.Lock()  # Pipeline stages copy assets from worker threads
+
+    def copy(self, source: Path, target: Path) -> Dict[str, Any]:
+        """Brings target up to date with source and returns its fingerprint record."""
+        key = target.relative_to(self.output_root).as_posix()
+        st = source.stat()
+        prev = self.previous.get(key)
+
+        if prev and target.exists() and prev.get("size") == st.st_size == target.stat().st_size:
+            if prev.get("mtime_ns") == st.st_mtime_ns:
+                self._count("skipped")
+                return self._record(st, prev.get("hash", ""))
+            file_hash = hash_file(source)
+            if file_hash == prev.get("hash"):
+                self._count("skipped")
+                return self._record(st, file_hash)
+        else:
+            file_hash = hash_file(source)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        self._count(self._transfer(source, target))
+        return self._record(st, file_hash)
+
+    def _count(self, method: str):
+        with self.lock:
+            self.stats[method] += 1
+
+    def is_current(self, source: Path, target: Path) -> bool:
+        """True if copy() would skip target, decided without copying anything."""
+        prev = self.previous.get(target.relative_to(self.output_root).as_posix())
+        st = source.stat()
+        if not (prev and target.exists() and prev.get("size") == st.st_size == target.stat().st_size):
+            return False
+        return prev.get("mtime_ns") == st.st_mtime_ns or hash_file(source) == prev.get("hash")
+
+    def _record(self, st: os.stat_result, file_hash: str) -> Dict[str, Any]:
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": file_hash}
+
+    def _transfer(self, source: Path, target: Path) -> str:
+        """Places source at target via reflink, hardlink or copy. Returns the method used."""
+        tmp_path = target.with_name(target.name + ".tmp")
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+        method = "copied"
+        if self.allow_links and self._same_filesystem(source, target):
+            if self._reflink(source, tmp_path):
+                method = "reflinked"
+            else:
+                try:
+                    os.link(source, tmp_path)
+                    method = "hardlinked"
+                except OSError:
+                    pass
+
+        if method == "copied":
+            shutil.copy2(source, tmp_path)
+
+        os.replace(tmp_path, target)
+        return method
+
+    @staticmethod
+    def _same_filesystem(source: Path, target: Path) -> bool:
+        try:
+            return source.stat().st_dev == target.parent.stat().st_dev
+        except OSError:
+            return False
+
+    @staticmethod
+    def _reflink(source: Path, target: Path) -> bool:
+        """Attempts a copy-on-write clone. Only supported on Linux (btrfs, xfs, ...)."""
+        try:
+            import fcntl
+        except ImportError:
+            return False
+
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            if target.exists():
+                target.unlink()
+            return False
+
+        shutil.copystat(source, target)
+        return True
@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CACHE_DIR_NAME = ".latex2astro"
+
+def cache_dir(output_root: Path) -> Path:
+    """Returns the directory that holds the converter's caches for an output root."""
+    return output_root / CACHE_DIR_NAME
+
+def make_dirs(directory: Path):
+    """Creates a directory (and its parents) to write cache files into.
+
+    A cache directory gets a .gitignore of '*' the first time something is
+    written to it: the output root is usually the site's git repository, and
+    publishing it (git add -A) must leave caches, journals and trash out.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for parent in (directory, *directory.parents):
+        if parent.name == CACHE_DIR_NAME:
+            ignore = parent / ".gitignore"
+            if not ignore.exists():
+                ignore.write_text("*\n", encoding="utf-8")
+            break
+
+class JsonCache:
+    """A small key/value cache persisted as a single JSON file. Safe to share between threads."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Any] = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.entries.get(key)
+
+    def set(self, key: str, value: Any):
+        with self.lock:
+            if self.entries.get(key) != value:
+                self.entries[key] = value
+                self.dirty = True
+
+    def save(self):
+        """Writes the cache back to disk if anything changed."""
+        with self.lock:
+            if not self.dirty:
+                return
+            make_dirs(self.path.parent)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+class ConversionCache:
+    """Stores converted markdown keyed by a hash of the LaTeX input.
+
+    Each entry is its own JSON file under <root>/<aa>/<hash>.json, so the cache
+    can be shared by several books and written from worker threads.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any]):
+        path = self._path(key)
+        make_dirs(path.parent)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
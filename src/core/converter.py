@@ -1,38 +1,119 @@
 import re
-import pypandoc
-from typing import List, Dict, Optional
+import subprocess
+import time
+from typing import List, Dict, Optional, Tuple
 from models.book import Book, Chapter, LabelInfo, BookMetadata
+from utils.hashing import hash_text
 from utils.slugify import slugify
+from core.cache import ConversionCache
+from core.progress import CancellationToken, ConversionCancelled
+
+# Bump when the conversion output changes, to invalidate cached conversions
+CONVERTER_VERSION = "1"
+
+_pandoc_version: Optional[str] = None
+
+def pandoc_version() -> str:
+    """Returns the installed pandoc version, or "" if pandoc is unavailable. Checked once per process."""
+    global _pandoc_version
+    if _pandoc_version is None:
+        try:
+            # pypandoc is only needed once something is converted: keep it out of startup
+            import pypandoc
+            _pandoc_version = pypandoc.get_pandoc_version()
+        except Exception:
+            _pandoc_version = ""
+    return _pandoc_version
 
 class MarkdownConverter:
-    def __init__(self, book: Book):
+    def __init__(self, book: Book, cache: Optional[ConversionCache] = None,
+                 token: Optional[CancellationToken] = None, pandoc: Optional[str] = None):
         self.book = book
         self.label_registry = book.label_registry
+        self.cache = cache
+        self.token = token
+        self.pandoc = pandoc  # Pandoc version for cache keys; None asks the installed pandoc
 
-    def convert_all(self):
-        """Converts all chapters and appendices in the book."""
-        for chapter in self.book.chapters:
-            chapter.content_markdown = self.convert_latex_to_markdown(chapter.content_latex)
-            chapter.description = self._generate_description(chapter.content_markdown)
-        
-        for appendix in self.book.appendices:
-            appendix.content_markdown = self.convert_latex_to_markdown(appendix.content_latex)
-            appendix.description = self._generate_description(appendix.content_markdown)
+    def convert_chapter(self, chapter: Chapter, cached_only: bool = False) -> bool:
+        """Converts a single chapter, recording the engine used and the time taken.
+
+        With cached_only, pandoc is never run: the chapter is filled from the
+        conversion cache, and False is returned when it is not cached.
+        """
+        if self.token:
+            self.token.check()
+        if not chapter.content_latex and chapter.content_markdown:
+            # Markdown documents arrive already converted
+            return True
+        start = time.perf_counter()
+        if cached_only:
+            entry = self.cache.get(self.cache_key(chapter.content_latex)) if self.cache else None
+            if entry is None:
+                return False
+            markdown, chapter.engine = entry["markdown"], entry["engine"]
+        else:
+            markdown, chapter.engine = self.convert_cached(chapter.content_latex)
+        chapter.content_markdown = self._resolve_references(markdown, chapter)
+        chapter.description = self._generate_description(chapter.content_markdown)
+        chapter.conversion_time = round(time.perf_counter() - start, 4)
+        return True
 
     def convert_latex_to_markdown(self, latex_content: str) -> str:
         """Primary conversion using Pandoc with a regex-based fallback."""
+        markdown, _ = self.convert_cached(latex_content)
+        # Post-processing: Resolve references
+        return self._resolve_references(markdown)
+
+    def cache_key(self, latex_content: str) -> str:
+        """Cache key covering the converter version, the pandoc version and the LaTeX source."""
+        pandoc = self.pandoc if self.pandoc is not None else pandoc_version()
+        return hash_text(f"{CONVERTER_VERSION}\0{pandoc}\0{latex_content}")
+
+    def convert_cached(self, latex_content: str) -> Tuple[str, str]:
+        """Converts LaTeX to markdown (references unresolved), consulting the conversion cache."""
+        if self.cache is None:
+            return self._convert(latex_content)
+        key = self.cache_key(latex_content)
+        entry = self.cache.get(key)
+        if entry:
+            return entry["markdown"], entry["engine"]
+        markdown, engine = self._convert(latex_content)
+        self.cache.set(key, {"markdown": markdown, "engine": engine})
+        return markdown, engine
+
+    def _convert(self, latex_content: str) -> Tuple[str, str]:
+        """Converts LaTeX to markdown. Returns the markdown and the engine used."""
         try:
             # Check if pandoc is installed
-            pypandoc.get_pandoc_version()
-            markdown = pypandoc.convert_text(latex_content, 'markdown', format='latex', extra_args=['--wrap=none'])
+            if not pandoc_version():
+                raise OSError("pandoc not found")
+            markdown = self._run_pandoc(latex_content)
+            engine = "pandoc"
+        except ConversionCancelled:
+            raise
         except Exception as e:
             # Fallback to basic regex-based conversion
             markdown = self._fallback_convert(latex_content)
+            engine = "fallback"
         
-        # Post-processing: Resolve references
-        markdown = self._resolve_references(markdown)
-        
-        return markdown
+        return markdown, engine
+
+    def _run_pandoc(self, latex_content: str) -> str:
+        """Runs pandoc as a subprocess the cancellation token can kill."""
+        import pypandoc
+        process = subprocess.Popen(
+            [pypandoc.get_pandoc_path(), "--from=latex", "--to=markdown", "--wrap=none"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        if self.token is None:
+            stdout, stderr = process.communicate(latex_content.encode("utf-8"))
+        else:
+            with self.token.track(process):
+                stdout, stderr = process.communicate(latex_content.encode("utf-8"))
+            self.token.check()
+        if process.returncode != 0:
+            raise RuntimeError(f"pandoc failed: {stderr.decode('utf-8', 'replace').strip()}")
+        return stdout.decode("utf-8").replace("\r\n", "\n")
 
     def _fallback_convert(self, latex: str) -> str:
         """Basic regex-based LaTeX to Markdown conversion."""
@@ -57,30 +138,51 @@ class MarkdownConverter:
         text = re.sub(r'\\end\{itemize\}', '', text)
         text = re.sub(r'\\item\s+', '- ', text)
         
-        # Remove remaining LaTeX commands (aggressive)
-        text = re.sub(r'\\[a-zA-Z]+\*?(\{.*?\})?', '', text)
+        # Figures (paths are rewritten later by ImageProcessor)
+        text = re.sub(r'\\includegraphics\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}', r'![](\1)', text)
+        
+        # Remove remaining LaTeX commands (aggressive), keeping \ref for reference resolution
+        text = re.sub(r'\\(?!ref\{)[a-zA-Z]+\*?(\{.*?\})?', '', text)
         
         return text.strip()
 
-    def _resolve_references(self, markdown: str) -> str:
-        """Converts \ref{key} to Markdown links using the label registry."""
+    def _resolve_references(self, markdown: str, chapter: Optional[Chapter] = None) -> str:
+        """Converts \\ref{key} to Markdown links using the label registry.
+
+        Links are relative to the page of the given chapter, so a label in
+        another chapter points at that chapter's page.
+        """
         
         def replace_ref(match):
             key = match.group(1)
             if key in self.label_registry:
-                label = self.label_registry[key]
-                # In Astro, we might want to link to files or anchors
-                if label.file:
-                    return f'[LINK](#{key})' # Simplified for now
-                return f'[REF:{key}](#{key})'
+                return f'[REF:{key}]({self._label_href(key, chapter)})'
             return f'[MISSING-REF:{key}]'
 
-        return re.sub(r'\\ref\{([^}]+)\}', replace_ref, markdown)
+        def replace_link(match):
+            # Pandoc renders \ref{key} as [key](#key){reference-type="ref" reference="key"}
+            key = match.group(2)
+            if key in self.label_registry:
+                return f'{match.group(1)}({self._label_href(key, chapter)})'
+            return match.group(0)
+
+        markdown = re.sub(r'\\ref\{([^}]+)\}', replace_ref, markdown)
+        return re.sub(r'(\[(?:\\.|[^\]\\])*\])\(#([^)\s]+)\)(?=\{reference-type=)', replace_link, markdown)
+
+    def _label_href(self, key: str, chapter: Optional[Chapter]) -> str:
+        label = self.label_registry[key]
+        if not label.file or (chapter is not None and label.file == chapter.filename):
+            return f'#{key}'
+        # Pages are served as directories: /books/<slug>/<chapter>/ and /books/<slug>/<chapter>/<section>/
+        page = label.file[:-3] if label.file.endswith(".md") else label.file
+        depth = chapter.filename.count("/") + 1 if chapter is not None else 1
+        return f'{"../" * depth}{page}/#{key}'
 
     def _generate_description(self, markdown: str, fallback: str = "توضیحات این بخش بزودی اضافه خواهد شد.") -> str:
         """Generates a short description from the first 150 characters of content."""
-        # Strip markdown headers and formatting
-        text = re.sub(r'[#*`\[\]]', '', markdown)
+        # Strip images, markdown headers and formatting
+        text = re.sub(r'!\[[^\]]*\]\([^)]*\)', '', markdown)
+        text = re.sub(r'[#*`\[\]]', '', text)
         text = re.sub(r'\s+', ' ', text).strip()
         
         if not text:
@@ -99,6 +201,9 @@ class MarkdownConverter:
             f'draft: {str(chapter.is_draft).lower()}',
             "---"
         ]
+        if chapter.parent:
+            # Section page of a split chapter: /books/<slug>/<chapter>/<section>/
+            lines[-1:-1] = [f'parent: "{chapter.parent[:-3]}"']
         return "\n".join(lines)
 
     def generate_frontmatter_from_metadata(self, metadata: BookMetadata) -> str:
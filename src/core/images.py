@@ -1,12 +1,20 @@
-import shutil
-from pathlib import Path
-from typing import List, Dict, Optional
+import re
+from pathlib import Path, PurePosixPath
+from typing import Any, List, Dict, Optional
 from models.book import ImageInfo
+from core.assets import AssetCopier
+
+INCLUDEGRAPHICS_PATTERN = re.compile(r'\\includegraphics\s*(?:\[[^\]]*\])?\s*\{([^}]+)\}')
 
 class ImageProcessor:
-    def __init__(self, source_dir: Path, output_dir: Path):
+    def __init__(self, source_dir: Path, output_dir: Path, copier: Optional[AssetCopier] = None,
+                 url_prefix: str = ""):
         self.source_dir = source_dir
         self.output_dir = output_dir
+        self.url_prefix = url_prefix
+        self.copier = copier or AssetCopier(output_dir)
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.missing: List[str] = []  # Referenced figures that could not be found
         self.graphics_paths: List[Path] = [source_dir]
         self.common_subdirs = ['images', 'figures', 'figs', 'img']
 
@@ -39,6 +47,41 @@ class ImageProcessor:
                             
         return None
 
+    def collect_images(self, latex: str) -> List[ImageInfo]:
+        """Resolves every \\includegraphics reference in a LaTeX fragment."""
+        images = []
+        for match in INCLUDEGRAPHICS_PATTERN.finditer(latex):
+            name = match.group(1).strip()
+            path = self.find_image(name)
+            if not path:
+                if name not in self.missing:
+                    self.missing.append(name)
+                continue
+            needs_conversion = path.suffix.lower() in ('.pdf', '.eps')
+            output_name = self._output_name(name, path)
+            images.append(ImageInfo(
+                original_name=name,
+                original_path=path,
+                output_name=output_name,
+                output_path=self.output_dir / output_name,
+                needs_conversion=needs_conversion
+            ))
+        return images
+
+    @staticmethod
+    def _output_name(name: str, path: Path) -> str:
+        """Keeps the directories of the reference, so a/plot and b/plot do not share one output file."""
+        dirs = [part for part in PurePosixPath(name.replace("\\", "/")).parts[:-1] if part not in ("/", ".", "..")]
+        return "/".join(dirs + [path.name])
+
+    def rewrite_markdown(self, markdown: str, images: List[ImageInfo]) -> str:
+        """Points markdown image links at the published copies."""
+        for img in images:
+            url = f"{self.url_prefix}/{img.output_name}"
+            pattern = r'(!\[[^\]]*\]\()' + re.escape(img.original_name) + r'(?:\.\w+)?(?=[)\s])'
+            markdown = re.sub(pattern, lambda m: m.group(1) + url, markdown)
+        return markdown
+
     def process_image(self, img_info: ImageInfo) -> bool:
         """Copies or converts the image to the output directory."""
         if not img_info.original_path.exists():
@@ -51,20 +94,20 @@ class ImageProcessor:
         if img_info.needs_conversion:
             return self._convert_image(img_info)
         
-        # Simple copy
-        try:
-            shutil.copy2(img_info.original_path, img_info.output_path)
-            return True
-        except Exception:
-            return False
+        return self._copy(img_info)
 
     def _convert_image(self, img_info: ImageInfo) -> bool:
         """Converts PDF/EPS to PNG. (Placeholder for actual conversion logic)"""
         # In a real implementation, this would use subprocess to call pdftoppm or magick
         # For now, we'll just copy if it's already a supported format or skip
         print(f"Warning: Conversion for {img_info.original_path.suffix} not fully implemented. Copying instead.")
+        return self._copy(img_info)
+
+    def _copy(self, img_info: ImageInfo) -> bool:
+        """Copies the image unless the previous run already produced an identical file."""
         try:
-            shutil.copy2(img_info.original_path, img_info.output_path)
-            return True
+            record = self.copier.copy(img_info.original_path, img_info.output_path)
         except Exception:
             return False
+        self.records[str(img_info.output_path)] = record
+        return True
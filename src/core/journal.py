@@ -0,0 +1,65 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+from core.cache import make_dirs
+
+class CheckpointJournal:
+    """Append-only log of the units of work a run has completed.
+
+    Every converted chapter and every file placed in the output tree is
+    appended as one JSON line with its content hash, size and mtime. When a
+    run is interrupted, the next run loads the journal and treats the files
+    it lists like entries of the previous manifest: a file whose size and
+    mtime still match is skipped, anything missing or partially written is
+    redone. The journal is removed once the manifest is saved.
+    """
+
+    def __init__(self, path: Path, resume: bool = True):
+        self.path = path
+        self.entries: List[Dict[str, Any]] = self._load() if resume else []
+        self.lock = threading.Lock()
+        self._file = None
+        if not resume and path.exists():
+            path.unlink()
+
+    def _load(self) -> List[Dict[str, Any]]:
+        if not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # The last line may be cut short by the crash being resumed from
+                    continue
+        return entries
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.entries)
+
+    def fingerprints(self) -> Dict[str, Dict[str, Any]]:
+        """Completed output files, keyed by target, in the shape of manifest entries."""
+        return {entry["target"]: entry for entry in self.entries if "target" in entry}
+
+    def record(self, unit: str, **fields: Any):
+        """Appends a completed unit and flushes it, so it survives a crash right after."""
+        line = json.dumps({"unit": unit, **fields}, ensure_ascii=False)
+        with self.lock:
+            if self._file is None:
+                make_dirs(self.path.parent)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def clear(self):
+        """Removes the journal after a run completed."""
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self.path.exists():
+                self.path.unlink()
+            self.entries = []
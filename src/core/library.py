@@ -0,0 +1,177 @@
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+from core.cache import ConversionCache, cache_dir
+from core.orchestrator import ConversionOrchestrator
+from core.pipeline import StagePipeline
+from core.placeholders import PlaceholderGenerator
+from core.progress import CancellationToken, ProgressCallback
+from core.writer import OutputWriter
+from utils.slugify import SlugAllocator, slugify
+from utils.transliterate import Transliterator
+
+LIBRARY_VERSION = "1.0.0"
+
+@dataclass
+class BookResult:
+    project: str
+    manifest: str = ""  # Known once the book is planned
+    title: str = ""
+    slug: str = ""
+    status: str = "pending"  # 'ok' or 'failed'
+    error: str = ""
+    chapters: int = 0
+    written: int = 0
+    skipped: int = 0
+    duration: float = 0.0
+
+class LibraryRunner:
+    """Converts many books in one process.
+
+    All books are parsed first, then the stages of every book (chapter
+    conversions, figure copies, page writes, manifests) are scheduled as one
+    DAG on a shared worker pool (pandoc runs as a subprocess, so threads
+    overlap well). Books share the conversion and placeholder caches. Each book keeps
+    its own manifest, as in single-book runs, and a library manifest and index
+    summarise the results.
+    """
+
+    def __init__(self, projects: List[Path], output_root: Path, workers: Optional[int] = None,
+                 prune: str = "delete", progress: Optional[ProgressCallback] = None,
+                 token: Optional[CancellationToken] = None, resume: bool = True, ascii_slugs: bool = False,
+                 normalize: bool = False, split_size: int = 0):
+        self.projects = projects
+        self.output_root = output_root
+        self.workers = workers or os.cpu_count() or 4
+        self.prune = prune
+        self.progress = progress
+        self.token = token
+        self.resume = resume
+        self.cache = ConversionCache(cache_dir(output_root) / "conversions")
+        self.placeholders = PlaceholderGenerator(cache_dir(output_root) / "placeholders.json")
+        self.results: List[BookResult] = []
+        # One transliterator for the whole run, so every title word is spelled once
+        self.transliterator = Transliterator() if ascii_slugs else None
+        self.normalize = normalize
+        self.split_size = split_size
+
+    @staticmethod
+    def discover(root: Path) -> List[Path]:
+        """Finds book projects: root/main.tex or one main.tex per sub directory."""
+        if root.is_file():
+            return [root]
+        if (root / "main.tex").is_file():
+            return [root / "main.tex"]
+        return sorted(p for p in root.glob("*/main.tex") if p.is_file())
+
+    def run(self) -> List[BookResult]:
+        self.results = []
+        books: List[ConversionOrchestrator] = []
+        starts: Dict[int, float] = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # 1. Parse every book (in parallel)
+            parsed: Dict[int, Future] = {}
+            for idx, main_tex in enumerate(self.projects):
+                self.results.append(BookResult(project=str(main_tex)))
+                orchestrator = ConversionOrchestrator(
+                    main_tex, self.output_root, prune=self.prune,
+                    cache=self.cache, placeholders=self.placeholders, executor=pool,
+                    progress=self.progress, token=self.token, resume=self.resume,
+                    transliterator=self.transliterator, normalize=self.normalize, split_size=self.split_size
+                )
+                books.append(orchestrator)
+                starts[idx] = time.perf_counter()
+                parsed[idx] = pool.submit(self._parse, orchestrator)
+            ok = [idx for idx, future in parsed.items() if not self._failed(idx, future)]
+
+            # 2. Give every book its own output folder, then plan them (in parallel)
+            self._allocate_slugs([books[idx] for idx in ok])
+            prepared = {idx: pool.submit(books[idx].prepare) for idx in ok}
+
+            # 3. One DAG for the whole library: chapters, figures and pages of every book
+            pipeline = StagePipeline()
+            for idx, future in prepared.items():
+                if not self._failed(idx, future):
+                    self.results[idx].manifest = books[idx].manifest.path.relative_to(self.output_root).as_posix()
+                    books[idx].add_stages(pipeline, prefix=f"{idx}/")
+            pipeline.run(pool, token=self.token)
+        if self.token:
+            self.token.check()
+
+        for idx, orchestrator in enumerate(books):
+            if orchestrator.last_stage is None:
+                continue
+            try:
+                orchestrator.complete(pipeline, prefix=f"{idx}/")
+            except Exception as e:
+                self.results[idx].status, self.results[idx].error = "failed", str(e)
+                continue
+            self._record(self.results[idx], orchestrator, pipeline.stages[orchestrator.last_stage].end - starts[idx])
+
+        self.save()
+        return self.results
+
+    def _parse(self, orchestrator: ConversionOrchestrator):
+        orchestrator.parse()
+        if self.normalize:
+            # Slugs are allocated from the normalized titles, as in single-book runs
+            orchestrator.normalize_text()
+
+    def _allocate_slugs(self, books: List[ConversionOrchestrator]):
+        """Makes book slugs unique across the library, in project order; explicit slugs are claimed first."""
+        slugs = SlugAllocator(transliterator=self.transliterator)
+        for orchestrator in books:
+            metadata = orchestrator.book.metadata
+            if metadata.slug:
+                metadata.slug = slugs.claim(metadata.slug)
+        for orchestrator in books:
+            metadata = orchestrator.book.metadata
+            if not metadata.slug:
+                folder = slugify(orchestrator.main_tex.parent.name) or "book"
+                metadata.slug = slugs.allocate(metadata.title, fallback=folder)
+
+    def _failed(self, idx: int, future: Future) -> bool:
+        try:
+            future.result()
+        except Exception as e:
+            self.results[idx].status, self.results[idx].error = "failed", str(e)
+            return True
+        return False
+
+    def _record(self, result: BookResult, orchestrator: ConversionOrchestrator, duration: float):
+        book = orchestrator.book
+        result.status = "ok"
+        result.title = book.metadata.title
+        result.slug = book.metadata.slug
+        result.chapters = len(book.chapters)
+        result.written = orchestrator.writer.stats["written"]
+        result.skipped = orchestrator.writer.stats["skipped"]
+        result.duration = round(duration, 3)
+
+    def save(self):
+        """Writes library.json (per-book results) and library.md (a readable index)."""
+        writer = OutputWriter(self.output_root)
+        books = []
+        for result in self.results:
+            # Per-run counters and durations stay out of the file so it only changes with the library
+            entry = asdict(result)
+            for key in ("written", "skipped", "duration"):
+                entry.pop(key)
+            books.append(entry)
+        writer.write_text(self.output_root / "library.json",
+                          json.dumps({"version": LIBRARY_VERSION, "books": books}, ensure_ascii=False, indent=2))
+
+        lines = ["# Library", "", "| # | Title | Slug | Chapters | Status |", "|---|---|---|---|---|"]
+        for i, result in enumerate(self.results, start=1):
+            status = result.status if not result.error else f"{result.status}: {result.error}"
+            lines.append(f"| {i} | {result.title or result.project} | {result.slug} | {result.chapters} | {status} |")
+        writer.write_text(self.output_root / "library.md", "\n".join(lines) + "\n")
+
+    @property
+    def failed(self) -> List[BookResult]:
+        return [r for r in self.results if r.status != "ok"]
@@ -1,29 +1,108 @@
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
+from core.writer import OutputWriter
+
+MANIFEST_VERSION = "2.0.0"
+
+# Keys that describe a particular run rather than the produced output.
+# They are ignored when deciding whether the manifest needs rewriting.
+VOLATILE_KEYS = ("timestamp", "stages")
+VOLATILE_FILE_KEYS = ("conversion_time",)
 
 class ManifestGenerator:
-    def __init__(self, output_root: Path):
+    """Builds the versioned manifest that maps every output file to its sources.
+
+    Each file entry records its type, target path, the source files and line
+    spans it came from, its content hash and size, and for converted pages the
+    engine used and the conversion time. The previous manifest is loaded on
+    construction so later stages can skip, prune and report changes.
+    """
+
+    def __init__(self, output_root: Path, path: Optional[Path] = None):
         self.output_root = output_root
+        self.path = path or output_root / "manifest.json"
         self.data: Dict[str, Any] = {
-            "version": "1.0.0",
+            "version": MANIFEST_VERSION,
             "timestamp": datetime.now().isoformat(),
-            "files": [],
-            "metadata": {}
+            "metadata": {},
+            "sources": {},
+            "stages": {},
+            "files": []
         }
+        self.previous_data: Dict[str, Any] = self.load(self.path)
+        self.previous: Dict[str, Dict[str, Any]] = {
+            entry["target"]: entry for entry in self.previous_data.get("files", [])
+        }
+
+    @staticmethod
+    def load(path: Path) -> Dict[str, Any]:
+        """Loads a saved manifest, upgrading 1.x manifests to the current layout."""
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if not str(data.get("version", "")).startswith("1."):
+            return data
+
+        files = []
+        for entry in data.get("files", []):
+            if "target" not in entry:
+                continue
+            source = entry.pop("source", "")
+            # 1.x manifests were written on Windows with backslash separators
+            entry["target"] = entry["target"].replace("\\", "/")
+            entry["sources"] = [] if source in ("", "mixed") else [{"file": source}]
+            files.append(entry)
+        data["files"] = files
+        data["version"] = MANIFEST_VERSION
+        return data
 
     def set_metadata(self, metadata: Dict[str, Any]):
         self.data["metadata"] = metadata
 
-    def add_file(self, type: str, source: str, target: str):
-        self.data["files"].append({
+    def set_sources(self, sources: Dict[str, str]):
+        """Records the content hash of every source file read by the parser."""
+        self.data["sources"] = dict(sources)
+
+    def set_stage_timings(self, timings: Dict[str, float]):
+        self.data["stages"] = dict(timings)
+
+    def add_file(self, type: str, target: str, sources: Optional[List[Dict[str, Any]]] = None, **extra: Any):
+        entry = {
             "type": type,
-            "source": source,
-            "target": target
-        })
-
-    def save(self):
-        manifest_path = self.output_root / "manifest.json"
-        with open(manifest_path, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+            "target": target,
+            "sources": sources or []
+        }
+        entry.update(extra)
+        self.data["files"].append(entry)
+
+    def targets(self) -> List[str]:
+        return [entry["target"] for entry in self.data["files"]]
+
+    @staticmethod
+    def _stable(data: Dict[str, Any]) -> Dict[str, Any]:
+        stable = {k: v for k, v in data.items() if k not in VOLATILE_KEYS}
+        stable["files"] = [
+            {k: v for k, v in entry.items() if k not in VOLATILE_FILE_KEYS}
+            for entry in data.get("files", [])
+        ]
+        return stable
+
+    def save(self, writer: Optional[OutputWriter] = None):
+        # Leave the previous manifest untouched when the outputs did not change
+        if self.previous_data and self._stable(self.previous_data) == self._stable(self.data):
+            return
+
+        text = json.dumps(self.data, ensure_ascii=False, indent=2)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if writer:
+            writer.write_text(self.path, text)
+        else:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(text)
@@ -0,0 +1,86 @@
+import re
+from typing import Dict, Optional, Tuple
+
+# Arabic forms -> Persian forms; None removes the character
+CHARACTER_MAP: Dict[str, Optional[str]] = {
+    'ي': 'ی',  # Arabic yeh
+    'ى': 'ی',  # Alef maksura
+    'ك': 'ک',  # Arabic kaf
+    'ـ': None,  # Tatweel (kashida)
+    '‍': None,  # ZWJ, where ZWNJ is meant or nothing at all
+    **{chr(0x0660 + i): chr(0x06F0 + i) for i in range(10)},  # Arabic-Indic -> Persian digits
+}
+
+_CHARACTERS = re.compile('[' + ''.join(CHARACTER_MAP) + ']')
+
+ZWNJ = '‌'
+_LETTER = '[؀-ۿ]'
+# One pass for every ZWNJ rule; each alternative is one named rule
+_ZWNJ_RULES = re.compile(
+    # Verb prefixes are joined to the verb: می شود -> می‌شود
+    rf'(?<![^ \t\n({{])(?P<prefix>ن?می)(?P<prefix_gap>{ZWNJ}*[ \t]+{ZWNJ}*)(?={_LETTER})'
+    # Plural suffixes are joined to the noun: کتاب ها -> کتاب‌ها
+    rf'|(?<={_LETTER})(?P<suffix_gap>{ZWNJ}*[ \t]+{ZWNJ}*)(?P<suffix>ها(?:ی(?:ی|م|ت|ش|مان|تان|شان)?)?)(?!{_LETTER})'
+    rf'|(?P<repeated>{ZWNJ}{{2,}})'
+    rf'|(?P<before_space>{ZWNJ}+(?=[ \t\n]))'
+    rf'|(?P<after_space>(?<=[ \t\n]){ZWNJ}+)'
+)
+# File path arguments name files on disk and are never normalized
+_PATH_ARGUMENTS = re.compile(
+    r'\\(?:includegraphics|input|include|includepdf|bibliography|addbibresource|graphicspath)\*?'
+    r'\s*(?:\[[^\]]*\])?\s*\{(?:[^{}]|\{[^{}]*\})*\}'
+)
+
+class PersianNormalizer:
+    """Rewrites mixed Arabic/Persian text into one canonical Persian form.
+
+    One regex pass maps Arabic ye/kaf/digits to their Persian forms and
+    drops kashida and ZWJ, then one regex pass fixes ZWNJ usage: repeated
+    ZWNJs, ZWNJs next to spaces, and spaces where می/نمی and ها/های join
+    their word. Changes are counted by the substitutions themselves, both
+    passes are linear in the text length, and ASCII text (LaTeX commands,
+    math) is never changed.
+    """
+
+    def normalize(self, text: str) -> Tuple[str, int]:
+        """Returns the normalized text and the number of characters changed, removed or inserted."""
+        if text.isascii():
+            return text, 0
+        text, changed = _CHARACTERS.subn(lambda match: CHARACTER_MAP[match.group(0)] or "", text)
+        if ZWNJ not in text and ' ' not in text and '\t' not in text:
+            return text, changed
+
+        zwnj_changes = 0
+
+        def fix(match: re.Match) -> str:
+            nonlocal zwnj_changes
+            rule = match.lastgroup
+            if rule == "repeated":
+                zwnj_changes += len(match.group(0)) - 1
+                return ZWNJ
+            if rule in ("before_space", "after_space"):
+                zwnj_changes += len(match.group(0))
+                return ""
+            # A gap becomes a single ZWNJ
+            if rule in ("prefix", "prefix_gap"):
+                zwnj_changes += len(match.group("prefix_gap")) - match.group("prefix_gap").count(ZWNJ)
+                return match.group("prefix") + ZWNJ
+            zwnj_changes += len(match.group("suffix_gap")) - match.group("suffix_gap").count(ZWNJ)
+            return ZWNJ + match.group("suffix")
+
+        text = _ZWNJ_RULES.sub(fix, text)
+        return text, changed + zwnj_changes
+
+    def normalize_latex(self, text: str) -> Tuple[str, int]:
+        """Like normalize(), but keeps the path arguments of \\includegraphics, \\input and friends as they are."""
+        if text.isascii():
+            return text, 0
+        parts, changed, start = [], 0, 0
+        for match in _PATH_ARGUMENTS.finditer(text):
+            normalized, count = self.normalize(text[start:match.start()])
+            parts += [normalized, match.group(0)]
+            changed += count
+            start = match.end()
+        normalized, count = self.normalize(text[start:])
+        parts.append(normalized)
+        return "".join(parts), changed + count
@@ -1,123 +1,663 @@
 import re
+import shutil
+import threading
+import time
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime
+from functools import partial
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from core.parser import LatexParser
-from core.converter import MarkdownConverter
+from core.converter import MarkdownConverter, pandoc_version
 from core.images import ImageProcessor
-from models.book import Book
-from utils.slugify import slugify
+from core.journal import CheckpointJournal
+from core.assets import AssetCopier
+from core.cache import ConversionCache, cache_dir, make_dirs
+from core.placeholders import PlaceholderGenerator
+from core.writer import OutputWriter, remove_empty_dirs
+from models.book import Book, Chapter, ImageInfo, LabelRegistry, SourceSpan
+from utils.hashing import hash_bytes, hash_text
+from utils.slugify import SlugAllocator, slugify
 from core.manifest import ManifestGenerator
+from core.normalize import PersianNormalizer
+from core.pipeline import Stage, StagePipeline
+from core.progress import CancellationToken, ProgressCallback, ProgressReporter
+
+LABEL_PATTERN = re.compile(r'\\label\s*\{([^}]+)\}')
+LABEL_TYPES = {"ch": "chapter", "sec": "section", "fig": "figure", "tab": "table", "eq": "equation"}
+SECTION_PATTERN = re.compile(r'\\section\*?\s*(?:\[[^\]]*\])?\s*\{')
+LATEX_COMMAND = re.compile(r'\\[a-zA-Z]+\*?\s*')
+
+def find_sections(latex: str) -> List[Tuple[int, str]]:
+    """(offset, title) of every \\section in a LaTeX fragment.
+
+    Titles are read up to their balancing brace, so \\section{The \\emph{big}
+    idea} is found whole, and LaTeX commands and braces are dropped from them.
+    """
+    sections = []
+    for match in SECTION_PATTERN.finditer(latex):
+        depth, pos = 1, match.end()
+        while pos < len(latex) and depth:
+            char = latex[pos]
+            if char == "\\":
+                pos += 2  # Escaped characters such as \{ do not count
+                continue
+            depth += 1 if char == "{" else -1 if char == "}" else 0
+            pos += 1
+        if depth:
+            continue
+        title = LATEX_COMMAND.sub("", latex[match.end():pos - 1]).replace("{", "").replace("}", "")
+        sections.append((match.start(), " ".join(title.split())))
+    return sections
 
 class ConversionOrchestrator:
-    """Orchestrates the entire conversion process from LaTeX to Astro."""
+    """Orchestrates the entire conversion process from LaTeX to Astro.
+
+    Progress is reported as ProgressEvents to the optional callback (from
+    worker threads), and cancelling the token stops the run between stages
+    and kills running pandoc processes; run() then raises ConversionCancelled.
+    Completed units are journaled, so a crashed or cancelled run resumes
+    without redoing verified work (pass resume=False to start over).
+    """
     
-    def __init__(self, main_tex: Path, output_root: Path):
+    def __init__(self, main_tex: Path, output_root: Path, book: Optional[Book] = None, prune: str = "delete",
+                 cache: Optional[ConversionCache] = None,
+                 placeholders: Optional[PlaceholderGenerator] = None, executor: Optional[Executor] = None,
+                 progress: Optional[ProgressCallback] = None, token: Optional[CancellationToken] = None,
+                 resume: bool = True, transliterator: Optional[Callable[[str], str]] = None,
+                 normalize: bool = False, split_size: int = 0):
         self.main_tex = main_tex
         self.output_root = output_root
+        self.prune = prune  # 'delete', 'trash' or 'off'
+        self.pruned: List[str] = []
         self.parser = LatexParser(main_tex)
-        self.manifest = ManifestGenerator(output_root)
-        self.book: Book = None
-        
-    def run(self):
-        # 1. Parse LaTeX
-        self.book = self.parser.parse()
-        
-        # 2. Refine Slugs (Respect user input if available)
-        if not self.book.metadata.slug:
-            self.book.metadata.slug = slugify(self.book.metadata.title)
-            
-        for ch in self.book.chapters:
-            if not ch.slug:
-                ch.slug = slugify(ch.title)
-            ch.filename = f"ch{ch.number:02d}-{ch.slug}.md"
-            
-        for app in self.book.appendices:
-            if not app.slug:
-                app.slug = slugify(app.title)
-            app.filename = f"app{app.number:02d}-{app.slug}.md"
-        
-        # 3. Setup Image Processor
-        image_out_dir = self.output_root / "public" / "images" / "books" / self.book.metadata.slug
-        self.img_processor = ImageProcessor(self.main_tex.parent, image_out_dir)
+        # Every book has its own manifest and journal, opened by plan() once the slug is known
+        self.resume = resume
+        self.project_id = hash_text(str(main_tex.resolve()))[:16]
+        self.manifest: Optional[ManifestGenerator] = None
+        self.journal: Optional[CheckpointJournal] = None
+        self.previous: Dict[str, Dict[str, Any]] = {}
+        self.previous_manifest: Optional[Path] = None  # Manifest adopted after a slug change, removed once saved
+        self.resumed = False
+        self.copier = AssetCopier(output_root)
+        self.writer = OutputWriter(output_root)
+        # Caches and the worker pool can be shared between books (see LibraryRunner)
+        self.cache = cache or ConversionCache(cache_dir(output_root) / "conversions")
+        self.placeholders = placeholders or PlaceholderGenerator(cache_dir(output_root) / "placeholders.json")
+        self.executor = executor
+        self.progress = ProgressReporter(progress)
+        self.token = token
+        self.converted = 0
+        self.lock = threading.Lock()
+        self.book: Book = book
+        self.timings: Dict[str, float] = {}
+        self.critical_path: List[Tuple[str, float]] = []
+        self.last_stage: Optional[str] = None
+        self.content_dir: Optional[Path] = None
+        self.image_dir: Optional[Path] = None
+        self.source_pdf: Optional[Path] = None
+        # Spells titles in Latin letters before slugifying (utils.transliterate), for ASCII slugs
+        self.transliterator = transliterator
+        # Canonical Persian text (core.normalize) before slugs and cache keys are computed
+        self.normalize = normalize
+        self.normalized = 0  # Characters changed by the normalization stage
+        self.normalized_book: Optional[Book] = None
+        # Chapters with more LaTeX than this many bytes become one page per \section (0: never split)
+        self.split_size = split_size
+        self.parts: Dict[str, List[Chapter]] = {}  # Split chapter filename -> its intro page and section pages
+
+    @contextmanager
+    def _timed(self, stage: str):
+        """Records the wall-clock duration of a pipeline stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[stage] = round(time.perf_counter() - start, 4)
         
-        # 4. Convert Content
-        self.converter = MarkdownConverter(self.book)
-        self.converter.convert_all()
+    def run(self, publish: Optional[Callable[[], Any]] = None):
+        """Parses, plans and runs the whole conversion as a DAG of stages.
+
+        publish, if given, runs as a final stage once the manifest is saved
+        (the wizard uses it to commit and push the output repository).
+        """
+        # 1-2. Parse LaTeX and plan outputs
+        self.prepare()
+
+        # 3-6. Convert chapters, publish images and the PDF, write files, prune and save the manifest
+        self._run_pipeline(convert=True, publish=publish)
+
+    def prepare(self):
+        """Parses (unless the caller already parsed and edited the book) and plans outputs."""
+        if self.book is None:
+            self.parse()
+        if self.normalize:
+            self.normalize_text()
         
-        # 5. Save Files and Manifest
-        self.save_markdown_files()
+        # Plan outputs (slugs, file names, PDF, images) before anything is written
+        self.plan()
+        self.converter = MarkdownConverter(self.book, self.cache, self.token)
+        if not pandoc_version():
+            self.progress.emit("warning", message="pandoc is not available; using the basic fallback converter")
+        for name in self.img_processor.missing:
+            self.progress.emit("warning", message=f"Image not found: {name}")
+
+    def finish(self, publish: Optional[Callable[[], Any]] = None):
+        """Publishes images and writes every output once the chapters are converted."""
+        self._run_pipeline(convert=False, publish=publish)
+
+    def _run_pipeline(self, convert: bool, publish: Optional[Callable[[], Any]] = None):
+        pipeline = StagePipeline()
+        self.add_stages(pipeline, convert=convert, publish=publish)
+        pipeline.run(self.executor, token=self.token)
+        self.complete(pipeline)
+
+    def add_stages(self, pipeline: StagePipeline, prefix: str = "", convert: bool = True,
+                   publish: Optional[Callable[[], Any]] = None) -> str:
+        """Adds this book's stages to a pipeline and returns the name of its last stage. Requires prepare().
+
+        Each chapter is converted and then written on its own, figures and the
+        PDF are copied while chapters convert, pruning waits for every output,
+        and the manifest is saved last. The prefix keeps stage names unique
+        when several books share one pipeline.
+        """
+        add = partial(pipeline.add, listener=partial(self._stage_event, prefix))
+        self.converted = 0
+        converted: Dict[str, List[str]] = {}
+        for chapter in self.units():
+            converted[chapter.filename] = [add(
+                f"{prefix}convert:{chapter.filename}", partial(self._convert_chapter, chapter)
+            )] if convert else []
+
+        outputs = []
+        seen = set()
+        for chapter in self.book.chapters + self.book.appendices:
+            for img in chapter.images:
+                if img.output_path not in seen:
+                    seen.add(img.output_path)
+                    outputs.append(add(f"{prefix}image:{img.output_name}",
+                                                partial(self._publish_image, img), kind="image"))
+
+        for type, path, chapter in self._pages():
+            deps = converted[chapter.filename] if chapter else []
+            target = path.relative_to(self.content_dir).as_posix()
+            outputs.append(add(f"{prefix}write:{target}", partial(self._write_page, type, path, chapter),
+                                        deps, kind="write"))
+
+        if self.source_pdf:
+            outputs.append(add(f"{prefix}pdf", self._publish_pdf))
+
+        entries = lambda: [pipeline.stages[name].result for name in outputs if pipeline.stages[name].result]
+        prune = add(f"{prefix}prune",
+                             lambda: self.prune_stale_outputs({entry["target"] for entry in entries()}), outputs)
+        last = add(f"{prefix}manifest", lambda: self._save_manifest(entries(), pipeline, prefix), [prune])
+        if publish:
+            last = add(f"{prefix}git", publish, [last])
+        self.last_stage = last
+        return last
+
+    def _convert_chapter(self, chapter: Chapter):
+        # Converted markdown is checkpointed by the conversion cache itself
+        self.converter.convert_chapter(chapter)
+        self.journal.record("convert", chapter=chapter.filename, engine=chapter.engine,
+                            hash=self.converter.cache_key(chapter.content_latex))
+        with self.lock:
+            self.converted += 1
+            current = self.converted
+        self.progress.emit("chapter_converted", stage="convert", message=chapter.title,
+                           current=current, total=len(self.units()))
+
+    def _stage_event(self, prefix: str, stage: Stage):
+        """Turns pipeline stage transitions into progress events."""
+        name = stage.name[len(prefix):]
+        if stage.status == "running":
+            self.progress.emit("stage_started", stage=name)
+            return
+        if stage.status == "failed":
+            self.progress.emit("warning", stage=name, message=f"{name} failed: {stage.error}")
+        if stage.kind == "write" and stage.result:
+            self.progress.emit("file_written", stage=name, message=stage.result["target"],
+                               bytes=self.writer.bytes_written)
+        self.progress.emit("stage_finished", stage=name)
+
+    def complete(self, pipeline: StagePipeline, prefix: str = ""):
+        """Records the timings and critical path of a finished pipeline and re-raises the first failure."""
+        self.timings.update(pipeline.timings(prefix))
+        self.critical_path = [
+            (stage.name[len(prefix):], round(stage.duration, 4))
+            for stage in pipeline.critical_path(self.last_stage)
+        ]
+        pipeline.raise_failures(prefix)
+
+    def _save_manifest(self, entries: List[Dict[str, Any]], pipeline: StagePipeline, prefix: str):
+        for entry in entries:
+            self.manifest.add_file(**entry)
         self.manifest.set_metadata({
             "title": self.book.metadata.title,
             "slug": self.book.metadata.slug,
-            "chapters_count": len(self.book.chapters)
+            "chapters_count": len(self.book.chapters),
+            "project": self.project_id,
+            "pandoc": pandoc_version()
         })
-        self.manifest.save()
-        
-    def save_markdown_files(self):
-        content_type = self.book.metadata.type or "Book"
+        self.manifest.set_sources(self.book.source_files)
+        self.manifest.set_stage_timings({**self.timings, **pipeline.timings(prefix)})
+        self.manifest.save(self.writer)
+        if self.previous_manifest and self.previous_manifest != self.manifest.path and self.previous_manifest.exists():
+            self.previous_manifest.unlink()
+        self.placeholders.cache.save()
+        self.journal.clear()
         
-        if content_type == "Book":
-            base_dir = self.output_root / "src" / "content" / "books" / self.book.metadata.lang / self.book.metadata.slug
+    def parse(self) -> Book:
+        """Parses the LaTeX project into self.book."""
+        with self._timed("parse"):
+            self.book = self.parser.parse()
+        return self.book
+
+    def normalize_text(self):
+        """Normalizes Persian text of the metadata, every chapter and the label keys. Runs once per book."""
+        if self.normalized_book is self.book:
+            return
+        with self._timed("normalize"):
+            self._normalize_book()
+        self.normalized_book = self.book
+
+    def _normalize_book(self):
+        normalizer = PersianNormalizer()
+        changed = 0
+
+        def normalized(text: str, latex: bool = False) -> str:
+            nonlocal changed
+            text, count = normalizer.normalize_latex(text) if latex else normalizer.normalize(text)
+            changed += count
+            return text
+
+        metadata = self.book.metadata
+        metadata.title = normalized(metadata.title)
+        metadata.author = normalized(metadata.author)
+        metadata.description = normalized(metadata.description)
+        metadata.tags = [normalized(tag) for tag in metadata.tags]
+        for chapter in self.book.chapters + self.book.appendices:
+            chapter.title = normalized(chapter.title)
+            if chapter.content_latex:
+                chapter.content_latex = normalized(chapter.content_latex, latex=True)
+            else:
+                chapter.content_markdown = normalized(chapter.content_markdown)
+        # \label and \ref keys in the text were normalized too
+        registry = self.book.label_registry
+        if not all(key.isascii() for key in registry):
+            self.book.label_registry = LabelRegistry({normalizer.normalize(key)[0]: label for key, label in registry.items()})
+        self.normalized = changed
+
+    def plan(self):
+        """Decides slugs, file names, image locations and the PDF to publish, so every file is rendered once."""
+        # Refine Slugs (Respect user input if available)
+        if not self.book.metadata.slug:
+            title = self.book.metadata.title
+            self.book.metadata.slug = slugify(self.transliterator(title) if self.transliterator else title)
+
+        # Page slugs are unique within the book: slugs set by the user are claimed first
+        slugs = SlugAllocator(transliterator=self.transliterator)
+        pages = self.book.chapters + self.book.appendices
+        for page in pages:
+            if page.slug:
+                page.slug = slugs.claim(page.slug)
+        for page in pages:
+            if not page.slug:
+                page.slug = slugs.allocate(page.title)
+
+        # Numbers follow the list order, which the review step may have changed since parsing
+        for number, ch in enumerate(self.book.chapters, start=1):
+            ch.number = number
+            ch.filename = f"ch{ch.number:02d}-{ch.slug}.md"
+
+        for number, app in enumerate(self.book.appendices, start=1):
+            app.number = number
+            app.filename = f"app{app.number:02d}-{app.slug}.md"
+
+        self.parts = {}
+        if (self.book.metadata.type or "Book") == "Book":
+            if self.split_size:
+                for chapter in pages:
+                    if len(chapter.content_latex.encode("utf-8")) > self.split_size:
+                        parts = self._split_chapter(chapter)
+                        if parts:
+                            self.parts[chapter.filename] = parts
+            self._index_labels()
+
+        self.content_dir = self._content_dir()
+        self.image_dir = self.output_root / "public" / "images" / "books" / self.book.metadata.slug
+        self._open_manifest()
+        self.source_pdf = self._find_source_pdf()
+        if self.source_pdf:
+            self.book.metadata.pdf_url = "/books/" + self.book.metadata.slug + "/book.pdf"
+
+        # Setup Image Processor
+        image_url = "/images/books/" + self.book.metadata.slug
+        self.img_processor = ImageProcessor(self.main_tex.parent, self.image_dir, self.copier, image_url)
+        self.img_processor.set_graphics_paths(self.book.graphics_paths)
+        for chapter in self.units():
+            chapter.images = self.img_processor.collect_images(chapter.content_latex)
+        for filename, parts in self.parts.items():
+            # The chapter keeps every figure of its pages (watch mode polls them)
+            chapter = next(ch for ch in pages if ch.filename == filename)
+            chapter.images = [img for part in parts for img in part.images]
+
+    def _open_manifest(self):
+        """Loads this book's previous manifest and journal, so unchanged outputs are skipped and stale ones pruned."""
+        if self.manifest is not None:
+            return
+        self.manifest = ManifestGenerator(self.output_root, self._manifest_path())
+        # A manifest of another project at this path (same slug) is not ours to skip or prune by
+        recorded = self.manifest.previous_data.get("metadata", {}).get("project")
+        if self.manifest.previous_data and recorded in (None, self.project_id):
+            previous = self.manifest.previous
         else:
-            base_dir = self.output_root / "src" / "content" / "articles" / self.book.metadata.lang
-            
-        base_dir.mkdir(parents=True, exist_ok=True)
-        
-        if content_type == "Book":
-            # Save index.md (Overview)
-            index_fm = self.converter.generate_frontmatter_from_metadata(self.book.metadata)
-            index_path = base_dir / "index.md"
-            with open(index_path, "w", encoding="utf-8") as f:
-                f.write(index_fm + "\n\n# " + self.book.metadata.title + "\n")
-            self.manifest.add_file("overview", "main.tex", str(index_path.relative_to(self.output_root)))
-                
-            # Save Chapters
-            for chapter in self.book.chapters:
-                filepath = base_dir / chapter.filename
-                fm = self.converter.generate_frontmatter(chapter)
-                with open(filepath, "w", encoding="utf-8") as f:
-                    f.write(fm + "\n\n" + chapter.content_markdown)
-                self.manifest.add_file("chapter", "mixed", str(filepath.relative_to(self.output_root)))
-
-            # Save Appendices
-            for app in self.book.appendices:
-                filepath = base_dir / app.filename
-                fm = self.converter.generate_frontmatter(app)
-                with open(filepath, "w", encoding="utf-8") as f:
-                    f.write(fm + "\n\n" + app.content_markdown)
-                self.manifest.add_file("appendix", "mixed", str(filepath.relative_to(self.output_root)))
+            previous = self._adopt_previous()
+        self.journal = CheckpointJournal(self._journal_path(), self.resume)
+        # Files an interrupted run already placed count as previous outputs: verified ones are skipped
+        self.previous = {**previous, **self.journal.fingerprints()}
+        self.resumed = self.journal.resumed
+        self.copier = AssetCopier(self.output_root, self.previous)
+        self.writer = OutputWriter(self.output_root, self.previous)
+
+    def _journal_path(self) -> Path:
+        """The journal mirrors the manifest's path: journals/books/fa/<slug>.jsonl."""
+        name = self.manifest.path.relative_to(self.output_root / "manifests")
+        return cache_dir(self.output_root) / "journals" / name.with_suffix(".jsonl")
+
+    def _manifest_path(self) -> Path:
+        """manifests/<books|articles>/<lang>/<slug>.json: books sharing an output root never see each other's files."""
+        kind = "books" if (self.book.metadata.type or "Book") == "Book" else "articles"
+        return self.output_root / "manifests" / kind / self.book.metadata.lang / f"{self.book.metadata.slug}.json"
+
+    def _adopt_previous(self) -> Dict[str, Dict[str, Any]]:
+        """Previous outputs of a book that has no manifest of its own yet.
+
+        After a slug change the book's last manifest is found by its project
+        id (and removed once the new one is saved). Otherwise the entries in
+        this book's folders are taken from the root manifest.json that older
+        versions shared between all books.
+        """
+        manifests = self.output_root / "manifests"
+        for path in sorted(manifests.rglob("*.json")) if manifests.is_dir() else []:
+            data = ManifestGenerator.load(path)
+            if data.get("metadata", {}).get("project") == self.project_id:
+                self.previous_manifest = path
+                return {entry["target"]: entry for entry in data.get("files", [])}
+        legacy = ManifestGenerator.load(self.output_root / "manifest.json")
+        if (self.book.metadata.type or "Book") == "Book":
+            scope = (self.content_dir.relative_to(self.output_root).as_posix() + "/",)
         else:
-            # Article or Markdown: Single File
-            filepath = base_dir / f"{self.book.metadata.slug}.md"
-            # We can use the same frontmatter generator for articles for now, 
-            # or refine it if schemas differ significantly.
-            fm = self.converter.generate_frontmatter_from_metadata(self.book.metadata)
-            # Add the content (assuming it's in the first chapter for single-file types)
-            content = self.book.chapters[0].content_markdown if self.book.chapters else ""
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(fm + "\n\n" + content)
-            self.manifest.add_file("article", "mixed", str(filepath.relative_to(self.output_root)))
-
-        # Handle PDF Publishing (Relevant for books mostly, but can apply to articles)
-        self._publish_pdf(base_dir if content_type == "Book" else base_dir)
-
-    def _publish_pdf(self, book_dir: Path):
-        """Looks for a PDF in source and copies it to the book folder."""
-        import shutil
-        source_pdf = list(self.main_tex.parent.glob("*.pdf"))
-        if source_pdf:
-            # Pick the largest or the first one
-            pdf_file = source_pdf[0]
-            target_pdf = book_dir / "book.pdf"
-            shutil.copy2(pdf_file, target_pdf)
-            self.book.metadata.pdf_url = "/books/" + self.book.metadata.slug + "/book.pdf"
-            # Update index.md with the new PDF URL
-            self._update_index_pdf_url(book_dir / "index.md")
-            self.manifest.add_file("pdf", str(pdf_file), str(target_pdf.relative_to(self.output_root)))
-
-    def _update_index_pdf_url(self, index_path: Path):
-        """Updates the frontmatter of index.md with the actual PDF URL."""
-        if not index_path.exists(): return
-        content = index_path.read_text(encoding="utf-8")
-        # Simple regex swap for pdfUrl
-        new_content = re.sub(r'pdfUrl: ".*"', f'pdfUrl: "{self.book.metadata.pdf_url}"', content)
-        index_path.write_text(new_content, encoding="utf-8")
+            scope = ((self.content_dir / f"{self.book.metadata.slug}.md").relative_to(self.output_root).as_posix(),)
+        scope += (self.image_dir.relative_to(self.output_root).as_posix() + "/",)
+        return {entry["target"]: entry for entry in legacy.get("files", []) if entry["target"].startswith(scope)}
+
+    def _split_chapter(self, chapter: Chapter) -> List[Chapter]:
+        """Splits a chapter at its \\section commands: an intro page plus one sub-page per section.
+
+        The intro page keeps the chapter's file name and lists the sections;
+        section pages live in a folder named after the chapter page
+        (ch03-slug/01-section-slug.md). Returns [] for chapters with fewer
+        than two sections.
+        """
+        latex = chapter.content_latex
+        sections = find_sections(latex)
+        if len(sections) < 2:
+            return []
+        bounds = [0] + [start for start, _ in sections] + [len(latex)]
+        spans = self._part_spans(chapter, len(sections)) or [chapter.source_spans] * len(bounds)
+        folder = chapter.filename[:-3]
+        intro = Chapter(number=chapter.number, title=chapter.title, slug=chapter.slug, filename=chapter.filename,
+                        content_latex=latex[:bounds[1]], is_appendix=chapter.is_appendix,
+                        is_draft=chapter.is_draft, source_spans=spans[0])
+        parts = [intro]
+        slugs = SlugAllocator(transliterator=self.transliterator)
+        for i, (start, title) in enumerate(sections, start=1):
+            slug = slugs.allocate(title, fallback=f"section-{i}")
+            parts.append(Chapter(number=chapter.number, title=title, slug=slug, filename=f"{folder}/{i:02d}-{slug}.md",
+                                 content_latex=latex[start:bounds[i + 1]], is_appendix=chapter.is_appendix,
+                                 is_draft=chapter.is_draft, source_spans=spans[i], parent=chapter.filename))
+        return parts
+
+    def _part_spans(self, chapter: Chapter, count: int) -> Optional[List[List[SourceSpan]]]:
+        """Source spans of the intro and each of the count sections of a chapter, or None if unknown.
+
+        Sections are located again in the chapter's range of the flattened
+        source (read again when the book was parsed elsewhere, e.g. by the
+        wizard), since normalization may have shifted offsets in content_latex.
+        """
+        if chapter.source_range is None:
+            return None
+        if self.parser.content is None:
+            self.parser.flatten()
+        start, end = chapter.source_range
+        sections = find_sections(self.parser.content[start:end])
+        if len(sections) != count:
+            return None
+        bounds = [start] + [start + offset for offset, _ in sections] + [end]
+        return [self.parser.source_spans(lo, hi) for lo, hi in zip(bounds, bounds[1:])]
+
+    def units(self) -> List[Chapter]:
+        """The chapters as converted and written: a split chapter counts as its intro and section pages."""
+        units = []
+        for chapter in self.book.chapters + self.book.appendices:
+            units += self.parts.get(chapter.filename, [chapter])
+        return units
+
+    def planned_outputs(self) -> List[Dict[str, str]]:
+        """Lists the files a run would produce, as {type, target} dicts. Requires plan()."""
+        outputs = []
+
+        def add(type: str, path: Path):
+            outputs.append({"type": type, "target": path.relative_to(self.output_root).as_posix()})
+
+        for type, path, _ in self._pages():
+            add(type, path)
+
+        seen = set()
+        for chapter in self.book.chapters + self.book.appendices:
+            for img in chapter.images:
+                if img.output_path not in seen:
+                    seen.add(img.output_path)
+                    add("image", img.output_path)
+
+        if self.source_pdf:
+            add("pdf", self.content_dir / "book.pdf")
+        return outputs
+
+    def plan_changes(self) -> List[Dict[str, str]]:
+        """Predicts what a run would do, without running pandoc or writing anything.
+
+        Returns {type, target, status} dicts, where status is 'create',
+        'update', 'delete' or 'unchanged'. Pages are rendered from the
+        conversion cache and compared with the previous manifest (or the file
+        on disk); a chapter missing from the cache has changed LaTeX and is
+        reported as 'update' (or 'create'). Cache keys use the pandoc version
+        the last run recorded, so pandoc is never started. Parses unless a
+        book was given.
+        """
+        if self.book is None:
+            self.parse()
+        if self.normalize:
+            self.normalize_text()
+        self.plan()
+        recorded = self.manifest.previous_data.get("metadata", {}).get("pandoc")
+        # Without a recorded version no cache entry can be trusted: every page counts as changed
+        self.converter = MarkdownConverter(self.book, self.cache if recorded is not None else None,
+                                           pandoc=recorded or "")
+
+        changes = []
+
+        def add(type: str, path: Path, current: bool):
+            target = path.relative_to(self.output_root).as_posix()
+            if current:
+                status = "unchanged"
+            else:
+                status = "update" if target in self.previous or path.exists() else "create"
+            changes.append({"type": type, "target": target, "status": status})
+
+        seen = set()
+        for chapter in self.book.chapters + self.book.appendices:
+            for img in chapter.images:
+                if img.output_path not in seen:
+                    seen.add(img.output_path)
+                    add("image", img.output_path, self.copier.is_current(img.original_path, img.output_path))
+
+        cached = {ch.filename: self.converter.convert_chapter(ch, cached_only=True) for ch in self.units()}
+        for type, path, chapter in self._pages():
+            if chapter is not None and not cached[chapter.filename]:
+                add(type, path, False)
+                continue
+            data = self._page_text(type, chapter).encode("utf-8")
+            add(type, path, self.writer.is_current(path, data, hash_bytes(data)))
+
+        if self.source_pdf:
+            target_pdf = self.content_dir / "book.pdf"
+            add("pdf", target_pdf, self.copier.is_current(self.source_pdf, target_pdf))
+
+        planned = {change["target"] for change in changes}
+        for target, entry in self.previous.items():
+            if target not in planned and self.prune != "off":
+                changes.append({"type": entry.get("type", ""), "target": target, "status": "delete"})
+        return changes
+
+    def _index_labels(self):
+        """Records the output file that defines each label, so references can link across pages."""
+        for chapter in self.units():
+            for key in LABEL_PATTERN.findall(chapter.content_latex):
+                label = self.book.label_registry.get(key)
+                if not label:
+                    continue
+                label.file = chapter.filename
+                if label.label_type == "unknown":
+                    label.label_type = LABEL_TYPES.get(key.split(":")[0], "unknown")
+                chapter.labels[key] = label.label_type
+
+    def _content_dir(self) -> Path:
+        if (self.book.metadata.type or "Book") == "Book":
+            return self.output_root / "src" / "content" / "books" / self.book.metadata.lang / self.book.metadata.slug
+        return self.output_root / "src" / "content" / "articles" / self.book.metadata.lang
+
+    def _find_source_pdf(self) -> Optional[Path]:
+        """Picks the PDF to publish: the one built from main.tex, else the newest PDF in the source dir."""
+        matching = self.main_tex.with_suffix(".pdf")
+        if matching.is_file():
+            return matching
+        candidates = sorted(self.main_tex.parent.glob("*.pdf"), key=lambda p: (p.stat().st_mtime_ns, p.name))
+        return candidates[-1] if candidates else None
+
+    def _publish_image(self, img: ImageInfo) -> Optional[Dict[str, Any]]:
+        """Copies a figure and returns its manifest entry with the LQIP placeholder."""
+        if not self.img_processor.process_image(img):
+            return None
+        record = self.img_processor.records[str(img.output_path)]
+        placeholder = self.placeholders.generate(img.original_path, record["hash"]) or {}
+        return self._entry("image", img.output_path, [{"file": self._source_name(img.original_path)}],
+                           **record, **placeholder)
+
+    def _pages(self) -> List[Tuple[str, Path, Optional[Chapter]]]:
+        """The text pages of the book as (type, path, chapter) tuples."""
+        if (self.book.metadata.type or "Book") == "Book":
+            pages = [("overview", self.content_dir / "index.md", None)]
+            for type, chapters in (("chapter", self.book.chapters), ("appendix", self.book.appendices)):
+                for ch in chapters:
+                    intro, *sections = self.parts.get(ch.filename, [ch])
+                    pages.append((type, self.content_dir / ch.filename, intro))
+                    pages += [("section", self.content_dir / part.filename, part) for part in sections]
+            return pages
+        # Article or Markdown: Single File
+        first = self.book.chapters[0] if self.book.chapters else None
+        return [("article", self.content_dir / f"{self.book.metadata.slug}.md", first)]
+
+    def _page_text(self, type: str, chapter: Optional[Chapter]) -> str:
+        if type == "overview":
+            return self.render_index()
+        if chapter is None:
+            return self.render_article()
+        chapter.content_markdown = self.img_processor.rewrite_markdown(chapter.content_markdown, chapter.images)
+        return self.render_article() if type == "article" else self.render_chapter(chapter)
+
+    def _write_page(self, type: str, path: Path, chapter: Optional[Chapter]) -> Dict[str, Any]:
+        text = self._page_text(type, chapter)
+        if type == "overview":
+            return self._write(type, path, text, [{"file": self._source_name(self.main_tex)}])
+        if chapter is None:
+            return self._write(type, path, text)
+        return self._write(type, path, text, [asdict(span) for span in chapter.source_spans],
+                           engine=chapter.engine, conversion_time=chapter.conversion_time)
+
+    def prune_stale_outputs(self, current: Optional[Set[str]] = None):
+        """Deletes (or moves to the trash dir) files the previous manifest listed but this run did not produce."""
+        if self.prune == "off":
+            return
+        if current is None:
+            current = set(self.manifest.targets())
+        stale = [target for target in self.previous if target not in current]
+        trash_dir = cache_dir(self.output_root) / "trash" / datetime.now().strftime("%Y%m%d-%H%M%S")
+        root = self.output_root.resolve()
+
+        for target in stale:
+            path = self.output_root / target
+            # Never touch anything outside the output root, whatever the manifest says
+            if root not in path.resolve().parents or not path.is_file():
+                continue
+            if self.prune == "trash":
+                destination = trash_dir / target
+                make_dirs(destination.parent)
+                shutil.move(str(path), str(destination))
+            else:
+                path.unlink()
+            self.pruned.append(target)
+            remove_empty_dirs(path.parent, self.output_root)
+
+    def render_index(self) -> str:
+        """Renders the book overview page (index.md)."""
+        index_fm = self.converter.generate_frontmatter_from_metadata(self.book.metadata)
+        return index_fm + "\n\n# " + self.book.metadata.title + "\n"
+
+    def render_chapter(self, chapter: Chapter) -> str:
+        """Renders a chapter or appendix page; the page of a split chapter ends with links to its sections."""
+        text = self.converter.generate_frontmatter(chapter) + "\n\n" + chapter.content_markdown
+        if not chapter.parent and chapter.filename in self.parts:
+            # Section pages are served below the chapter page: /books/<slug>/<chapter>/<section>/
+            folder = chapter.filename[:-3] + "/"
+            links = [f"- [{part.title}](./{part.filename[len(folder):-3]}/)" for part in self.parts[chapter.filename][1:]]
+            text = text.rstrip("\n") + "\n\n" + "\n".join(links) + "\n"
+        return text
+
+    def render_article(self) -> str:
+        """Renders the single page used for Article and Markdown content."""
+        # We can use the same frontmatter generator for articles for now, 
+        # or refine it if schemas differ significantly.
+        fm = self.converter.generate_frontmatter_from_metadata(self.book.metadata)
+        # Add the content (assuming it's in the first chapter for single-file types)
+        content = self.book.chapters[0].content_markdown if self.book.chapters else ""
+        return fm + "\n\n" + content
+
+    def _write(self, type: str, path: Path, text: str, sources: List[Dict[str, Any]] = None,
+               **extra: Any) -> Dict[str, Any]:
+        """Writes a generated file through the incremental writer and returns its manifest entry."""
+        record = self.writer.write_text(path, text)
+        return self._entry(type, path, sources, **record, **extra)
+
+    def _entry(self, type: str, path: Path, sources: List[Dict[str, Any]] = None, **extra: Any) -> Dict[str, Any]:
+        """Builds the manifest entry of a file now in place, and checkpoints it in the journal."""
+        entry = {"type": type, "target": path.relative_to(self.output_root).as_posix(), "sources": sources, **extra}
+        self.journal.record("file", target=entry["target"], size=extra.get("size"),
+                            mtime_ns=extra.get("mtime_ns"), hash=extra.get("hash"))
+        return entry
+
+    def _source_name(self, path: Path) -> str:
+        """Returns a source path relative to the project directory where possible."""
+        try:
+            return path.relative_to(self.main_tex.parent).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _publish_pdf(self) -> Dict[str, Any]:
+        """Copies the PDF chosen during planning to the book folder (skipped when unchanged)."""
+        target_pdf = self.content_dir / "book.pdf"
+        record = self.copier.copy(self.source_pdf, target_pdf)
+        return self._entry("pdf", target_pdf, [{"file": self._source_name(self.source_pdf)}], **record)
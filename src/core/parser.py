@@ -1,7 +1,21 @@
+import copy
 import re
 from pathlib import Path
-from typing import List, Dict, Set, Optional
-from models.book import Book, BookMetadata, Chapter, ImageInfo, LabelInfo
+from typing import Any, Callable, List, Dict, Set, Optional, Tuple
+from models.book import Book, BookMetadata, Chapter, ImageInfo, LabelInfo, LabelRegistry, SourceSpan
+from utils.hashing import hash_text
+
+INCLUDE_PATTERN = re.compile(r'\\(?:input|include|subfile)\s*\{([^}]+)\}')
+CHAPTER_PATTERN = re.compile(r'\\chapter\*?\s*(?:\[[^\]]*\])?\s*\{[^}]+\}')
+DOCUMENT_PATTERN = re.compile(r'\\begin\s*\{document\}')
+# Where the body starts after \begin{document}: the first sectioning command or include
+BODY_PATTERN = re.compile(r'\\(?:part|chapter|section)\*?\s*[\[{]|' + INCLUDE_PATTERN.pattern)
+
+# Metadata of the last full parse of each main file, with the mtimes of every file it read
+_parsed_metadata: Dict[Path, Tuple[Dict[Path, int], BookMetadata]] = {}
+
+# Receives ('metadata', BookMetadata), ('file', relative path) and ('chapter', Chapter) while parsing
+ParseListener = Callable[[str, Any], None]
 
 class LatexParser:
     def __init__(self, main_file: Path):
@@ -9,11 +23,23 @@ class LatexParser:
         self.project_dir = main_file.parent
         self.book = Book(metadata=BookMetadata())
         self.processed_files: Set[Path] = set()
-        self.label_registry: Dict[str, LabelInfo] = {}
+        self.label_registry = LabelRegistry()
+        # Source map of the flattened content: (flat_start, flat_end, file, file_start)
+        self.segments: List[Tuple[int, int, Path, int]] = []
+        self.file_contents: Dict[Path, str] = {}
+        self.content: Optional[str] = None  # The flattened source, once read
+        self.listener: Optional[ParseListener] = None
+        self._front_matter_done = False
 
-    def parse(self) -> Book:
-        """Main entry point for parsing the LaTeX project."""
-        content = self._read_file_recursive(self.main_file)
+    def parse(self, listener: Optional[ParseListener] = None) -> Book:
+        """Main entry point for parsing the LaTeX project.
+
+        The optional listener sees results as soon as they are known: the
+        metadata of the main file before any include is read, every file as it
+        is read, then every chapter as it is split off.
+        """
+        self.listener = listener
+        content = self.flatten()
         
         # 1. Extract Metadata
         self._extract_metadata(content)
@@ -26,11 +52,101 @@ class LatexParser:
         
         # 4. Process Labels and References
         self._process_labels(content)
-        
+
+        self._remember_metadata()
         return self.book
 
-    def _read_file_recursive(self, file_path: Path) -> str:
-        """Reads a LaTeX file and recursively includes content from \\input, \\include, and \\subfile."""
+    def flatten(self) -> str:
+        """Reads the include graph into one string and records the hash of every file read."""
+        content = self.content = self._read_file_recursive(self.main_file)
+        self.book.source_dir = self.project_dir
+        self.book.source_files = {
+            self._relative(path): hash_text(text) for path, text in self.file_contents.items()
+        }
+        return content
+
+    def scan_metadata(self) -> BookMetadata:
+        """Fast path for metadata only: reads the preamble and front matter, not the body.
+
+        The preamble is read up to \\begin{document}, following its includes.
+        Past that point only the rest of the same file is looked at, up to the
+        first sectioning command or include, which is where the abstract and
+        \\keywords live; no include of the body is read. Files without
+        \\begin{document} are read up to their first \\chapter. If this
+        project was fully parsed before and none of its files changed since,
+        that parse's metadata is returned without reading anything.
+        """
+        cached = _parsed_metadata.get(self.main_file.resolve())
+        if cached and all(self._mtime(path) == mtime for path, mtime in cached[0].items()):
+            return copy.deepcopy(cached[1])
+
+        self._extract_metadata(self._read_front_matter(self.main_file))
+        return self.book.metadata
+
+    def _read_front_matter(self, file_path: Path) -> str:
+        if self._front_matter_done or file_path in self.processed_files:
+            return ""
+        self.processed_files.add(file_path)
+        if not file_path.exists() and not file_path.suffix:
+            file_path = file_path.with_suffix('.tex')
+        content = self._read_text(file_path)
+        if content is None:
+            return ""
+
+        lookahead = ""
+        end = DOCUMENT_PATTERN.search(content)
+        if end:
+            body = BODY_PATTERN.search(content, end.end())
+            lookahead = content[end.start():body.start() if body else len(content)]
+        else:
+            end = CHAPTER_PATTERN.search(content)
+        if end:
+            content = content[:end.start()]
+
+        pieces = []
+        pos = 0
+        for match in INCLUDE_PATTERN.finditer(content):
+            pieces.append(content[pos:match.start()])
+            pieces.append(self._read_front_matter(self.project_dir / match.group(1)))
+            pos = match.end()
+        pieces.append(content[pos:])
+        pieces.append(lookahead)
+        if end:
+            self._front_matter_done = True
+        return "".join(pieces)
+
+    def _remember_metadata(self):
+        mtimes = {path: self._mtime(path) for path in self.file_contents}
+        _parsed_metadata[self.main_file.resolve()] = (mtimes, copy.deepcopy(self.book.metadata))
+
+    @staticmethod
+    def _mtime(path: Path) -> int:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return -1
+
+    @staticmethod
+    def _read_text(file_path: Path) -> Optional[str]:
+        """Reads a source file as UTF-8 (or UTF-16). Returns None if it cannot be read."""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except UnicodeDecodeError:
+            try:
+                with open(file_path, 'r', encoding='utf-16') as f:
+                    return f.read()
+            except Exception:
+                return None
+        except OSError:
+            return None
+
+    def _read_file_recursive(self, file_path: Path, flat_offset: int = 0) -> str:
+        """Reads a LaTeX file and recursively includes content from \\input, \\include, and \\subfile.
+
+        flat_offset is the position of this file's content in the flattened output;
+        it is used to record which file every part of the output came from.
+        """
         if file_path in self.processed_files:
             return f"% Circular include detected: {file_path}\n"
         
@@ -42,25 +158,60 @@ class LatexParser:
             if not file_path.exists():
                 return f"% File not found: {file_path}\n"
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            try:
-                with open(file_path, 'r', encoding='utf-16') as f:
-                    content = f.read()
-            except Exception:
-                return f"% Error reading file: {file_path}\n"
+        content = self._read_text(file_path)
+        if content is None:
+            return f"% Error reading file: {file_path}\n"
 
-        # Regex for includes
-        include_pattern = re.compile(r'\\(?:input|include|subfile)\s*\{([^}]+)\}')
-        
-        def replace_include(match):
-            inc_filename = match.group(1)
-            inc_path = self.project_dir / inc_filename
-            return self._read_file_recursive(inc_path)
+        self.file_contents[file_path] = content
+        if self.listener:
+            self.listener("file", self._relative(file_path))
+            if file_path == self.main_file:
+                # Title and author normally live in the main file: report them before the includes are read
+                self._extract_metadata(content)
+                self.listener("metadata", self.book.metadata)
+
+        pieces = []
+        pos = 0
+        length = flat_offset
+        for match in INCLUDE_PATTERN.finditer(content):
+            chunk = content[pos:match.start()]
+            self.segments.append((length, length + len(chunk), file_path, pos))
+            pieces.append(chunk)
+            length += len(chunk)
+
+            inc_path = self.project_dir / match.group(1)
+            included = self._read_file_recursive(inc_path, length)
+            pieces.append(included)
+            length += len(included)
+            pos = match.end()
 
-        return include_pattern.sub(replace_include, content)
+        tail = content[pos:]
+        self.segments.append((length, length + len(tail), file_path, pos))
+        pieces.append(tail)
+        return "".join(pieces)
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.project_dir).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def source_spans(self, start: int, end: int) -> List[SourceSpan]:
+        """Maps a range of the flattened content back to file line ranges."""
+        spans = []
+        for seg_start, seg_end, path, file_start in self.segments:
+            lo, hi = max(start, seg_start), min(end, seg_end)
+            if lo >= hi:
+                continue
+            text = self.file_contents[path]
+            first = file_start + (lo - seg_start)
+            last = file_start + (hi - seg_start) - 1
+            spans.append(SourceSpan(
+                file=self._relative(path),
+                start_line=text.count('\n', 0, first) + 1,
+                end_line=text.count('\n', 0, last) + 1
+            ))
+        return spans
 
     def _extract_metadata(self, content: str):
         """Extracts title, author, date, abstract, and keywords."""
@@ -87,56 +238,53 @@ class LatexParser:
 
     def _extract_graphics_path(self, content: str):
         """Extracts graphicspath from the LaTeX project."""
-        # Simple extraction, can be improved to handle multiple paths
-        match = re.search(r'\\graphicspath\s*\{\{([^}]+)\}\}', content)
+        match = re.search(r'\\graphicspath\s*\{((?:\{[^}]*\})+)\}', content)
         if match:
-            # TODO: Store graphics paths for image searching
-            pass
+            self.book.graphics_paths = re.findall(r'\{([^}]*)\}', match.group(1))
 
     def _split_chapters(self, content: str):
         """Splits the content into chapters and appendices."""
         # Split by \appendix if present
-        parts = re.split(r'\\appendix', content, maxsplit=1)
-        main_content = parts[0]
-        appendix_content = parts[1] if len(parts) > 1 else ""
+        appendix_match = re.search(r'\\appendix', content)
+        main_end = appendix_match.start() if appendix_match else len(content)
         
         # 1. Process Chapters
-        self._process_section_type(main_content, is_appendix=False)
+        self._process_section_type(content, 0, main_end, is_appendix=False)
         
         # 2. Process Appendices
-        if appendix_content:
-            self._process_section_type(appendix_content, is_appendix=True)
+        if appendix_match:
+            self._process_section_type(content, appendix_match.end(), len(content), is_appendix=True)
 
-    def _process_section_type(self, content: str, is_appendix: bool):
-        """Helper to extract chapters/appendices from a string section."""
+    def _process_section_type(self, content: str, start: int, end: int, is_appendix: bool):
+        """Helper to extract chapters/appendices from a range of the content."""
         # Support \chapter and \chapter*
-        parts = re.split(r'(\\chapter\*?\s*(?:\[[^\]]*\])?\s*\{[^}]+\})', content)
-        chapter_idx = 1
+        matches = list(CHAPTER_PATTERN.finditer(content, start, end))
         
-        for i in range(1, len(parts), 2):
-            chapter_cmd = parts[i]
-            chapter_content = parts[i+1] if i+1 < len(parts) else ""
+        for chapter_idx, match in enumerate(matches, start=1):
+            chapter_cmd = match.group(0)
+            content_end = matches[chapter_idx].start() if chapter_idx < len(matches) else end
+            chapter_content = content[match.end():content_end]
             
             title_match = re.search(r'\{([^}]+)\}', chapter_cmd)
             title = title_match.group(1) if title_match else f"{'Appendix' if is_appendix else 'Chapter'} {chapter_idx}"
             
-            # Use letters for appendices (A, B, C)
-            number_val = chr(64 + chapter_idx) if is_appendix else chapter_idx
-            
             chapter = Chapter(
                 number=chapter_idx,
                 title=title,
                 slug="", # Will be set by Orchestrator or MetadataStep
                 filename="",
                 content_latex=chapter_content,
-                is_appendix=is_appendix
+                is_appendix=is_appendix,
+                source_spans=self.source_spans(match.start(), content_end),
+                source_range=(match.end(), content_end)
             )
             
             if is_appendix:
                 self.book.appendices.append(chapter)
             else:
                 self.book.chapters.append(chapter)
-            chapter_idx += 1
+            if self.listener:
+                self.listener("chapter", chapter)
 
     def _process_labels(self, content: str):
         """Extracts all \\label definitions and builds a registry."""
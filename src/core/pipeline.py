@@ -0,0 +1,153 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from core.progress import CancellationToken, ConversionCancelled
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[], Any]
+    deps: List[str] = field(default_factory=list)
+    kind: str = ""  # Groups stages for timing totals ('convert', 'image', 'write', ...)
+    status: str = "pending"  # 'pending', 'running', 'done', 'failed', 'skipped' or 'cancelled'
+    listener: Optional[Callable[["Stage"], None]] = None  # Called when the stage starts and ends
+    result: Any = None
+    error: Optional[BaseException] = None
+    start: float = 0.0
+    end: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return max(self.end - self.start, 0.0)
+
+class StagePipeline:
+    """Runs a DAG of named stages, each as soon as its dependencies are done.
+
+    Stages run on a thread pool (pandoc and file I/O release the GIL, so
+    independent work overlaps). A failed stage skips its dependents but not
+    unrelated stages, so one broken book does not stop a whole library.
+    Once the cancellation token fires no new stage starts. After a run,
+    critical_path() names the chain of stages that decided the total
+    wall-clock time.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Stage] = {}
+        self.started = 0.0
+        self.finished = 0.0
+        self.token: Optional[CancellationToken] = None
+
+    def add(self, name: str, func: Callable[[], Any], deps: Iterable[str] = (), kind: str = "",
+            listener: Optional[Callable[[Stage], None]] = None) -> str:
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        self.stages[name] = Stage(name, func, list(deps), kind or name.split(":")[0], listener=listener)
+        return name
+
+    def run(self, executor: Optional[Executor] = None, workers: int = 4,
+            token: Optional[CancellationToken] = None) -> "StagePipeline":
+        self.token = token
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stage(s): {', '.join(missing)}")
+
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                self._schedule(pool)
+        else:
+            self._schedule(executor)
+        return self
+
+    def _schedule(self, executor: Executor):
+        self.started = time.perf_counter()
+        pending = dict(self.stages)
+        running: Dict[Future, Stage] = {}
+
+        try:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    states = [self.stages[dep].status for dep in stage.deps]
+                    if self.token is not None and self.token.cancelled:
+                        stage.status = "cancelled"
+                        del pending[name]
+                    elif any(state in ("failed", "skipped", "cancelled") for state in states):
+                        stage.status = "skipped"
+                        del pending[name]
+                    elif all(state == "done" for state in states):
+                        running[executor.submit(self._run_stage, stage)] = stage
+                        del pending[name]
+
+                if not running:
+                    if pending:
+                        raise ValueError(f"Dependency cycle between stages: {', '.join(sorted(pending))}")
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+        except KeyboardInterrupt:
+            # Stop in-flight pandoc processes so the pool can shut down promptly
+            if self.token is not None:
+                self.token.cancel()
+            raise
+        self.finished = time.perf_counter()
+
+    def _run_stage(self, stage: Stage):
+        if self.token is not None and self.token.cancelled:
+            stage.status = "cancelled"
+            return
+        stage.start = time.perf_counter()
+        stage.status = "running"
+        if stage.listener:
+            stage.listener(stage)
+        try:
+            stage.result = stage.func()
+            stage.status = "done"
+        except ConversionCancelled:
+            stage.status = "cancelled"
+        except BaseException as e:
+            stage.error = e
+            stage.status = "failed"
+        finally:
+            stage.end = time.perf_counter()
+        if stage.listener:
+            stage.listener(stage)
+
+    def failures(self, prefix: str = "") -> List[Stage]:
+        return [s for s in self.stages.values() if s.status == "failed" and s.name.startswith(prefix)]
+
+    def raise_failures(self, prefix: str = ""):
+        """Raises ConversionCancelled after a cancelled run, else the error of the first failed stage."""
+        if self.token is not None:
+            self.token.check()
+        failed = self.failures(prefix)
+        if failed:
+            raise failed[0].error
+
+    def timings(self, prefix: str = "") -> Dict[str, float]:
+        """Total busy time per stage kind, plus the wall-clock time of the run."""
+        totals: Dict[str, float] = {}
+        for stage in self.stages.values():
+            if stage.status == "done" and stage.name.startswith(prefix):
+                totals[stage.kind] = totals.get(stage.kind, 0.0) + stage.duration
+        timings = {kind: round(seconds, 4) for kind, seconds in totals.items()}
+        if self.finished:
+            timings["wall"] = round(self.finished - self.started, 4)
+        return timings
+
+    def critical_path(self, last: Optional[str] = None) -> List[Stage]:
+        """The chain of stages ending at `last` (default: the last to finish), each gated by its latest dependency."""
+        done = [s for s in self.stages.values() if s.status == "done"]
+        if last is not None:
+            done = [s for s in done if s.name == last]
+        if not done:
+            return []
+        path = [max(done, key=lambda s: s.end)]
+        while True:
+            deps = [self.stages[dep] for dep in path[-1].deps if self.stages[dep].status == "done"]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda s: s.end))
+        path.reverse()
+        return path
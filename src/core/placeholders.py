@@ -0,0 +1,57 @@
+import base64
+import io
+from pathlib import Path
+from typing import Any, Dict, Optional
+from core.cache import JsonCache
+
+class PlaceholderGenerator:
+    """Builds tiny blurred placeholders (LQIP) for published figures.
+
+    Placeholders are cached by the SHA-256 of the source image, so an
+    unchanged figure is never decoded twice.
+    """
+
+    def __init__(self, cache_path: Path, max_size: int = 16, blur_radius: float = 1.0):
+        self.cache = JsonCache(cache_path)
+        self.max_size = max_size
+        self.blur_radius = blur_radius
+
+    def generate(self, path: Path, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Returns the placeholder for one image, decoding it only on a cache miss."""
+        cached = self.cache.get(file_hash)
+        if cached:
+            return cached
+        placeholder = self._generate(path)
+        if placeholder:
+            self.cache.set(file_hash, placeholder)
+        return placeholder
+
+    def _generate(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Decodes an image and returns its size plus a base64 data URI placeholder."""
+        try:
+            from PIL import Image, ImageFilter, features
+        except ImportError:
+            return None
+
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+                # Let the JPEG decoder downscale while decoding
+                img.draft("RGB", (self.max_size * 4, self.max_size * 4))
+                thumb = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+            thumb.thumbnail((self.max_size, self.max_size))
+            thumb = thumb.filter(ImageFilter.GaussianBlur(self.blur_radius))
+
+            fmt = "WEBP" if features.check("webp") else "PNG"
+            buffer = io.BytesIO()
+            thumb.save(buffer, format=fmt)
+        except Exception:
+            # PDF/EPS figures and unreadable files simply get no placeholder
+            return None
+
+        encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+        return {
+            "width": width,
+            "height": height,
+            "lqip": f"data:image/{fmt.lower()};base64,{encoded}"
+        }
@@ -0,0 +1,86 @@
+import subprocess
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Optional, Set
+
+@dataclass
+class ProgressEvent:
+    """One progress report from a running conversion.
+
+    kind is one of 'stage_started', 'stage_finished', 'chapter_converted',
+    'file_written' or 'warning'. current/total count chapters for
+    'chapter_converted'; bytes is the running total of bytes written.
+    """
+    kind: str
+    stage: str = ""
+    message: str = ""
+    current: int = 0
+    total: int = 0
+    bytes: int = 0
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+class ConversionCancelled(Exception):
+    """Raised when a conversion stops because its CancellationToken was cancelled."""
+
+class CancellationToken:
+    """Lets another thread (a GUI button, a signal handler) stop a conversion.
+
+    Work checks the token between units (chapters, files), and cancel() also
+    kills any pandoc subprocess that is still running.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes: Set[subprocess.Popen] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                process.kill()
+            except OSError:
+                pass
+
+    def check(self):
+        """Raises ConversionCancelled if the token was cancelled."""
+        if self._event.is_set():
+            raise ConversionCancelled("Conversion cancelled")
+
+    @contextmanager
+    def track(self, process: subprocess.Popen):
+        """Registers a subprocess so cancel() can kill it while it runs."""
+        with self._lock:
+            self._processes.add(process)
+        try:
+            if self._event.is_set():
+                process.kill()
+            yield process
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+
+class ProgressReporter:
+    """Delivers events to a callback, one at a time, from any worker thread.
+
+    The callback runs on the worker thread; GUIs must hand events over to
+    their own thread (e.g. through a queue polled with after()).
+    """
+
+    def __init__(self, callback: Optional[ProgressCallback] = None):
+        self.callback = callback
+        self._lock = threading.Lock()
+
+    def emit(self, kind: str, **fields):
+        if self.callback is None:
+            return
+        with self._lock:
+            self.callback(ProgressEvent(kind, **fields))
@@ -0,0 +1,107 @@
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+from core.parser import LatexParser
+from models.book import Book, BookMetadata, Chapter, ImageInfo, LabelRegistry, SourceSpan
+from utils.hashing import hash_text
+
+# Bump when the snapshot layout changes; older snapshots are then ignored
+SNAPSHOT_VERSION = 2
+
+def snapshot_path(main_tex: Path) -> Path:
+    """The snapshot of a project lives next to its main file: main.tex -> .main.tex.session.json."""
+    return main_tex.with_name(f".{main_tex.name}.session.json")
+
+class BookSnapshot:
+    """Saves a parsed and reviewed Book next to its source, to resume a wizard session.
+
+    The snapshot keeps everything the user may have changed (metadata,
+    chapter order, draft flags) but no chapter text: each chapter is stored
+    as its range in the flattened source plus the hash of that range. Loading
+    reads the include graph again, without splitting chapters or scanning
+    labels, and the snapshot is ignored as soon as the hash of any file in
+    the include graph differs from the one recorded.
+    """
+
+    def __init__(self, main_tex: Path):
+        self.main_tex = main_tex
+        self.path = snapshot_path(main_tex)
+
+    def save(self, book: Book) -> bool:
+        """Writes the snapshot. Returns False for books that do not come from a LaTeX include graph."""
+        chapters = book.chapters + book.appendices
+        if not book.source_files or any(ch.source_range is None for ch in chapters):
+            return False
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "source_files": book.source_files,
+            "metadata": asdict(book.metadata),
+            "graphics_paths": book.graphics_paths,
+            "labels": book.label_registry.to_columns(),
+            "images": {key: self._image_data(img) for key, img in book.images.items()},
+            "chapters": [self._chapter_data(ch) for ch in book.chapters],
+            "appendices": [self._chapter_data(ch) for ch in book.appendices],
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+        return True
+
+    def load(self) -> Optional[Book]:
+        """Returns the saved Book, or None if there is no snapshot or the sources changed since."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return None
+
+        parser = LatexParser(self.main_tex)
+        content = parser.flatten()
+        book = parser.book
+        if book.source_files != data["source_files"]:
+            return None
+        try:
+            book.metadata = BookMetadata(**data["metadata"])
+            book.graphics_paths = data["graphics_paths"]
+            book.label_registry = LabelRegistry.from_columns(data["labels"])
+            book.images = {key: self._image(img) for key, img in data["images"].items()}
+            book.chapters = [self._chapter(ch, content) for ch in data["chapters"]]
+            book.appendices = [self._chapter(ch, content) for ch in data["appendices"]]
+        except (KeyError, TypeError, ValueError):
+            return None
+        return book
+
+    def _chapter_data(self, chapter: Chapter) -> Dict[str, Any]:
+        data = asdict(chapter)
+        del data["content_latex"], data["content_markdown"]
+        data["images"] = [self._image_data(img) for img in chapter.images]
+        data["latex_hash"] = hash_text(chapter.content_latex)
+        return data
+
+    def _chapter(self, data: Dict[str, Any], content: str) -> Chapter:
+        data = dict(data)
+        start, end = data.pop("source_range")
+        latex = content[start:end]
+        if hash_text(latex) != data.pop("latex_hash"):
+            # Hashes of the files matched, so this only happens with a hand-edited snapshot
+            raise ValueError("Chapter text does not match the snapshot")
+        data["images"] = [self._image(img) for img in data["images"]]
+        data["source_spans"] = [SourceSpan(**span) for span in data["source_spans"]]
+        return Chapter(**data, content_latex=latex, source_range=(start, end))
+
+    @staticmethod
+    def _image_data(img: ImageInfo) -> Dict[str, Any]:
+        data = asdict(img)
+        data["original_path"] = str(img.original_path)
+        data["output_path"] = str(img.output_path)
+        return data
+
+    @staticmethod
+    def _image(data: Dict[str, Any]) -> ImageInfo:
+        return ImageInfo(**{**data, "original_path": Path(data["original_path"]),
+                            "output_path": Path(data["output_path"])})
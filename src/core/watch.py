@@ -0,0 +1,144 @@
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+from core.cache import ConversionCache, cache_dir
+from core.orchestrator import ConversionOrchestrator
+from core.placeholders import PlaceholderGenerator
+from core.progress import ProgressCallback, ProgressReporter
+from models.book import Book, Chapter
+
+REF_PATTERN = re.compile(r'\\ref\s*\{([^}]+)\}')
+
+class WatchSession:
+    """Re-converts only the chapters affected by edits while authors work.
+
+    Every file in the include graph and every published figure is polled for
+    mtime changes. A burst of saves is debounced into one rebuild. A rebuild
+    re-parses the project (cheap), then re-converts only the chapters whose
+    flattened LaTeX changed, plus chapters that \\ref a label whose page moved.
+    All other chapters reuse the previous markdown, and the incremental writer
+    skips their files. Changed figures are re-copied by the image stage.
+    """
+
+    def __init__(self, main_tex: Path, output_root: Path, interval: float = 0.2, debounce: float = 0.3,
+                 configure: Optional[Callable[[Book], None]] = None,
+                 on_rebuild: Optional[Callable[[List[Chapter], float], None]] = None, prune: str = "delete",
+                 transliterator: Optional[Callable[[str], str]] = None, normalize: bool = False,
+                 split_size: int = 0, progress: Optional[ProgressCallback] = None):
+        self.main_tex = main_tex
+        self.output_root = output_root
+        self.interval = interval
+        self.debounce = debounce
+        self.configure = configure  # Applies metadata overrides after every parse
+        self.on_rebuild = on_rebuild
+        self.prune = prune
+        self.transliterator = transliterator  # Shared by every rebuild, so its memo is kept
+        self.normalize = normalize
+        self.split_size = split_size
+        self.progress = progress  # Receives the orchestrators' events and failed rebuilds as warnings
+        self.reporter = ProgressReporter(progress)
+        self.cache = ConversionCache(cache_dir(output_root) / "conversions")
+        self.placeholders = PlaceholderGenerator(cache_dir(output_root) / "placeholders.json")
+        self.orchestrator: Optional[ConversionOrchestrator] = None
+        self.mtimes: Dict[Path, int] = {}
+        self.stop_event = threading.Event()
+
+    def _new_orchestrator(self) -> ConversionOrchestrator:
+        orchestrator = ConversionOrchestrator(self.main_tex, self.output_root, prune=self.prune,
+                                              cache=self.cache, placeholders=self.placeholders,
+                                              transliterator=self.transliterator, normalize=self.normalize,
+                                              split_size=self.split_size, progress=self.progress)
+        orchestrator.parse()
+        if self.configure:
+            self.configure(orchestrator.book)
+        return orchestrator
+
+    def watched_files(self) -> Set[Path]:
+        """The include graph of the last build plus every figure it published."""
+        files = {self.main_tex}
+        if self.orchestrator and self.orchestrator.book:
+            book = self.orchestrator.book
+            files.update(self.main_tex.parent / rel for rel in book.source_files)
+            for chapter in book.chapters + book.appendices:
+                files.update(img.original_path for img in chapter.images)
+        return files
+
+    def _scan(self) -> Dict[Path, int]:
+        mtimes = {}
+        for path in self.watched_files():
+            try:
+                mtimes[path] = path.stat().st_mtime_ns
+            except OSError:
+                mtimes[path] = -1
+        return mtimes
+
+    def poll(self) -> Set[Path]:
+        """Returns the watched files whose mtime changed since the last poll."""
+        current = self._scan()
+        changed = {path for path in current.keys() | self.mtimes.keys() if current.get(path) != self.mtimes.get(path)}
+        self.mtimes = current
+        return changed
+
+    def build(self):
+        """Runs a full conversion and starts tracking its files."""
+        self.orchestrator = self._new_orchestrator()
+        self.orchestrator.run()
+        self.mtimes = self._scan()
+
+    def rebuild(self) -> List[Chapter]:
+        """Re-converts the chapters affected by the last edits. Returns those chapters."""
+        start = time.perf_counter()
+        previous = self.orchestrator
+        orchestrator = self._new_orchestrator()
+        orchestrator.prepare()
+        book = orchestrator.book
+
+        old_chapters = {ch.filename: ch for ch in previous.units()}
+        old_pages = {key: label.file for key, label in previous.book.label_registry.items()}
+        moved = {key for key, label in book.label_registry.items() if old_pages.get(key) != label.file}
+
+        rebuilt = []
+        for chapter in orchestrator.units():
+            old = old_chapters.get(chapter.filename)
+            refs_moved = bool(moved.intersection(REF_PATTERN.findall(chapter.content_latex)))
+            if old is None or refs_moved or old.content_latex != chapter.content_latex:
+                orchestrator.converter.convert_chapter(chapter)
+                rebuilt.append(chapter)
+            else:
+                chapter.content_markdown = old.content_markdown
+                chapter.description = old.description
+                chapter.engine = old.engine
+                chapter.conversion_time = old.conversion_time
+
+        orchestrator.finish()
+        self.orchestrator = orchestrator
+        self.mtimes = self._scan()
+        if self.on_rebuild:
+            self.on_rebuild(rebuilt, time.perf_counter() - start)
+        return rebuilt
+
+    def run(self):
+        """Builds once, then rebuilds on every (debounced) change until stop() is called."""
+        self.build()
+        while not self.stop_event.is_set():
+            if not self.poll():
+                self.stop_event.wait(self.interval)
+                continue
+
+            # Wait for a quiet period so a burst of saves triggers a single rebuild
+            deadline = time.monotonic() + self.debounce
+            while time.monotonic() < deadline and not self.stop_event.is_set():
+                self.stop_event.wait(self.interval)
+                if self.poll():
+                    deadline = time.monotonic() + self.debounce
+
+            try:
+                self.rebuild()
+            except Exception as e:
+                # Keep watching; the author is probably mid-edit
+                self.reporter.emit("warning", stage="rebuild", message=f"Rebuild failed: {e}")
+
+    def stop(self):
+        self.stop_event.set()
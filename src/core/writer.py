@@ -0,0 +1,77 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from utils.hashing import hash_bytes
+
+def remove_empty_dirs(directory: Path, root: Path):
+    """Removes directory and its parents while they are empty, stopping at root."""
+    while directory != root and root in directory.parents:
+        try:
+            directory.rmdir()
+        except OSError:
+            return
+        directory = directory.parent
+
+class OutputWriter:
+    """Writes generated text files, skipping files whose content is unchanged.
+
+    Changed files are written to a temporary file in the same directory and
+    renamed into place, so readers never observe a half-written file.
+    """
+
+    def __init__(self, output_root: Path, previous: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.output_root = output_root
+        self.previous = previous or {}
+        self.stats = {"written": 0, "skipped": 0}
+        self.bytes_written = 0
+        self.lock = threading.Lock()  # Pipeline stages write files from worker threads
+
+    def write_text(self, path: Path, text: str) -> Dict[str, Any]:
+        """Writes text to path if it differs from what is there. Returns the file's record."""
+        data = text.encode("utf-8")
+        content_hash = hash_bytes(data)
+
+        if self.is_current(path, data, content_hash):
+            with self.lock:
+                self.stats["skipped"] += 1
+        else:
+            self._atomic_write(path, data)
+            with self.lock:
+                self.stats["written"] += 1
+                self.bytes_written += len(data)
+
+        return {"size": len(data), "mtime_ns": path.stat().st_mtime_ns, "hash": content_hash}
+
+    def is_current(self, path: Path, data: bytes, content_hash: str) -> bool:
+        """True if path already holds data. Never writes, so plan mode can use it too."""
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        if st.st_size != len(data):
+            return False
+
+        # Trust the previous manifest when the file is untouched since it was recorded
+        key = path.relative_to(self.output_root).as_posix()
+        prev = self.previous.get(key)
+        if prev and prev.get("mtime_ns") == st.st_mtime_ns and prev.get("size") == st.st_size:
+            return prev.get("hash") == content_hash
+
+        return path.read_bytes() == data
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+        fd, tmp_name = tempfile.mkstemp(prefix="." + path.name + ".", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(tmp_name, mode)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
@@ -1,7 +1,11 @@
 import os
 import sys
+import time
 from pathlib import Path
 
+# Taken before the GUI toolkit is imported, for --benchmark
+_START = time.perf_counter()
+
 # Add the 'src' directory to sys.path to allow absolute imports of packages
 # This ensures that 'gui', 'core', 'models', etc. are found regardless of the working directory.
 src_dir = Path(__file__).resolve().parent.parent
@@ -10,11 +14,18 @@ if str(src_dir) not in sys.path:
 
 import customtkinter as ct
 from gui.wizard import ConversionWizard
-from gui.steps.analysis import AnalysisStep
-from gui.steps.metadata import MetadataStep
-from gui.steps.review import ReviewStep
-from gui.steps.repository import RepositoryStep
-from gui.steps.success import SuccessStep
+
+# Each step module is imported only when the step is first shown
+STEPS = [
+    "gui.steps.analysis:AnalysisStep",
+    "gui.steps.metadata:MetadataStep",
+    "gui.steps.review:ReviewStep",
+    "gui.steps.repository:RepositoryStep",
+    "gui.steps.success:SuccessStep",
+]
+
+# Modules that must not be loaded before the first window is shown
+HEAVY_MODULES = ("pypandoc", "PIL", "git.manager", "core.parser", "core.orchestrator")
 
 class LatexConverterApp(ct.CTk):
     def __init__(self):
@@ -36,8 +47,28 @@ class LatexConverterApp(ct.CTk):
         self.wizard.grid(row=0, column=0, sticky="nsew", padx=20, pady=20)
         
         # Add Steps
-        self.wizard.add_steps([AnalysisStep, MetadataStep, ReviewStep, RepositoryStep, SuccessStep])
+        self.wizard.add_steps(STEPS)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        self.wizard.save_session()
+        self.destroy()
+
+def benchmark() -> int:
+    """Builds the window, draws it once and reports the startup time, then exits."""
+    imported = time.perf_counter()
+    app = LatexConverterApp()
+    app.update()
+    shown = time.perf_counter()
+    print(f"imports:      {imported - _START:.3f}s")
+    print(f"first window: {shown - _START:.3f}s")
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"heavy modules loaded: {', '.join(loaded) if loaded else 'none'}")
+    app.destroy()
+    return 1 if loaded else 0
 
 if __name__ == "__main__":
+    if "--benchmark" in sys.argv[1:]:
+        sys.exit(benchmark())
     app = LatexConverterApp()
     app.mainloop()
@@ -1,8 +1,12 @@
 import customtkinter as ct
 from pathlib import Path
 from tkinter import filedialog
-from gui.wizard import WizardStep
-from core.parser import LatexParser
+from typing import TYPE_CHECKING
+from gui.tasks import BackgroundTask
+from gui.wizard import POLL_INTERVAL_MS, WizardStep
+
+if TYPE_CHECKING:
+    from core.parser import LatexParser
 
 class AnalysisStep(WizardStep):
     def __init__(self, master, wizard):
@@ -53,33 +57,82 @@ class AnalysisStep(WizardStep):
     def run_analysis(self, path: Path):
         content_type = self.content_type_var.get()
         self.status_box.insert("end", f"Analyzing {path.name} as {content_type}...\n")
+        self.wizard.context["book"] = None
+        self.wizard.context["main_tex"] = path
+        self.wizard.context["content_type"] = content_type
         
-        try:
-            if content_type == "Markdown":
+        if content_type == "Markdown":
+            try:
                 from models.book import Book, BookMetadata, Chapter
                 # Create a simple book structure for a single MD file
                 metadata = BookMetadata(title=path.stem, slug=path.stem)
                 content = path.read_text(encoding="utf-8")
                 chapter = Chapter(number=1, title=path.stem, slug=path.stem, filename=path.name, content_markdown=content)
-                book = Book(metadata=metadata, chapters=[chapter], source_dir=path.parent)
-            else:
-                from core.parser import LatexParser
-                parser = LatexParser(path)
-                book = parser.parse()
-            
-            self.wizard.context["main_tex"] = path
-            self.wizard.context["book"] = book
-            self.wizard.context["content_type"] = content_type
-            
-            self.status_box.insert("end", "✓ Analysis complete.\n")
-            self.status_box.insert("end", f"Title: {book.metadata.title}\n")
-            if content_type == "Book":
-                self.status_box.insert("end", f"Chapters found: {len(book.chapters)}\n")
-            else:
-                self.status_box.insert("end", "Content treated as single document.\n")
-                
-        except Exception as e:
-            self.status_box.insert("end", f"❌ Error: {str(e)}\n")
+                self._analysis_done(Book(metadata=metadata, chapters=[chapter], source_dir=path.parent), content_type)
+            except Exception as e:
+                self.status_box.insert("end", f"❌ Error: {str(e)}\n")
+            return
+
+        # Parse on a worker thread and stream its findings into the status box
+        from core.parser import LatexParser
+        parser = LatexParser(path)
+        self.wizard.context["analysis_running"] = True
+        self.browse_btn.configure(state="disabled")
+        task = BackgroundTask(lambda report: self._parse_worker(parser, report)).start()
+        self.after(POLL_INTERVAL_MS, lambda: self._poll_analysis(task, parser, content_type))
+
+    def _parse_worker(self, parser: "LatexParser", report):
+        """Runs on the worker thread; never touches widgets. Returns ('resumed' or 'done', book)."""
+        # A saved session of unchanged sources is resumed instead of parsed again
+        from core.snapshot import BookSnapshot
+        book = BookSnapshot(parser.main_file).load()
+        if book is not None:
+            return "resumed", book
+        parser.parse(listener=lambda kind, value: report((kind, value)))
+        return "done", parser.book
+
+    def _poll_analysis(self, task: BackgroundTask, parser: "LatexParser", content_type: str):
+        for kind, value in task.poll():
+            if kind == "metadata":
+                # Metadata is known: the user may move on while chapters are still being read
+                self.wizard.context["book"] = parser.book
+                self.status_box.insert("end", f"Title: {value.title}\n")
+                if value.author:
+                    self.status_box.insert("end", f"Author: {value.author}\n")
+            elif kind == "file":
+                self.status_box.insert("end", f"  read {value}\n")
+            elif kind == "chapter":
+                prefix = "Appendix" if value.is_appendix else "Chapter"
+                self.status_box.insert("end", f"  {prefix} {value.number}: {value.title}\n")
+            self.status_box.see("end")
+        if not task.finished:
+            self.after(POLL_INTERVAL_MS, lambda: self._poll_analysis(task, parser, content_type))
+        elif task.error is not None:
+            self.wizard.context["analysis_running"] = False
+            self.browse_btn.configure(state="normal")
+            self.status_box.insert("end", f"❌ Error: {str(task.error)}\n")
+        else:
+            kind, book = task.result
+            if kind == "resumed":
+                self.status_box.insert("end", "✓ Resumed the saved session (sources unchanged).\n")
+                self.content_type_var.set(book.metadata.type)
+                self.wizard.context["content_type"] = book.metadata.type
+                content_type = book.metadata.type
+            self._analysis_done(book, content_type)
+
+    def _analysis_done(self, book, content_type: str):
+        self.wizard.context["book"] = book
+        self.wizard.context["analysis_running"] = False
+        self.browse_btn.configure(state="normal")
+
+        self.status_box.insert("end", "✓ Analysis complete.\n")
+        self.status_box.insert("end", f"Title: {book.metadata.title}\n")
+        if content_type == "Book":
+            self.status_box.insert("end", f"Chapters found: {len(book.chapters)}\n")
+        else:
+            self.status_box.insert("end", "Content treated as single document.\n")
+        self.status_box.see("end")
+        self.wizard.notify_steps("analysis_done")
 
     def on_next(self) -> bool:
         if not self.wizard.context["book"]:
@@ -1,6 +1,8 @@
 import customtkinter as ct
 from gui.wizard import WizardStep
 
+AUTO_FILL_TEXT = "استخراج خودکار از متن (AI/Regex)"
+
 class MetadataStep(WizardStep):
     def __init__(self, master, wizard):
         super().__init__(master, wizard)
@@ -11,7 +13,7 @@ class MetadataStep(WizardStep):
         self.form_frame = ct.CTkScrollableFrame(self)
         self.form_frame.pack(fill="both", expand=True, padx=40, pady=10)
         
-        self.auto_btn = ct.CTkButton(self, text="استخراج خودکار از متن (AI/Regex)", command=self.auto_fill)
+        self.auto_btn = ct.CTkButton(self, text=AUTO_FILL_TEXT, command=self.auto_fill)
         self.auto_btn.pack(pady=10)
         
         self.fields = {}
@@ -35,18 +37,21 @@ class MetadataStep(WizardStep):
         self.fields[attr_name] = entry
 
     def auto_fill(self):
-        # Trigger smarter extraction
+        # Refresh metadata from the source: only the preamble is read (or the cached parse reused)
         main_tex = self.wizard.context.get("main_tex")
-        if main_tex:
+        book = self.wizard.context.get("book")
+        if main_tex and book and main_tex.suffix == ".tex":
             from core.parser import LatexParser
-            parser = LatexParser(main_tex)
-            # Re-parse to get fresh metadata from the source
-            parser.parse()
-            self.wizard.context["book"] = parser.book
+            scanned = LatexParser(main_tex).scan_metadata()
+            # Chapters and their review edits are kept; only source-derived fields are refreshed
+            for attr in ("title", "author", "description", "publish_date", "tags"):
+                value = getattr(scanned, attr)
+                if value:
+                    setattr(book.metadata, attr, value)
             # Refresh fields
             self.on_show()
 
-    def on_show(self):
+    def on_show(self, only_empty: bool = False):
         book = self.wizard.context.get("book")
         if not book: return
         
@@ -56,6 +61,9 @@ class MetadataStep(WizardStep):
             if isinstance(value, list):
                 value = ", ".join(value)
             
+            current = entry.get("0.0", "end-1c") if isinstance(entry, ct.CTkTextbox) else entry.get()
+            if only_empty and current.strip():
+                continue
             if isinstance(entry, ct.CTkTextbox):
                 entry.delete("0.0", "end")
                 entry.insert("0.0", str(value))
@@ -63,9 +71,19 @@ class MetadataStep(WizardStep):
                 entry.delete(0, "end")
                 entry.insert(0, str(value or ""))
 
+    def on_event(self, name: str):
+        # The full parse may find more (e.g. an abstract in an included file): fill only empty fields
+        if name == "analysis_done":
+            self.auto_btn.configure(text=AUTO_FILL_TEXT)
+            self.on_show(only_empty=True)
+
     def on_next(self) -> bool:
         book = self.wizard.context.get("book")
         if not book: return False
+        if self.wizard.context.get("analysis_running"):
+            # Chapters are still being read; the review step needs them
+            self.auto_btn.configure(text="در حال تحلیل فصل‌ها... (Analysis in progress)")
+            return False
         
         metadata = book.metadata
         for attr, entry in self.fields.items():
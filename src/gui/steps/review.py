@@ -1,64 +1,302 @@
 import customtkinter as ct
-from gui.wizard import WizardStep
+from typing import Dict, Optional, Tuple
+from gui.tasks import ConversionRun
+from gui.wizard import POLL_INTERVAL_MS, WizardStep
+from utils.hashing import hash_text
+
+# Rows are recycled: only this many row widgets exist, however long the book is
+ROW_POOL_SIZE = 12
+ROW_COLOR = ("gray86", "gray17")
+SELECTED_COLOR = ("gray75", "gray28")
+DROP_COLOR = ("#3B8ED0", "#1F6AA5")
+# The preview starts once the selection has been still for this long
+PREVIEW_DELAY_MS = 300
+
+class ChapterRow(ct.CTkFrame):
+    """One reusable row of the chapter list; bind_chapter() points it at a chapter."""
+
+    def __init__(self, master, step: "ReviewStep", slot: int):
+        super().__init__(master, fg_color=ROW_COLOR)
+        self.step = step
+        self.slot = slot
+        self.index = -1
+
+        self.var = ct.BooleanVar(value=True)
+        self.cb = ct.CTkCheckBox(self, text="", variable=self.var, font=("Arial", 14), command=self.toggle)
+        self.cb.pack(side="right", padx=10)
+
+        # Drag handle: press, move and release to reorder
+        self.handle = ct.CTkLabel(self, text="☰", width=24, cursor="fleur")
+        self.handle.bind("<ButtonPress-1>", lambda e: step.start_drag(self))
+        self.handle.bind("<B1-Motion>", step.drag)
+        self.handle.bind("<ButtonRelease-1>", step.drop)
+
+        self.dn_btn = ct.CTkButton(self, text="بیا پایین ↓", width=80, command=lambda: step.move_down(self.index))
+        self.up_btn = ct.CTkButton(self, text="برو بالا ↑", width=80, command=lambda: step.move_up(self.index))
+
+        self.preview_btn = ct.CTkButton(self, text="پیش‌نمایش", width=80, command=lambda: step.select(self.index))
+        self.preview_btn.pack(side="right", padx=2)
+        self.bind("<Button-1>", lambda e: step.select(self.index))
+
+    def bind_chapter(self, index: int, chapter, is_book: bool):
+        self.index = index
+        text = f"فصل {index+1}: {chapter.title}" if is_book else f"سند: {chapter.title}"
+        self.cb.configure(text=text)
+        self.var.set(not chapter.is_draft)
+        self.show_reorder(is_book)
+        self.up_btn.configure(state="normal" if index > 0 else "disabled")
+        self.dn_btn.configure(state="normal" if index < len(self.step.chapters) - 1 else "disabled")
+
+    def show_reorder(self, visible: bool):
+        # Reordering only makes sense for books
+        if visible and not self.handle.winfo_manager():
+            self.handle.pack(side="left", padx=(6, 2))
+            self.dn_btn.pack(side="left", padx=2)
+            self.up_btn.pack(side="left", padx=2)
+        elif not visible and self.handle.winfo_manager():
+            for widget in (self.handle, self.dn_btn, self.up_btn):
+                widget.pack_forget()
+
+    def toggle(self):
+        self.step.chapters[self.index].is_draft = not self.var.get()
 
 class ReviewStep(WizardStep):
     def __init__(self, master, wizard):
         super().__init__(master, wizard)
-        
+
         self.label = ct.CTkLabel(self, text="مرحله ۳: بازبینی و تایید فصل‌ها", font=("Arial", 20, "bold"))
         self.label.pack(pady=20)
-        
-        self.list_frame = ct.CTkScrollableFrame(self)
+
+        self.bulk_frame = ct.CTkFrame(self, fg_color="transparent")
+        self.bulk_frame.pack(fill="x", padx=40)
+        ct.CTkButton(self.bulk_frame, text="انتخاب همه", width=100,
+                     command=lambda: self.set_all(True)).pack(side="right", padx=2)
+        ct.CTkButton(self.bulk_frame, text="حذف همه", width=100,
+                     command=lambda: self.set_all(False)).pack(side="right", padx=2)
+        ct.CTkButton(self.bulk_frame, text="معکوس", width=100,
+                     command=self.invert_selection).pack(side="right", padx=2)
+
+        self.list_frame = ct.CTkFrame(self)
         self.list_frame.pack(fill="both", expand=True, padx=40, pady=10)
-        
-        self.chapter_vars = []
+        self.scrollbar = ct.CTkScrollbar(self.list_frame, command=self.on_scrollbar)
+        self.scrollbar.pack(side="left", fill="y")
+        self.rows_frame = ct.CTkFrame(self.list_frame, fg_color="transparent")
+        self.rows_frame.pack(side="left", fill="both", expand=True)
+
+        self.preview_label = ct.CTkLabel(self, text="پیش‌نمایش (Preview): یک فصل را انتخاب کنید", anchor="e")
+        self.preview_label.pack(fill="x", padx=40)
+        self.preview_box = ct.CTkTextbox(self, height=220, wrap="word")
+        self.preview_box.pack(fill="both", padx=40, pady=(0, 10))
+        self.preview_box.configure(state="disabled")
+
+        self.rows = [ChapterRow(self.rows_frame, self, slot) for slot in range(ROW_POOL_SIZE)]
+        for widget in (self.rows_frame, *self.rows):
+            widget.bind("<MouseWheel>", self.on_wheel)
+            widget.bind("<Button-4>", lambda e: self.scroll_by(-1))
+            widget.bind("<Button-5>", lambda e: self.scroll_by(1))
+
+        self.chapters = []
+        self.is_book = True
+        self.offset = 0
+        self.drag_from = None
+        self.drag_to = None
+
+        # Preview state: only the result of the latest request (preview_run) is shown
+        self.selected = None
+        self.preview_cache = None
+        self.preview_memo: Dict[str, Tuple[str, str]] = {}
+        self.preview_run: Optional[ConversionRun] = None
+        self.preview_after: Optional[str] = None
 
     def on_show(self):
         book = self.wizard.context.get("book")
         if not book: return
-        
-        # Clear previous
-        for child in self.list_frame.winfo_children():
-            child.destroy()
-        self.chapter_vars = []
-        
-        is_book = book.metadata.type == "Book"
-        self.label.configure(text="مرحله ۳: بازبینی و تایید نهایی" if not is_book else "مرحله ۳: بازبینی و تایید فصل‌ها")
-        
-        for idx, chapter in enumerate(book.chapters):
-            row = ct.CTkFrame(self.list_frame)
-            row.pack(fill="x", pady=5)
-            
-            # Use a dict instead of just a bool var to store reference
-            var = ct.BooleanVar(value=not chapter.is_draft)
-            text = f"فصل {idx+1}: {chapter.title}" if is_book else f"سند: {chapter.title}"
-            cb = ct.CTkCheckBox(row, text=text, variable=var, font=("Arial", 14))
-            cb.pack(side="right", padx=10)
-            
-            self.chapter_vars.append((chapter, var))
-            
-            if is_book:
-                # Reorder buttons
-                dn_btn = ct.CTkButton(row, text="بیا پایین ↓", width=80, command=lambda i=idx: self.move_down(i))
-                dn_btn.pack(side="left", padx=2)
-                
-                up_btn = ct.CTkButton(row, text="برو بالا ↑", width=80, command=lambda i=idx: self.move_up(i))
-                up_btn.pack(side="left", padx=2)
+
+        self.chapters = book.chapters
+        if self.selected is not None and not any(ch is self.selected for ch in self.chapters):
+            self.selected = None
+        self.is_book = book.metadata.type == "Book"
+        self.label.configure(text="مرحله ۳: بازبینی و تایید نهایی" if not self.is_book else "مرحله ۳: بازبینی و تایید فصل‌ها")
+        self.offset = min(self.offset, max(len(self.chapters) - ROW_POOL_SIZE, 0))
+        self.refresh()
+
+    def refresh(self, start: int = 0, end: int = None):
+        """Re-binds the pooled rows showing chapters[start:end] (default: every visible row)."""
+        for slot, row in enumerate(self.rows):
+            index = self.offset + slot
+            if index >= len(self.chapters):
+                row.pack_forget()
+                continue
+            if start <= index and (end is None or index < end):
+                row.bind_chapter(index, self.chapters[index], self.is_book)
+                row.configure(fg_color=self._row_color(index))
+            if not row.winfo_manager():
+                row.pack(fill="x", pady=5)
+
+        visible = min(ROW_POOL_SIZE, len(self.chapters))
+        if self.chapters:
+            self.scrollbar.set(self.offset / len(self.chapters), (self.offset + visible) / len(self.chapters))
+
+    # --- Scrolling ---
+
+    def scroll_to(self, offset: int):
+        offset = max(0, min(offset, len(self.chapters) - ROW_POOL_SIZE))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def scroll_by(self, rows: int):
+        self.scroll_to(self.offset + rows)
+
+    def on_wheel(self, event):
+        self.scroll_by(-1 if event.delta > 0 else 1)
+
+    def on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(value) * len(self.chapters)))
+        elif action == "scroll":
+            self.scroll_by(int(value) * (ROW_POOL_SIZE if unit == "pages" else 1))
+
+    # --- Reordering ---
+
+    def move(self, src: int, dst: int):
+        """Moves a chapter and re-binds only the rows between the two positions."""
+        if src == dst or not (0 <= src < len(self.chapters)) or not (0 <= dst < len(self.chapters)):
+            return
+        self.chapters.insert(dst, self.chapters.pop(src))
+        self.refresh(min(src, dst), max(src, dst) + 1)
 
     def move_up(self, idx):
-        if idx > 0:
-            chapters = self.wizard.context["book"].chapters
-            chapters[idx], chapters[idx-1] = chapters[idx-1], chapters[idx]
-            self.on_show()
+        if self.is_book:
+            self.move(idx, idx - 1)
 
     def move_down(self, idx):
-        chapters = self.wizard.context["book"].chapters
-        if idx < len(chapters) - 1:
-            chapters[idx], chapters[idx+1] = chapters[idx+1], chapters[idx]
-            self.on_show()
+        if self.is_book:
+            self.move(idx, idx + 1)
+
+    def start_drag(self, row: ChapterRow):
+        if self.is_book:
+            self.drag_from = row.index
+
+    def _slot_at(self, y_root: int) -> int:
+        y = y_root - self.rows_frame.winfo_rooty()
+        for slot, row in enumerate(self.rows):
+            if row.winfo_manager() and y < row.winfo_y() + row.winfo_height():
+                return slot
+        return len([r for r in self.rows if r.winfo_manager()]) - 1
+
+    def drag(self, event):
+        if self.drag_from is None:
+            return
+        # Dragging past the edges scrolls the list
+        slot = self._slot_at(event.y_root)
+        if event.y_root < self.rows_frame.winfo_rooty():
+            self.scroll_by(-1)
+        elif event.y_root > self.rows_frame.winfo_rooty() + self.rows_frame.winfo_height():
+            self.scroll_by(1)
+        self.drag_to = self.offset + slot
+        for row in self.rows:
+            row.configure(fg_color=DROP_COLOR if row.index == self.drag_to else self._row_color(row.index))
+
+    def drop(self, event):
+        if self.drag_from is not None and self.drag_to is not None:
+            self.move(self.drag_from, self.drag_to)
+        for row in self.rows:
+            row.configure(fg_color=self._row_color(row.index))
+        self.drag_from = self.drag_to = None
+
+    # --- Bulk include/exclude ---
+
+    def set_all(self, included: bool):
+        for chapter in self.chapters:
+            chapter.is_draft = not included
+        self.refresh()
+
+    def invert_selection(self):
+        for chapter in self.chapters:
+            chapter.is_draft = not chapter.is_draft
+        self.refresh()
+
+    # --- Preview ---
+
+    def _row_color(self, index: int):
+        if 0 <= index < len(self.chapters) and self.chapters[index] is self.selected:
+            return SELECTED_COLOR
+        return ROW_COLOR
+
+    def select(self, index: int):
+        """Selects a chapter and schedules its preview once the selection settles."""
+        if not (0 <= index < len(self.chapters)):
+            return
+        self.selected = self.chapters[index]
+        for row in self.rows:
+            row.configure(fg_color=self._row_color(row.index))
+
+        # A newer selection makes any running conversion stale: stop it now
+        self._cancel_preview()
+        if self.preview_after is not None:
+            self.after_cancel(self.preview_after)
+        self.preview_after = self.after(PREVIEW_DELAY_MS, self.start_preview)
+
+    def start_preview(self):
+        self.preview_after = None
+        chapter = self.selected
+        if chapter is None:
+            return
+        if not chapter.content_latex:
+            self.show_preview(chapter.title, chapter.content_markdown, "markdown")
+            return
+
+        latex_hash = hash_text(chapter.content_latex)
+        if latex_hash in self.preview_memo:
+            self.show_preview(chapter.title, *self.preview_memo[latex_hash])
+            return
+
+        from core.cache import ConversionCache, cache_dir
+        if self.preview_cache is None:
+            # The same cache the conversion uses: previewed chapters are not converted twice
+            self.preview_cache = ConversionCache(cache_dir(self.wizard.context["output_root"]) / "conversions")
+        book, cache, latex = self.wizard.context["book"], self.preview_cache, chapter.content_latex
+        self.preview_label.configure(text=f"پیش‌نمایش (Preview): {chapter.title} - در حال تبدیل...")
+
+        def convert(progress, token):
+            """Runs on a worker thread; returns (markdown, engine)."""
+            from core.converter import MarkdownConverter
+            return MarkdownConverter(book, cache, token).convert_cached(latex)
+
+        run = self.preview_run = ConversionRun(convert).start()
+        self.after(POLL_INTERVAL_MS, lambda: self._poll_preview(run, chapter.title, latex_hash))
+
+    def _poll_preview(self, run: ConversionRun, title: str, latex_hash: str):
+        if run is not self.preview_run:
+            return  # Superseded by a newer selection
+        run.poll()
+        if not run.done:
+            self.after(POLL_INTERVAL_MS, lambda: self._poll_preview(run, title, latex_hash))
+            return
+        self.preview_run = None
+        if run.state == run.SUCCEEDED:
+            self.preview_memo[latex_hash] = run.result
+            self.show_preview(title, *run.result)
+        elif run.state == run.FAILED:
+            self.show_preview(title, f"Error: {run.error}", "error")
+
+    def _cancel_preview(self):
+        if self.preview_run is not None:
+            self.preview_run.cancel()
+            self.preview_run = None
+
+    def show_preview(self, title: str, text: str, engine: str):
+        self.preview_label.configure(text=f"پیش‌نمایش (Preview): {title} [{engine}]")
+        self.preview_box.configure(state="normal")
+        self.preview_box.delete("0.0", "end")
+        self.preview_box.insert("0.0", text or "")
+        self.preview_box.configure(state="disabled")
 
     def on_next(self) -> bool:
-        # Final approval check
-        for chapter, var in self.chapter_vars:
-            chapter.is_draft = not var.get()
+        # Checkboxes write through to the chapters as they are toggled; a pending preview is no longer needed
+        if self.preview_after is not None:
+            self.after_cancel(self.preview_after)
+            self.preview_after = None
+        self._cancel_preview()
         return True
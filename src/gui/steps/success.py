@@ -30,10 +30,15 @@ class SuccessStep(WizardStep):
         report.append("- پارس لاتک و استخراج ساختار")
         report.append("- تبدیل به مارک‌داون (Astro-compatible)")
         report.append("- انتقال تصاویر")
-        report.append("- ایجاد فایل manifest.json")
+        report.append("- ایجاد فایل manifest کتاب (manifests/)")
         
         if self.wizard.context.get("git_pushed"):
             report.append("- ارسال به مخزن گیت (Push successful)")
+
+        log = self.wizard.context.get("conversion_log", [])
+        if log:
+            report.append("-" * 30)
+            report.extend(log)
         
         self.report_box.delete("0.0", "end")
         self.report_box.insert("0.0", "\n".join(report))
@@ -0,0 +1,111 @@
+import queue
+import threading
+from typing import Any, Callable, List, Optional
+
+from core.progress import CancellationToken, ConversionCancelled
+
+# Tk widgets may only be touched from the Tk thread. Background work therefore
+# reports through a queue that the Tk thread drains with after(); the classes
+# here hold that hand-over and the state around it, and import no Tk code.
+
+class _Finished:
+    def __init__(self, result: Any, error: Optional[BaseException]):
+        self.result = result
+        self.error = error
+
+class BackgroundTask:
+    """Runs a function on a daemon thread and hands what it reports to the polling thread.
+
+    target is called with a report(event) function it may call any number of
+    times. poll() returns the events reported since the last call; once
+    target has returned or raised, finished is set along with result or error.
+    """
+
+    def __init__(self, target: Callable[[Callable[[Any], None]], Any]):
+        self.target = target
+        self.events: queue.Queue = queue.Queue()
+        self.finished = False
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+    def start(self) -> "BackgroundTask":
+        threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def _run(self):
+        """Runs on the worker thread."""
+        try:
+            outcome = _Finished(self.target(self.events.put), None)
+        except BaseException as e:
+            outcome = _Finished(None, e)
+        self.events.put(outcome)
+
+    def poll(self) -> List[Any]:
+        events = []
+        while not self.finished:
+            try:
+                item = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Finished):
+                self.finished = True
+                self.result, self.error = item.result, item.error
+            else:
+                events.append(item)
+        return events
+
+class ConversionRun:
+    """A cancellable conversion on a worker thread (the wizard's run, a chapter preview).
+
+    work(progress, token) runs on a worker thread. The run starts out
+    'running'; cancel() moves it to 'cancelling' and cancels the token. Once
+    work is over, poll() moves it to 'succeeded' (with work's return value as
+    result), 'cancelled' or 'failed'.
+    """
+
+    RUNNING = "running"
+    CANCELLING = "cancelling"
+    SUCCEEDED = "succeeded"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+    def __init__(self, work: Callable[[Callable[[Any], None], CancellationToken], Any]):
+        self.token = CancellationToken()
+        self.task = BackgroundTask(lambda report: work(report, self.token))
+        self.state = self.RUNNING
+
+    def start(self) -> "ConversionRun":
+        self.task.start()
+        return self
+
+    @property
+    def done(self) -> bool:
+        return self.state in (self.SUCCEEDED, self.CANCELLED, self.FAILED)
+
+    @property
+    def result(self) -> Any:
+        return self.task.result
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        return self.task.error
+
+    def cancel(self) -> bool:
+        """Asks the worker to stop. Returns False if the run is not running any more."""
+        if self.state != self.RUNNING:
+            return False
+        self.state = self.CANCELLING
+        self.token.cancel()
+        return True
+
+    def poll(self) -> List[Any]:
+        """Returns the progress events that arrived, and settles the state once work is over."""
+        events = self.task.poll()
+        if self.task.finished and not self.done:
+            if self.task.error is None:
+                self.state = self.SUCCEEDED
+            elif isinstance(self.task.error, ConversionCancelled):
+                self.state = self.CANCELLED
+            else:
+                self.state = self.FAILED
+        return events
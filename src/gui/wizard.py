@@ -1,6 +1,10 @@
+import importlib
 import customtkinter as ct
-from typing import List, Type, Dict
+from typing import List, Type, Dict, Optional, Union
 from pathlib import Path
+from gui.tasks import ConversionRun
+
+POLL_INTERVAL_MS = 100
 
 class WizardStep(ct.CTkFrame):
     def __init__(self, master, wizard):
@@ -17,6 +21,57 @@ class WizardStep(ct.CTkFrame):
         """Called when Next is clicked. Return True to proceed."""
         return True
 
+    def on_event(self, name: str):
+        """Called on every created step when background work changes the shared context."""
+        pass
+
+class ProgressPanel(ct.CTkFrame):
+    """Progress bar, per-chapter log and cancel button shown while a conversion runs."""
+
+    def __init__(self, master, on_cancel):
+        super().__init__(master)
+        self.status_var = ct.StringVar(value="")
+        ct.CTkLabel(self, textvariable=self.status_var, anchor="e").pack(fill="x", padx=10, pady=(5, 0))
+        self.bar = ct.CTkProgressBar(self)
+        self.bar.pack(fill="x", padx=10, pady=5)
+        self.log_box = ct.CTkTextbox(self, height=120)
+        self.log_box.pack(fill="x", padx=10, pady=5)
+        self.cancel_btn = ct.CTkButton(self, text="لغو (Cancel)", command=on_cancel)
+        self.cancel_btn.pack(pady=5)
+
+    def start(self):
+        self.bar.set(0)
+        self.status_var.set("در حال تبدیل... (Converting)")
+        self.log_box.delete("0.0", "end")
+        self.cancel_btn.configure(state="normal")
+        self.grid()
+
+    def stop(self):
+        self.cancel_btn.configure(state="disabled")
+
+    def hide(self):
+        self.stop()
+        self.grid_remove()
+
+    def log(self, line: str):
+        self.log_box.insert("end", line + "\n")
+        self.log_box.see("end")
+
+    def show_event(self, event) -> Optional[str]:
+        """Updates the panel for one ProgressEvent. Returns the log line written, if any."""
+        line = None
+        if event.kind == "chapter_converted":
+            self.bar.set(event.current / max(event.total, 1))
+            self.status_var.set(f"فصل {event.current} از {event.total}")
+            line = f"✓ [{event.current}/{event.total}] {event.message}"
+        elif event.kind == "warning":
+            line = f"⚠ {event.message}"
+        elif event.kind == "stage_started" and event.stage in ("manifest", "git"):
+            self.status_var.set("ارسال به گیت... (Publishing)" if event.stage == "git" else "ذخیره manifest...")
+        if line:
+            self.log(line)
+        return line
+
 class ConversionWizard(ct.CTkFrame):
     def __init__(self, master):
         super().__init__(master)
@@ -25,7 +80,8 @@ class ConversionWizard(ct.CTkFrame):
         self.grid_rowconfigure(0, weight=1) # Content
         self.grid_rowconfigure(1, weight=0) # Navigation
 
-        self.steps: List[Type[WizardStep]] = []
+        # Step classes, or "module:Class" import paths resolved when the step is first shown
+        self.steps: List[Union[str, Type[WizardStep]]] = []
         self.step_instances: Dict[int, WizardStep] = {}
         self.current_step_idx = 0
         
@@ -40,6 +96,12 @@ class ConversionWizard(ct.CTkFrame):
         
         self.next_btn = ct.CTkButton(self.nav_frame, text="Next", command=self.next_step)
         self.next_btn.pack(side="right", padx=10)
+
+        # Shown below the steps while a conversion runs on the worker thread
+        self.progress_panel = ProgressPanel(self, on_cancel=self.cancel_conversion)
+        self.progress_panel.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 10))
+        self.progress_panel.grid_remove()
+        self.conversion: Optional[ConversionRun] = None
         
         # Shared data
         self.context = {
@@ -48,13 +110,21 @@ class ConversionWizard(ct.CTkFrame):
             "output_root": Path.cwd() / "output"
         }
 
-    def add_steps(self, step_classes: List[Type[WizardStep]]):
-        self.steps = step_classes
+    def add_steps(self, step_classes: List[Union[str, Type[WizardStep]]]):
+        self.steps = list(step_classes)
         self.show_step(0)
 
+    def step_class(self, idx: int) -> Type[WizardStep]:
+        """Returns the class of a step, importing its module the first time it is needed."""
+        step = self.steps[idx]
+        if isinstance(step, str):
+            module_name, _, class_name = step.partition(":")
+            step = self.steps[idx] = getattr(importlib.import_module(module_name), class_name)
+        return step
+
     def show_step(self, idx: int):
         if idx not in self.step_instances:
-            self.step_instances[idx] = self.steps[idx](self.content_container, self)
+            self.step_instances[idx] = self.step_class(idx)(self.content_container, self)
         
         # Hide current
         for inst in self.step_instances.values():
@@ -68,9 +138,26 @@ class ConversionWizard(ct.CTkFrame):
         self.current_step_idx = idx
         self.update_navigation()
 
+    def notify_steps(self, name: str):
+        for step in self.step_instances.values():
+            step.on_event(name)
+
+    def save_session(self):
+        """Snapshots the book next to its source, so reopening the wizard resumes from here."""
+        book, main_tex = self.context.get("book"), self.context.get("main_tex")
+        if book is None or main_tex is None or self.context.get("analysis_running"):
+            return
+        from core.snapshot import BookSnapshot
+        try:
+            BookSnapshot(main_tex).save(book)
+        except OSError as e:
+            print(f"Could not save session: {e}")
+
     def next_step(self):
         if self.step_instances[self.current_step_idx].on_next():
-            if self.current_step_idx < len(self.steps) - 1:
+            self.save_session()
+            # The last step only reports results, so leaving the one before it converts
+            if self.current_step_idx < len(self.steps) - 2:
                 self.show_step(self.current_step_idx + 1)
             else:
                 self.finish()
@@ -81,7 +168,7 @@ class ConversionWizard(ct.CTkFrame):
 
     def update_navigation(self):
         self.prev_btn.configure(state="normal" if self.current_step_idx > 0 else "disabled")
-        if self.current_step_idx == len(self.steps) - 1:
+        if self.current_step_idx >= len(self.steps) - 2:
             self.next_btn.configure(text="Convert & Finish")
         else:
             self.next_btn.configure(text="Next")
@@ -95,49 +182,83 @@ class ConversionWizard(ct.CTkFrame):
             print("Error: Missing configuration.")
             return
 
-        # Disable button to prevent double-click
+        from core.orchestrator import ConversionOrchestrator
+
+        # Disable navigation while the worker runs; Cancel stops it
         self.next_btn.configure(state="disabled", text="Processing...")
-        self.update() # Force UI update
+        self.prev_btn.configure(state="disabled")
+        self.context["git_pushed"] = False
+        self.context["conversion_log"] = []
+        self.progress_panel.start()
 
-        try:
-            from core.orchestrator import ConversionOrchestrator
-            
-            orchestrator = ConversionOrchestrator(main_tex, output_root)
-            orchestrator.run()
-            
-            # --- Git Integration ---
-            self.context["git_pushed"] = False
-            if self.context.get("git_enabled", False):
-                from git.manager import GitManager
-                git_mgr = GitManager(output_root)
-                
-                if git_mgr.is_dirty():
-                    git_mgr.add_all()
-                    git_mgr.commit(f"Add converted content: {self.context['book'].metadata.title}")
-                    
-                    # Prepare Authenticated URL
-                    git_url = self.context.get("git_url")
-                    git_token = self.context.get("git_token")
-                    git_branch = self.context.get("git_branch", "main")
-                    
-                    if git_url and git_token and git_url.startswith("https://"):
-                        # Inject token into URL: https://token@github.com/...
-                        auth_url = git_url.replace("https://", f"https://{git_token}@")
-                    else:
-                        auth_url = git_url
-
-                    if git_mgr.push(remote_url=auth_url, branch=git_branch):
-                        self.context["git_pushed"] = True
-            
+        # Git commit/push runs as the last pipeline stage, after the manifest is saved
+        publish = (lambda: self.publish_to_git(output_root)) if self.context.get("git_enabled", False) else None
+        book = self.context.get("book")
+
+        def convert(progress, token):
+            """Runs on the worker thread; never touches widgets."""
+            # Convert the book as edited in the previous steps (metadata, order, drafts)
+            orchestrator = ConversionOrchestrator(main_tex, output_root, book=book, progress=progress, token=token)
+            orchestrator.run(publish=publish)
+
+        self.conversion = ConversionRun(convert).start()
+        self.after(POLL_INTERVAL_MS, self._poll_worker)
+
+    def _poll_worker(self):
+        """Shows worker events on the Tk thread, then reschedules itself until the run is over."""
+        for event in self.conversion.poll():
+            line = self.progress_panel.show_event(event)
+            if line:
+                self.context["conversion_log"].append(line)
+        if self.conversion.done:
+            self._worker_finished()
+        else:
+            self.after(POLL_INTERVAL_MS, self._poll_worker)
+
+    def cancel_conversion(self):
+        if self.conversion and self.conversion.cancel():
+            self.progress_panel.log("در حال لغو... (Cancelling)")
+
+    def _worker_finished(self):
+        run, self.conversion = self.conversion, None
+        self.progress_panel.hide()
+        if run.state == run.SUCCEEDED:
             # Transition to Success Step (the next step in the list)
             if self.current_step_idx < len(self.steps) - 1:
                 self.show_step(self.current_step_idx + 1)
             else:
                 from tkinter import messagebox
                 messagebox.showinfo("Success", "Conversion completed successfully!")
-                
-        except Exception as e:
-            print(f"Conversion failed: {e}")
-            from tkinter import messagebox
-            messagebox.showerror("Error", f"Conversion failed: {str(e)}")
-            self.next_btn.configure(state="normal", text="Convert & Finish")
+            return
+
+        from tkinter import messagebox
+        if run.state == run.CANCELLED:
+            messagebox.showinfo("Cancelled", "تبدیل لغو شد (Conversion cancelled)")
+        else:
+            print(f"Conversion failed: {run.error}")
+            messagebox.showerror("Error", f"Conversion failed: {str(run.error)}")
+        self.update_navigation()
+        self.next_btn.configure(state="normal", text="Convert & Finish")
+
+    def publish_to_git(self, output_root: Path):
+        """Commits the converted output and pushes it to the configured remote."""
+        from git.manager import GitManager
+        git_mgr = GitManager(output_root)
+        
+        if git_mgr.is_dirty():
+            git_mgr.add_all()
+            git_mgr.commit(f"Add converted content: {self.context['book'].metadata.title}")
+            
+            # Prepare Authenticated URL
+            git_url = self.context.get("git_url")
+            git_token = self.context.get("git_token")
+            git_branch = self.context.get("git_branch", "main")
+            
+            if git_url and git_token and git_url.startswith("https://"):
+                # Inject token into URL: https://token@github.com/...
+                auth_url = git_url.replace("https://", f"https://{git_token}@")
+            else:
+                auth_url = git_url
+
+            if git_mgr.push(remote_url=auth_url, branch=git_branch):
+                self.context["git_pushed"] = True
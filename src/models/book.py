@@ -1,8 +1,11 @@
+import sys
+from array import array
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Any, Iterator, List, Dict, Optional, Tuple, Union
 from pathlib import Path
 
-@dataclass
+@dataclass(slots=True)
 class ImageInfo:
     original_name: str
     original_path: Path
@@ -11,14 +14,180 @@ class ImageInfo:
     needs_conversion: bool
     caption: str = ""
 
-@dataclass
+@dataclass(slots=True)
+class SourceSpan:
+    file: str  # Path relative to the project directory
+    start_line: int
+    end_line: int
+
+@dataclass(slots=True)
 class LabelInfo:
     label_type: str  # 'chapter', 'section', 'figure', 'table', 'equation'
     number: str
     title: str = ""
     file: str = ""
 
-@dataclass
+class LabelRef:
+    """One label of a LabelRegistry. Reading or setting a field goes straight to the registry's columns."""
+    __slots__ = ("_registry", "_index")
+
+    def __init__(self, registry: "LabelRegistry", index: int):
+        self._registry = registry
+        self._index = index
+
+    @property
+    def label_type(self) -> str:
+        return self._registry._type_names[self._registry._types[self._index]]
+
+    @label_type.setter
+    def label_type(self, value: str):
+        self._registry._types[self._index] = self._registry._type_code(value)
+
+    @property
+    def number(self) -> str:
+        return self._registry._numbers[self._index]
+
+    @number.setter
+    def number(self, value: str):
+        self._registry._numbers[self._index] = sys.intern(value)
+
+    @property
+    def title(self) -> str:
+        return self._registry._titles[self._index]
+
+    @title.setter
+    def title(self, value: str):
+        self._registry._titles[self._index] = value
+
+    @property
+    def file(self) -> str:
+        code = self._registry._files[self._index]
+        return self._registry._file_names[code] if code >= 0 else ""
+
+    @file.setter
+    def file(self, value: str):
+        self._registry._files[self._index] = self._registry._file_code(value)
+
+    def to_info(self) -> LabelInfo:
+        return LabelInfo(self.label_type, self.number, self.title, self.file)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (LabelRef, LabelInfo)):
+            return self.to_info() == (other.to_info() if isinstance(other, LabelRef) else other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self.to_info())
+
+class LabelRegistry(MutableMapping):
+    """Label key -> label, stored as columns instead of one object per label.
+
+    Behaves like Dict[str, LabelInfo]: values are LabelRef views whose
+    fields read and write the columns, so `registry[key].file = ...` works
+    as before. Label types and output files are interned into small tables
+    and stored as packed integer codes, which keeps the registry small for
+    books with tens of thousands of labels and cheap to pickle for worker
+    processes (the key index is rebuilt on unpickling, not transferred).
+    """
+    __slots__ = ("_keys", "_index", "_type_names", "_type_codes", "_types", "_numbers", "_titles",
+                 "_file_names", "_file_codes", "_files")
+
+    def __init__(self, labels: Optional[Dict[str, Union[LabelInfo, LabelRef]]] = None):
+        self._keys: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._type_names: List[str] = []
+        self._type_codes: Dict[str, int] = {}
+        self._types = array("H")
+        self._numbers: List[str] = []
+        self._titles: List[str] = []
+        self._file_names: List[str] = []
+        self._file_codes: Dict[str, int] = {}
+        self._files = array("i")  # Index into _file_names, -1 for no file
+        if labels:
+            self.update(labels)
+
+    def _type_code(self, name: str) -> int:
+        code = self._type_codes.get(name)
+        if code is None:
+            code = self._type_codes[name] = len(self._type_names)
+            self._type_names.append(sys.intern(name))
+        return code
+
+    def _file_code(self, name: str) -> int:
+        if not name:
+            return -1
+        code = self._file_codes.get(name)
+        if code is None:
+            code = self._file_codes[name] = len(self._file_names)
+            self._file_names.append(name)
+        return code
+
+    def __getitem__(self, key: str) -> LabelRef:
+        return LabelRef(self, self._index[key])
+
+    def __setitem__(self, key: str, label: Union[LabelInfo, LabelRef]):
+        columns = (self._type_code(label.label_type), sys.intern(label.number), label.title,
+                   self._file_code(label.file))
+        idx = self._index.get(key)
+        if idx is None:
+            self._index[key] = len(self._keys)
+            self._keys.append(key)
+            self._types.append(columns[0])
+            self._numbers.append(columns[1])
+            self._titles.append(columns[2])
+            self._files.append(columns[3])
+        else:
+            self._types[idx], self._numbers[idx], self._titles[idx], self._files[idx] = columns
+
+    def __delitem__(self, key: str):
+        idx = self._index.pop(key)
+        for column in (self._keys, self._types, self._numbers, self._titles, self._files):
+            del column[idx]
+        for later in self._keys[idx:]:
+            self._index[later] -= 1
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"LabelRegistry({len(self)} labels)"
+
+    def to_columns(self) -> Dict[str, Any]:
+        """The registry as plain lists, e.g. for JSON. from_columns() reverses it."""
+        return {
+            "keys": list(self._keys),
+            "types": [self._type_names[code] for code in self._types],
+            "numbers": list(self._numbers),
+            "titles": list(self._titles),
+            "files": [self._file_names[code] if code >= 0 else "" for code in self._files],
+        }
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> "LabelRegistry":
+        registry = cls()
+        for key, label_type, number, title, file in zip(columns["keys"], columns["types"], columns["numbers"],
+                                                         columns["titles"], columns["files"]):
+            registry[key] = LabelInfo(label_type, number, title, file)
+        return registry
+
+    def __getstate__(self):
+        return (self._keys, self._type_names, self._types, self._numbers, self._titles,
+                self._file_names, self._files)
+
+    def __setstate__(self, state):
+        (self._keys, self._type_names, self._types, self._numbers, self._titles,
+         self._file_names, self._files) = state
+        self._index = {key: idx for idx, key in enumerate(self._keys)}
+        self._type_codes = {name: code for code, name in enumerate(self._type_names)}
+        self._file_codes = {name: code for code, name in enumerate(self._file_names)}
+
+@dataclass(slots=True)
 class Chapter:
     number: int
     title: str
@@ -34,6 +203,11 @@ class Chapter:
     images: List[ImageInfo] = field(default_factory=list)
     labels: Dict[str, str] = field(default_factory=dict)
     warnings: List[str] = field(default_factory=list)
+    source_spans: List[SourceSpan] = field(default_factory=list)
+    source_range: Optional[Tuple[int, int]] = None  # content_latex as offsets into the flattened source
+    parent: str = ""  # For a section page of a split chapter, the chapter's filename
+    engine: str = ""  # 'pandoc' or 'fallback'
+    conversion_time: float = 0.0
 
 @dataclass
 class BookMetadata:
@@ -59,4 +233,6 @@ class Book:
     appendices: List[Chapter] = field(default_factory=list)
     images: Dict[str, ImageInfo] = field(default_factory=dict)
     source_dir: Optional[Path] = None
-    label_registry: Dict[str, LabelInfo] = field(default_factory=dict)
+    source_files: Dict[str, str] = field(default_factory=dict)  # relative path -> content hash
+    graphics_paths: List[str] = field(default_factory=list)
+    label_registry: LabelRegistry = field(default_factory=LabelRegistry)
@@ -0,0 +1,20 @@
+import hashlib
+from pathlib import Path
+
+CHUNK_SIZE = 1024 * 1024
+
+def hash_bytes(data: bytes) -> str:
+    """Returns the SHA-256 hex digest of the given bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+def hash_text(text: str) -> str:
+    """Returns the SHA-256 hex digest of the UTF-8 encoded text."""
+    return hash_bytes(text.encode("utf-8"))
+
+def hash_file(path: Path) -> str:
+    """Returns the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,42 +1,104 @@
-import re
 import unicodedata
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from utils.transliterate import transliterate as _transliterate
 
-def slugify(text: str, max_length: int = 50) -> str:
+class _SlugTable(dict):
+    """str.translate table for slugs, filled in lazily one code point at a time.
+
+    Whitespace, '_' and ZWNJ become hyphens, ASCII letters are lowercased,
+    Persian/Arabic letters, digits and hyphens are kept, and everything else
+    is dropped. Each code point is classified once per process.
+    """
+
+    def __missing__(self, code: int) -> Optional[str]:
+        char = chr(code)
+        if char.isspace() or char in '_‌':
+            value = '-'
+        elif 'A' <= char <= 'Z':
+            value = char.lower()
+        elif 'a' <= char <= 'z' or '0' <= char <= '9' or char == '-' or '؀' <= char <= 'ۿ':
+            value = char
+        else:
+            value = None
+        self[code] = value
+        return value
+
+_SLUG_TABLE = _SlugTable()
+
+def slugify(text: str, max_length: int = 50, transliterate: bool = False) -> str:
     """
     Generates a Persian-aware slug from the given text.
     - Removes Persian diacritics
     - Converts spaces to hyphens
     - Removes special characters except Persian letters, English letters, numbers, and hyphens
     - Lowercases English letters
+    With transliterate, Persian is spelled in Latin letters first (see
+    utils.transliterate), giving short ASCII slugs.
+    Results are memoized per (text, max_length, transliterate).
     """
     if not text:
         return ""
-    
-    # Normalize text
-    text = unicodedata.normalize('NFKD', text)
-    
-    # Remove Persian diacritics (optional but recommended)
-    # Persian diacritics are usually handled by normalization, but we can be explicit if needed
-    
-    # Replace spaces and underscores with hyphens
-    text = re.sub(r'[\s_]+', '-', text)
-    
-    # Remove Persian diacritics (Zero-Width Non-Joiner is often used in Persian)
-    # But for slugs, we want to remove ZWNJ or replace it with a hyphen
-    text = text.replace('\u200c', '-')
-    
-    # Remove special characters except alphanumeric (including Persian) and hyphens
-    # Persian letters: \u0600-\u06FF
-    text = re.sub(r'[^\u0600-\u06FFa-zA-Z0-9-]', '', text)
-    
+    return _slugify(text, max_length, transliterate)
+
+@lru_cache(maxsize=65536)
+def _slugify(text: str, max_length: int, transliterate: bool = False) -> str:
+    if transliterate:
+        text = _transliterate(text)
+
+    # Normalize text (ASCII is already in NFKD form)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+
+    # One pass for hyphens, lowercasing and removing special characters
+    text = text.translate(_SLUG_TABLE)
+
     # Clean up hyphens (remove double hyphens and leading/trailing)
-    text = re.sub(r'-+', '-', text).strip('-')
-    
-    # Lowercase English parts
-    text = text.lower()
-    
+    if '-' in text:
+        text = '-'.join(part for part in text.split('-') if part)
+
     # Limit length
     if len(text) > max_length:
         text = text[:max_length].rstrip('-')
-        
+
     return text
+
+class SlugAllocator:
+    """Hands out slugs that are unique within one scope (a book's pages, a library's books).
+
+    A slug that is already taken gets the next free numeric suffix
+    (intro, intro-2, intro-3, ...). Suffixes depend only on the order of the
+    calls, so allocating the same titles in the same order always gives the
+    same slugs.
+    """
+
+    def __init__(self, taken: Iterable[str] = (), max_length: int = 50,
+                 transliterator: Optional[Callable[[str], str]] = None):
+        self.taken: Set[str] = set(taken)
+        self.max_length = max_length
+        self.transliterator = transliterator  # e.g. a utils.transliterate.Transliterator, for ASCII slugs
+        self._next: Dict[str, int] = {}  # Next suffix to try, per base slug
+
+    def claim(self, slug: str) -> str:
+        """Takes the given slug, or the first free suffixed variant of it. Empty slugs are returned as is."""
+        if not slug:
+            return slug
+        candidate = slug
+        n = self._next.get(slug, 2)
+        while candidate in self.taken:
+            suffix = f"-{n}"
+            candidate = slug[:self.max_length - len(suffix)].rstrip('-') + suffix
+            n += 1
+        self._next[slug] = n
+        self.taken.add(candidate)
+        return candidate
+
+    def allocate(self, text: str, fallback: str = "") -> str:
+        """Slugifies a title and makes the result unique; fallback is used when the title has no slug characters."""
+        if self.transliterator is not None:
+            text = self.transliterator(text)
+        return self.claim(slugify(text, self.max_length) or fallback)
+
+    def allocate_all(self, texts: Iterable[str], fallback: str = "") -> List[str]:
+        """Batch form of allocate(), in order."""
+        return [self.allocate(text, fallback) for text in texts]
@@ -0,0 +1,97 @@
+import re
+from typing import Dict, Optional
+
+# One Latin spelling per Persian/Arabic letter (short vowels are not written in Persian)
+LETTERS = {
+    'ا': 'a', 'آ': 'a', 'أ': 'a', 'إ': 'e', 'ب': 'b', 'پ': 'p', 'ت': 't', 'ث': 's', 'ج': 'j', 'چ': 'ch',
+    'ح': 'h', 'خ': 'kh', 'د': 'd', 'ذ': 'z', 'ر': 'r', 'ز': 'z', 'ژ': 'zh', 'س': 's', 'ش': 'sh',
+    'ص': 's', 'ض': 'z', 'ط': 't', 'ظ': 'z', 'ع': '', 'غ': 'gh', 'ف': 'f', 'ق': 'gh', 'ک': 'k', 'ك': 'k',
+    'گ': 'g', 'ل': 'l', 'م': 'm', 'ن': 'n', 'و': 'v', 'ه': 'h', 'ی': 'i', 'ي': 'i', 'ى': 'i', 'ئ': 'y',
+    'ؤ': 'o', 'ء': '', 'ۀ': 'eh', 'ة': 'e',
+    # Diacritics, when they are written
+    'َ': 'a', 'ُ': 'o', 'ِ': 'e', 'ً': 'an', 'ّ': '', 'ْ': '', 'ٰ': 'a', 'ٔ': '',
+    # Persian and Arabic-Indic digits
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+}
+
+# Letter groups spelled differently from their letters; longest first
+DIGRAPHS = {
+    'خوا': 'kha',  # Silent vav: خواب -> khab
+    'ای': 'i',
+    'یی': 'yi',
+    'وی': 'vi',
+    'او': 'o',
+    'یا': 'ya',
+    'یو': 'yu',
+}
+
+# Common words whose spelling cannot be derived letter by letter
+COMMON_WORDS = {
+    'ها': 'ha', 'های': 'haye', 'ی': 'i', 'ای': 'ei',
+    'و': 'va', 'در': 'dar', 'به': 'be', 'از': 'az', 'با': 'ba', 'که': 'ke', 'را': 'ra', 'این': 'in', 'آن': 'an',
+    'برای': 'baraye', 'یک': 'yek', 'دو': 'do', 'سه': 'se', 'اول': 'aval', 'دوم': 'dovom', 'سوم': 'sevom',
+    'کتاب': 'ketab', 'فصل': 'fasl', 'بخش': 'bakhsh', 'مقدمه': 'moghadame', 'پیوست': 'peyvast',
+    'نتیجه': 'natije', 'گیری': 'giri', 'خلاصه': 'kholase', 'منابع': 'manabe', 'چکیده': 'chekide',
+    'فهرست': 'fehrest', 'پیشگفتار': 'pishgoftar', 'راهنما': 'rahnama', 'راهنمای': 'rahnamaye',
+    'عملی': 'amali', 'نوسازی': 'nosazi', 'روش': 'ravesh', 'روش‌ها': 'ravesh-ha', 'روشها': 'raveshha',
+    'مبانی': 'mabani', 'آموزش': 'amoozesh', 'تمرین': 'tamrin', 'تحلیل': 'tahlil', 'داده': 'dade',
+    'مدل': 'model', 'یادگیری': 'yadgiri', 'ماشین': 'mashin', 'شبکه': 'shabake', 'عصبی': 'asabi',
+    'ریاضی': 'riazi', 'آمار': 'amar', 'احتمال': 'ehtemal', 'معادله': 'moadele', 'معادلات': 'moadelat',
+    'تابع': 'tabe', 'مسئله': 'masale', 'مسائل': 'masael', 'طراحی': 'tarahi', 'سیستم': 'system',
+    'برنامه': 'barname', 'نویسی': 'nevisi', 'الگوریتم': 'algoritm', 'جدید': 'jadid', 'کاربرد': 'karbord',
+}
+
+_WORD = re.compile(r'[؀-ۿ‌]+')
+_LETTER_GROUPS = re.compile('|'.join(sorted(DIGRAPHS, key=len, reverse=True)) + '|.', re.DOTALL)
+_LETTER_TABLE = str.maketrans(LETTERS)
+
+class Transliterator:
+    """Spells Persian text with Latin letters, for short ASCII slugs.
+
+    Words in the override dictionary (COMMON_WORDS plus the overrides given)
+    are replaced as a whole; other words are spelled through DIGRAPHS and
+    LETTERS, with a word-final 'ه' read as 'e' and a word-initial 'ع' as
+    'a'. Non-Persian text is left
+    alone. Every word is spelled once per Transliterator: share one instance
+    for a whole run to reuse its memo.
+    """
+
+    def __init__(self, overrides: Optional[Dict[str, str]] = None):
+        self.words = {**COMMON_WORDS, **(overrides or {})}
+        self.memo: Dict[str, str] = {}
+
+    def __call__(self, text: str) -> str:
+        if text.isascii():
+            return text
+        return _WORD.sub(lambda m: self.word(m.group(0)), text)
+
+    def word(self, word: str) -> str:
+        latin = self.memo.get(word)
+        if latin is None:
+            latin = self.memo[word] = self._spell(word)
+        return latin
+
+    def _spell(self, word: str) -> str:
+        if word in self.words:
+            return self.words[word]
+        # Parts joined by ZWNJ (کتاب‌ها) are spelled separately
+        if '‌' in word:
+            return '-'.join(self.word(part) for part in word.split('‌') if part)
+        final_e = len(word) > 1 and word.endswith('ه')
+        if final_e:
+            word = word[:-1]
+        # A word-initial 'ع' carries the vowel: عملی -> amali
+        initial = 'a' if word.startswith('ع') else ''
+        latin = initial + ''.join(DIGRAPHS.get(group) or group.translate(_LETTER_TABLE)
+                        for group in _LETTER_GROUPS.findall(word))
+        return latin + 'e' if final_e else latin
+
+_default: Optional[Transliterator] = None
+
+def transliterate(text: str) -> str:
+    """Transliterates with the built-in word list, memoized for the whole process."""
+    global _default
+    if _default is None:
+        _default = Transliterator()
+    return _default(text)
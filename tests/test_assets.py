@@ -0,0 +1,48 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.assets import AssetCopier
+
+def test_asset_copy_skips_unchanged():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "src" / "book.pdf"
+        source.parent.mkdir()
+        source.write_bytes(b"%PDF-1.4 sample" * 100)
+        output_root = tmp / "out"
+        target = output_root / "book" / "book.pdf"
+
+        first_copier = AssetCopier(output_root)
+        first = first_copier.copy(source, target)
+        assert target.read_bytes() == source.read_bytes()
+        assert first_copier.stats["skipped"] == 0
+
+        previous = {"book/book.pdf": first}
+        copier = AssetCopier(output_root, previous)
+        second = copier.copy(source, target)
+        assert second["hash"] == first["hash"]
+        assert copier.stats["skipped"] == 1
+
+def test_asset_copy_detects_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = tmp / "figure.png"
+        source.write_bytes(b"old")
+        output_root = tmp / "out"
+        target = output_root / "figure.png"
+
+        first = AssetCopier(output_root, allow_links=False).copy(source, target)
+        source.write_bytes(b"new!")
+        copier = AssetCopier(output_root, {"figure.png": first}, allow_links=False)
+        copier.copy(source, target)
+        assert copier.stats["copied"] == 1
+        assert target.read_bytes() == b"new!"
+
+if __name__ == "__main__":
+    test_asset_copy_skips_unchanged()
+    test_asset_copy_detects_changes()
+    print("Asset copy tests passed.")
@@ -0,0 +1,70 @@
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+import cli
+
+MAIN_TEX = Path(__file__).parent / 'fixtures' / 'sample_book' / 'main.tex'
+
+def test_cli_does_not_import_core_or_gui():
+    code = (
+        "import sys; sys.argv = ['latex2astro', '--help']; import cli; "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('core', 'gui', 'customtkinter', 'pypandoc', 'PIL')))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=Path(cli.__file__).parent)
+    assert result.stdout.strip() == "[]"
+
+def test_core_defers_heavy_imports():
+    # pypandoc and Pillow are loaded by the stages that use them, not on import
+    code = (
+        "import core.orchestrator, core.converter; import sys; "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('pypandoc', 'PIL')))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=Path(cli.__file__).parent)
+    assert result.stdout.strip() == "[]"
+
+def test_cli_convert_plan_and_clean():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_root = Path(tmp)
+        metadata = output_root / "meta.yaml"
+        metadata.write_text("slug: practical-guide\ntags: [test, parser]\n", encoding="utf-8")
+        args = [str(MAIN_TEX), "-o", str(output_root), "--metadata", str(metadata)]
+
+        assert cli.main(["plan", *args, "--check"]) == cli.EXIT_CHANGES
+        assert cli.main(["convert", *args, "--title", "Guide"]) == cli.EXIT_OK
+        index = output_root / "src" / "content" / "books" / "fa" / "practical-guide" / "index.md"
+        assert 'title: "Guide"' in index.read_text(encoding="utf-8")
+        assert cli.main(["plan", *args, "--title", "Guide", "--check"]) == cli.EXIT_OK
+        # Without the title override the overview page would be rewritten
+        assert cli.main(["plan", *args, "--check"]) == cli.EXIT_CHANGES
+
+        assert cli.main(["clean", "-o", str(output_root)]) == cli.EXIT_OK
+        assert not index.exists()
+        assert not (output_root / "manifests").exists()
+
+def test_cli_ascii_slugs():
+    with tempfile.TemporaryDirectory() as tmp:
+        assert cli.main(["convert", str(MAIN_TEX), "-o", tmp, "--ascii-slugs"]) == cli.EXIT_OK
+        book_dir = Path(tmp) / "src" / "content" / "books" / "fa" / "rahnamaye-amali-nosazi"
+        assert sorted(p.name for p in book_dir.glob("ch*.md")) == ["ch01-moghadame.md", "ch02-fasl-dovom.md"]
+
+def test_cli_usage_errors():
+    with tempfile.TemporaryDirectory() as tmp:
+        bad_metadata = Path(tmp) / "meta.yaml"
+        bad_metadata.write_text("titel: typo\n", encoding="utf-8")
+        assert cli.main(["analyze", str(Path(tmp) / "missing.tex")]) == cli.EXIT_USAGE
+        assert cli.main(["convert", str(MAIN_TEX), "-o", tmp, "--metadata", str(bad_metadata)]) == cli.EXIT_USAGE
+
+if __name__ == "__main__":
+    test_cli_does_not_import_core_or_gui()
+    test_core_defers_heavy_imports()
+    test_cli_convert_plan_and_clean()
+    test_cli_ascii_slugs()
+    test_cli_usage_errors()
+    print("CLI tests passed.")
@@ -0,0 +1,92 @@
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from PIL import Image
+from core.cache import cache_dir
+from core.orchestrator import ConversionOrchestrator
+from core.placeholders import PlaceholderGenerator
+
+def _book_with_figures(tmp: Path) -> Path:
+    project = tmp / "book"
+    shutil.copytree(Path(__file__).parent / 'fixtures' / 'sample_book', project)
+    for folder, color in (("a", "red"), ("b", "blue")):
+        (project / "images" / folder).mkdir(parents=True)
+        Image.new("RGB", (64, 32), color).save(project / "images" / folder / "plot.png")
+    main_tex = project / "main.tex"
+    text = main_tex.read_text(encoding="utf-8")
+    text = text.replace("محتوای مقدمه در اینجا قرار می‌گیرد.", "\\includegraphics{a/plot}")
+    text = text.replace("این فصل دوم است.", "\\includegraphics[width=5cm]{b/plot}")
+    main_tex.write_text(text, encoding="utf-8")
+    return main_tex
+
+def test_figures_with_the_same_name_get_their_own_outputs():
+    with tempfile.TemporaryDirectory() as tmp:
+        main_tex = _book_with_figures(Path(tmp))
+        output_root = Path(tmp) / "out"
+        orchestrator = ConversionOrchestrator(main_tex, output_root)
+        orchestrator.run()
+
+        first, second = (ch.images[0] for ch in orchestrator.book.chapters)
+        assert (first.output_name, second.output_name) == ("a/plot.png", "b/plot.png")
+        assert first.output_path.read_bytes() == first.original_path.read_bytes()
+        assert second.output_path.read_bytes() == second.original_path.read_bytes()
+        assert first.output_path.read_bytes() != second.output_path.read_bytes()
+        pages = [(orchestrator.content_dir / ch.filename).read_text(encoding="utf-8") for ch in orchestrator.book.chapters]
+        url = "/images/books/" + orchestrator.book.metadata.slug
+        assert f"{url}/a/plot.png" in pages[0] and f"{url}/b/plot.png" in pages[1]
+
+def test_figures_get_cached_placeholders():
+    with tempfile.TemporaryDirectory() as tmp:
+        main_tex = _book_with_figures(Path(tmp))
+        output_root = Path(tmp) / "out"
+        orchestrator = ConversionOrchestrator(main_tex, output_root)
+        orchestrator.run()
+
+        manifest = json.loads(orchestrator.manifest.path.read_text(encoding="utf-8"))
+        images = [entry for entry in manifest["files"] if entry["type"] == "image"]
+        assert len(images) == 2
+        for entry in images:
+            assert (entry["width"], entry["height"]) == (64, 32)
+            assert entry["lqip"].startswith("data:image/")
+        cached = json.loads((cache_dir(output_root) / "placeholders.json").read_text(encoding="utf-8"))
+        assert {entry["hash"] for entry in images} <= cached.keys()
+
+        # Unchanged figures are neither copied nor decoded again
+        def no_decoding(self, path):
+            raise AssertionError("cached placeholders must not be regenerated")
+        original, PlaceholderGenerator._generate = PlaceholderGenerator._generate, no_decoding
+        try:
+            rerun = ConversionOrchestrator(main_tex, output_root)
+            rerun.run()
+        finally:
+            PlaceholderGenerator._generate = original
+        assert rerun.copier.stats["skipped"] == 2
+
+def test_publishing_the_site_leaves_the_caches_out():
+    with tempfile.TemporaryDirectory() as tmp:
+        main_tex = _book_with_figures(Path(tmp))
+        output_root = Path(tmp) / "out"
+        ConversionOrchestrator(main_tex, output_root).run()
+        assert (cache_dir(output_root) / "placeholders.json").exists()
+        assert any((cache_dir(output_root) / "conversions").rglob("*.json"))
+
+        # What the wizard's publish stage does with the output root
+        subprocess.run(["git", "init", "-q"], cwd=output_root, check=True)
+        subprocess.run(["git", "add", "-A"], cwd=output_root, check=True)
+        staged = subprocess.run(["git", "diff", "--cached", "--name-only", "-z"], cwd=output_root,
+                                check=True, capture_output=True, text=True).stdout.split("\0")
+        assert any(path.endswith("index.md") for path in staged)
+        assert not [path for path in staged if path.startswith(".latex2astro")]
+
+if __name__ == "__main__":
+    test_figures_with_the_same_name_get_their_own_outputs()
+    test_figures_get_cached_placeholders()
+    test_publishing_the_site_leaves_the_caches_out()
+    print("Image tests passed.")
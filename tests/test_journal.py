@@ -0,0 +1,56 @@
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.cache import cache_dir
+from core.orchestrator import ConversionOrchestrator
+
+def test_interrupted_run_resumes_from_journal():
+    main_tex = Path(__file__).parent / 'fixtures' / 'sample_book' / 'main.tex'
+    with tempfile.TemporaryDirectory() as tmp:
+        output_root = Path(tmp)
+
+        # Simulate a crash after every file was written but before the manifest was saved
+        crashed = ConversionOrchestrator(main_tex, output_root)
+        def crash(*args):
+            raise RuntimeError("power cut")
+        crashed._save_manifest = crash
+        try:
+            crashed.run()
+            assert False, "expected the simulated crash"
+        except RuntimeError:
+            pass
+        journal_path = cache_dir(output_root) / "journals" / "books" / "fa" / f"{crashed.book.metadata.slug}.jsonl"
+        assert journal_path.exists() and not crashed.manifest.path.exists()
+        # Another book in the same output root does not pick up this book's journal
+        other = ConversionOrchestrator(main_tex, output_root)
+        other.parse().metadata.slug = "another-book"
+        other.prepare()
+        assert not other.resumed and not other.previous
+
+        # A torn final line is ignored
+        with open(journal_path, "a", encoding="utf-8") as f:
+            f.write('{"unit": "file", "tar')
+
+        # One page was partially rewritten by hand: only that page is redone
+        pages = crashed.content_dir
+        chapter = next(pages.glob("ch01-*.md"))
+        chapter.write_text("truncated", encoding="utf-8")
+
+        resumed = ConversionOrchestrator(main_tex, output_root)
+        resumed.run()
+        assert resumed.resumed
+        assert resumed.writer.stats["written"] == 2  # the damaged chapter and the manifest
+        assert chapter.read_text(encoding="utf-8").startswith("---")
+        assert not journal_path.exists()
+
+        fresh = ConversionOrchestrator(main_tex, output_root)
+        fresh.prepare()
+        assert not fresh.resumed
+
+if __name__ == "__main__":
+    test_interrupted_run_resumes_from_journal()
+    print("Journal tests passed.")
@@ -0,0 +1,99 @@
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.library import LibraryRunner
+from core.orchestrator import ConversionOrchestrator
+
+def test_library_converts_books_with_shared_pool():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        library = tmp / "library"
+        shutil.copytree(fixture, library / "first")
+        shutil.copytree(fixture, library / "second")
+        # Same title as the first book: it must not overwrite the first book's folder
+        shutil.copytree(fixture, library / "third")
+        second_main = library / "second" / "main.tex"
+        second_main.write_text(second_main.read_text(encoding="utf-8").replace("راهنمای عملی نوسازی", "کتاب دوم"),
+                               encoding="utf-8")
+        (library / "broken").mkdir()
+        (library / "broken" / "main.tex").write_text("\\title{Broken}", encoding="utf-8")
+        output_root = tmp / "out"
+
+        projects = LibraryRunner.discover(library)
+        assert [p.parent.name for p in projects] == ["broken", "first", "second", "third"]
+
+        runner = LibraryRunner(projects, output_root, workers=4)
+        results = runner.run()
+        assert [r.status for r in results] == ["ok", "ok", "ok", "ok"]
+        assert results[2].slug == "کتاب-دوم"
+        assert results[3].slug == results[1].slug + "-2"
+        assert (output_root / "manifests" / "books" / "fa" / f"{results[1].slug}.json").exists()
+        assert (output_root / "src" / "content" / "books" / "fa" / "کتاب-دوم" / "index.md").exists()
+
+        library_manifest = json.loads((output_root / "library.json").read_text(encoding="utf-8"))
+        # Every book keeps its manifest where a single-book run would
+        assert [b["manifest"] for b in library_manifest["books"]] == [
+            f"manifests/books/fa/{r.slug}.json" for r in results
+        ]
+        assert "کتاب دوم" in (output_root / "library.md").read_text(encoding="utf-8")
+
+        # The second run hits the shared conversion cache and writes nothing
+        rerun = LibraryRunner(projects, output_root, workers=4)
+        rerun.run()
+        assert all(r.written == 0 for r in rerun.results)
+        assert rerun.cache.misses == 0
+
+def test_library_allocates_slugs_from_normalized_titles():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        shutil.copytree(fixture, tmp / "library" / "book")
+        main_tex = tmp / "library" / "book" / "main.tex"
+        main_tex.write_text(main_tex.read_text(encoding="utf-8").replace("راهنمای عملی نوسازی", "كتاب رياضي"),
+                            encoding="utf-8")
+
+        runner = LibraryRunner([main_tex], tmp / "out", workers=2, normalize=True)
+        results = runner.run()
+        assert results[0].status == "ok"
+        assert results[0].slug == "کتاب-ریاضی"
+
+def test_libraries_sharing_an_output_root_keep_each_others_pages():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # Two libraries with a project folder of the same name
+        for library, title in (("one", "کتاب یک"), ("two", "کتاب دو")):
+            shutil.copytree(fixture, tmp / library / "book1")
+            main_tex = tmp / library / "book1" / "main.tex"
+            main_tex.write_text(main_tex.read_text(encoding="utf-8").replace("راهنمای عملی نوسازی", title),
+                                encoding="utf-8")
+        output_root = tmp / "out"
+
+        first = LibraryRunner(LibraryRunner.discover(tmp / "one"), output_root, workers=2).run()
+        second = LibraryRunner(LibraryRunner.discover(tmp / "two"), output_root, workers=2).run()
+        assert first[0].manifest != second[0].manifest
+        LibraryRunner(LibraryRunner.discover(tmp / "one"), output_root, workers=2).run()
+        books = output_root / "src" / "content" / "books" / "fa"
+        assert (books / first[0].slug / "index.md").exists()
+        assert (books / second[0].slug / "index.md").exists()
+
+        # A manifest another project left at this book's path is not adopted: the book finds its own by project id
+        foreign = ConversionOrchestrator(tmp / "two" / "book1" / "main.tex", output_root)
+        foreign.parse()
+        foreign.book.metadata.slug = first[0].slug
+        foreign.prepare()
+        assert foreign.manifest.path.as_posix().endswith(first[0].manifest)
+        assert foreign.previous and all(f"/{second[0].slug}/" in target for target in foreign.previous)
+
+if __name__ == "__main__":
+    test_library_converts_books_with_shared_pool()
+    test_library_allocates_slugs_from_normalized_titles()
+    test_libraries_sharing_an_output_root_keep_each_others_pages()
+    print("Library tests passed.")
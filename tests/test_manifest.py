@@ -0,0 +1,106 @@
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.manifest import ManifestGenerator, MANIFEST_VERSION
+from core.orchestrator import ConversionOrchestrator
+
+def test_v1_manifest_is_upgraded():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_root = Path(tmp)
+        (output_root / "manifest.json").write_text(json.dumps({
+            "version": "1.0.0",
+            "timestamp": "2026-02-09T22:31:17",
+            "files": [{"type": "chapter", "source": "mixed", "target": "src\\content\\books\\fa\\ch01.md"}],
+            "metadata": {}
+        }), encoding="utf-8")
+
+        manifest = ManifestGenerator(output_root)
+        assert manifest.previous_data["version"] == MANIFEST_VERSION
+        assert "src/content/books/fa/ch01.md" in manifest.previous
+        assert manifest.previous["src/content/books/fa/ch01.md"]["sources"] == []
+
+def test_manifest_maps_chapters_to_sources():
+    main_tex = Path(__file__).parent / 'fixtures' / 'sample_book' / 'main.tex'
+    with tempfile.TemporaryDirectory() as tmp:
+        output_root = Path(tmp)
+        orchestrator = ConversionOrchestrator(main_tex, output_root)
+        orchestrator.run()
+
+        data = ManifestGenerator.load(orchestrator.manifest.path)
+        assert set(data["sources"]) == {"main.tex", "chapters/chap1.tex"}
+        assert "parse" in data["stages"]
+
+        chapters = [entry for entry in data["files"] if entry["type"] == "chapter"]
+        assert len(chapters) == 2
+        first_files = {span["file"] for span in chapters[0]["sources"]}
+        assert first_files == {"main.tex", "chapters/chap1.tex"}
+        for entry in chapters:
+            target = output_root / entry["target"]
+            assert entry["size"] == target.stat().st_size
+            assert entry["engine"] in ("pandoc", "fallback")
+
+def test_renamed_chapters_are_pruned():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        book_src = tmp / "book"
+        shutil.copytree(fixture, book_src)
+        output_root = tmp / "out"
+
+        first = ConversionOrchestrator(book_src / "main.tex", output_root)
+        first.run()
+        book_dir = output_root / "src" / "content" / "books" / "fa" / first.book.metadata.slug
+        old_chapter = first.book.chapters[1].filename
+
+        main_tex = book_src / "main.tex"
+        main_tex.write_text(main_tex.read_text(encoding="utf-8").replace("فصل دوم", "فصل تازه"), encoding="utf-8")
+        second = ConversionOrchestrator(main_tex, output_root)
+        second.run()
+
+        assert not (book_dir / old_chapter).exists()
+        assert (book_dir / second.book.chapters[1].filename).exists()
+        assert second.pruned == [(book_dir / old_chapter).relative_to(output_root).as_posix()]
+
+def test_books_sharing_an_output_root_keep_their_outputs():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        shutil.copytree(fixture, tmp / "a")
+        shutil.copytree(fixture, tmp / "b")
+        output_root = tmp / "out"
+
+        book_a = ConversionOrchestrator(tmp / "a" / "main.tex", output_root)
+        book_a.parse().metadata.slug = "book-a"
+        book_a.run()
+        book_b = ConversionOrchestrator(tmp / "b" / "main.tex", output_root)
+        book_b.parse().metadata.slug = "book-b"
+        book_b.run()
+
+        assert book_b.pruned == []
+        assert (book_a.content_dir / "index.md").exists()
+        assert book_a.manifest.path == output_root / "manifests" / "books" / "fa" / "book-a.json"
+        assert book_b.manifest.path == output_root / "manifests" / "books" / "fa" / "book-b.json"
+        # A dry run of one book does not report the other book's files
+        plan_b = ConversionOrchestrator(tmp / "b" / "main.tex", output_root)
+        plan_b.parse().metadata.slug = "book-b"
+        assert {c["status"] for c in plan_b.plan_changes()} == {"unchanged"}
+
+        # A new slug moves the book: its old folder is pruned and its old manifest removed
+        moved = ConversionOrchestrator(tmp / "a" / "main.tex", output_root)
+        moved.parse().metadata.slug = "book-a-moved"
+        moved.run()
+        assert not book_a.content_dir.exists() and not book_a.manifest.path.exists()
+        assert (moved.content_dir / "index.md").exists() and (book_b.content_dir / "index.md").exists()
+
+if __name__ == "__main__":
+    test_v1_manifest_is_upgraded()
+    test_manifest_maps_chapters_to_sources()
+    test_renamed_chapters_are_pruned()
+    test_books_sharing_an_output_root_keep_their_outputs()
+    print("Manifest tests passed.")
@@ -0,0 +1,45 @@
+import pickle
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from models.book import Chapter, LabelInfo, LabelRegistry
+
+def test_label_registry_behaves_like_a_dict():
+    registry = LabelRegistry()
+    for i in range(1000):
+        registry[f"eq:{i}"] = LabelInfo(label_type="unknown", number="0", title=f"eq:{i}")
+    registry["ch:intro"] = LabelInfo("chapter", "1")
+
+    assert len(registry) == 1001 and "eq:7" in registry and "eq:x" not in registry
+    assert registry.get("eq:x") is None
+    assert list(registry)[:2] == ["eq:0", "eq:1"]
+
+    # Fields of a looked-up label write through to the registry
+    label = registry["eq:7"]
+    label.file = "ch02-methods.md"
+    label.label_type = "equation"
+    assert registry["eq:7"] == LabelInfo("equation", "0", "eq:7", "ch02-methods.md")
+    assert registry["eq:8"].file == ""
+
+    # Types and files are interned: two codes for a thousand equations
+    assert len(registry.to_columns()["keys"]) == 1001
+    assert registry._type_names == ["unknown", "chapter", "equation"]
+
+    restored = pickle.loads(pickle.dumps(registry))
+    assert restored["eq:7"].file == "ch02-methods.md" and restored["ch:intro"].label_type == "chapter"
+    assert LabelRegistry.from_columns(registry.to_columns()) == registry
+
+    del registry["eq:0"]
+    assert registry["eq:7"].title == "eq:7" and len(registry) == 1000
+
+def test_models_are_slotted():
+    chapter = Chapter(number=1, title="t", slug="t", filename="t.md")
+    assert not hasattr(chapter, "__dict__")
+
+if __name__ == "__main__":
+    test_label_registry_behaves_like_a_dict()
+    test_models_are_slotted()
+    print("Model tests passed.")
@@ -0,0 +1,64 @@
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.normalize import PersianNormalizer
+from core.orchestrator import ConversionOrchestrator
+
+def test_normalizer_maps_characters_and_fixes_zwnj():
+    normalizer = PersianNormalizer()
+    assert normalizer.normalize("كتاب ها و يك ٣") == ("کتاب\u200cها و یک ۳", 5)
+    assert normalizer.normalize("\\section{نمی دانم} مـاه") == ("\\section{نمی\u200cدانم} ماه", 2)
+    assert normalizer.normalize("خانه\u200c\u200cها \u200cدیگر") == ("خانه\u200cها دیگر", 2)
+    assert normalizer.normalize("$x^2$ \\ref{eq:1}") == ("$x^2$ \\ref{eq:1}", 0)
+    # File names on disk keep their Arabic forms
+    latex = "\\includegraphics[width=5cm]{شكل-يك} \\input{فصل-يك} شكل"
+    assert normalizer.normalize_latex(latex) == ("\\includegraphics[width=5cm]{شكل-يك} \\input{فصل-يك} شکل", 1)
+    # Normalized text is a fixed point
+    text, _ = normalizer.normalize("كتاب ها را مي خوانم")
+    assert normalizer.normalize(text) == (text, 0)
+
+def test_orchestrator_normalizes_before_planning():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "book"
+        shutil.copytree(fixture, project)
+        clean = ConversionOrchestrator(project / "main.tex", Path(tmp) / "out", normalize=True)
+        clean.prepare()
+
+        # The same sources typed with Arabic ye and kaf
+        for path in project.rglob("*.tex"):
+            text = path.read_text(encoding="utf-8")
+            path.write_text(text.replace("ی", "ي").replace("ک", "ك"), encoding="utf-8")
+        mixed = ConversionOrchestrator(project / "main.tex", Path(tmp) / "out", normalize=True)
+        mixed.prepare()
+
+        assert mixed.normalized > 0
+        assert mixed.book.metadata.slug == clean.book.metadata.slug
+        for a, b in zip(mixed.book.chapters, clean.book.chapters):
+            assert a.filename == b.filename
+            assert mixed.converter.cache_key(a.content_latex) == clean.converter.cache_key(b.content_latex)
+
+def test_plan_after_normalized_conversion_is_unchanged():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "book"
+        shutil.copytree(fixture, project)
+        for path in project.rglob("*.tex"):
+            text = path.read_text(encoding="utf-8")
+            path.write_text(text.replace("ی", "ي").replace("ک", "ك"), encoding="utf-8")
+        output_root = Path(tmp) / "out"
+
+        ConversionOrchestrator(project / "main.tex", output_root, normalize=True).run()
+        changes = ConversionOrchestrator(project / "main.tex", output_root, normalize=True).plan_changes()
+        assert {c["status"] for c in changes} == {"unchanged"}
+
+if __name__ == "__main__":
+    test_normalizer_maps_characters_and_fixes_zwnj()
+    test_orchestrator_normalizes_before_planning()
+    test_plan_after_normalized_conversion_is_unchanged()
+    print("Normalize tests passed.")
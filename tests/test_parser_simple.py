@@ -25,5 +25,71 @@ def test_parser():
     for lbl in book.label_registry:
         print(f"  Label: {lbl}")
 
+def test_parser_streams_results():
+    main_tex = Path(__file__).parent / 'fixtures' / 'sample_book' / 'main.tex'
+    events = []
+    LatexParser(main_tex).parse(listener=lambda kind, value: events.append((kind, value)))
+
+    kinds = [kind for kind, _ in events]
+    # Metadata arrives before the included chapter file is read
+    assert kinds.index("metadata") < kinds.index("file", 1)
+    assert dict(events)["metadata"].title == "راهنمای عملی نوسازی"
+    assert [value for kind, value in events if kind == "file"] == ["main.tex", "chapters/chap1.tex"]
+    assert [value.title for kind, value in events if kind == "chapter"] == ["مقدمه", "فصل دوم"]
+
+def test_scan_metadata_reads_only_front_matter():
+    import shutil
+    import tempfile
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "book"
+        shutil.copytree(fixture, project)
+        main_tex = project / "main.tex"
+
+        parser = LatexParser(main_tex)
+        metadata = parser.scan_metadata()
+        assert metadata.title == "راهنمای عملی نوسازی"
+        assert metadata.tags == ["تست، پارسر، لاتک"]
+        assert "کتاب آزمایشی" in metadata.description
+        # The included chapter file is never read
+        assert list(parser.processed_files) == [main_tex]
+
+        # After a full parse, unchanged sources reuse its metadata; an edit invalidates it
+        full = LatexParser(main_tex).parse()
+        full.metadata.title = "edited in the wizard"
+        assert LatexParser(main_tex).scan_metadata().title == "راهنمای عملی نوسازی"
+        main_tex.write_text(main_tex.read_text(encoding="utf-8").replace("راهنمای عملی نوسازی", "عنوان تازه"),
+                            encoding="utf-8")
+        assert LatexParser(main_tex).scan_metadata().title == "عنوان تازه"
+
+def test_scan_metadata_stops_before_the_body_of_an_article():
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp)
+        main_tex = project / "main.tex"
+        main_tex.write_text(
+            "\\documentclass{article}\n\\input{meta}\n\\title{مقاله آزمایشی}\n"
+            "\\begin{document}\n\\maketitle\n"
+            "\\begin{abstract}\nچکیده مقاله.\n\\end{abstract}\n\\keywords{الف, ب}\n"
+            "\\input{body}\n\\end{document}\n", encoding="utf-8")
+        (project / "meta.tex").write_text("\\author{نویسنده}\n", encoding="utf-8")
+        # Articles have no \chapter: the body is one large file of sections
+        (project / "body.tex").write_text("\\section{روش}\nمتن بدنه.\n" * 20000, encoding="utf-8")
+
+        read = []
+        original = LatexParser._read_text
+        LatexParser._read_text = staticmethod(lambda path: read.append(path.name) or original(path))
+        try:
+            metadata = LatexParser(main_tex).scan_metadata()
+        finally:
+            LatexParser._read_text = staticmethod(original)
+        assert (metadata.title, metadata.author) == ("مقاله آزمایشی", "نویسنده")
+        assert metadata.description == "چکیده مقاله."
+        assert metadata.tags == ["الف", "ب"]
+        assert read == ["main.tex", "meta.tex"]
+
 if __name__ == "__main__":
     test_parser()
+    test_parser_streams_results()
+    test_scan_metadata_reads_only_front_matter()
+    test_scan_metadata_stops_before_the_body_of_an_article()
@@ -0,0 +1,72 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.pipeline import StagePipeline
+from core.orchestrator import ConversionOrchestrator
+
+def test_stages_run_after_their_dependencies():
+    order = []
+    pipeline = StagePipeline()
+    pipeline.add("convert:a", lambda: (time.sleep(0.05), order.append("convert:a")))
+    pipeline.add("convert:b", lambda: order.append("convert:b"))
+    pipeline.add("write:a", lambda: order.append("write:a"), ["convert:a"])
+    pipeline.add("write:b", lambda: order.append("write:b"), ["convert:b"])
+    pipeline.add("manifest", lambda: order.append("manifest"), ["write:a", "write:b"])
+    pipeline.run(workers=4)
+
+    # write:b does not wait for the slow convert:a
+    assert order.index("write:b") < order.index("convert:a")
+    assert order[-1] == "manifest"
+    assert [s.name for s in pipeline.critical_path()] == ["convert:a", "write:a", "manifest"]
+    assert set(pipeline.timings()) == {"convert", "write", "manifest", "wall"}
+
+def test_failed_stage_skips_only_its_dependents():
+    def fail():
+        raise RuntimeError("pandoc crashed")
+
+    pipeline = StagePipeline()
+    pipeline.add("a/convert", fail)
+    pipeline.add("a/write", lambda: None, ["a/convert"])
+    pipeline.add("b/write", lambda: "ok")
+    pipeline.run()
+    assert pipeline.stages["a/write"].status == "skipped"
+    assert pipeline.stages["b/write"].result == "ok"
+    assert [s.name for s in pipeline.failures("a/")] == ["a/convert"]
+    pipeline.raise_failures("b/")
+    try:
+        pipeline.raise_failures("a/")
+        assert False, "expected the stage error"
+    except RuntimeError as e:
+        assert "pandoc" in str(e)
+
+    cyclic = StagePipeline()
+    cyclic.add("x", lambda: None, ["y"])
+    cyclic.add("y", lambda: None, ["x"])
+    try:
+        cyclic.run()
+        assert False, "expected a cycle error"
+    except ValueError:
+        pass
+
+def test_orchestrator_reports_critical_path():
+    main_tex = Path(__file__).parent / 'fixtures' / 'sample_book' / 'main.tex'
+    with tempfile.TemporaryDirectory() as tmp:
+        published = []
+        orchestrator = ConversionOrchestrator(main_tex, Path(tmp))
+        orchestrator.run(publish=lambda: published.append(True))
+        assert published == [True]
+        names = [name for name, _ in orchestrator.critical_path]
+        assert names[-2:] == ["manifest", "git"]
+        assert names[0].startswith(("convert:", "write:", "image:", "pdf"))
+        assert orchestrator.timings["convert"] >= 0 and "wall" in orchestrator.timings
+
+if __name__ == "__main__":
+    test_stages_run_after_their_dependencies()
+    test_failed_stage_skips_only_its_dependents()
+    test_orchestrator_reports_critical_path()
+    print("Pipeline tests passed.")
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.orchestrator import ConversionOrchestrator
+from core.pipeline import StagePipeline
+from core.progress import CancellationToken, ConversionCancelled
+
+def test_progress_events_cover_stages_chapters_and_files():
+    main_tex = Path(__file__).parent / 'fixtures' / 'sample_book' / 'main.tex'
+    with tempfile.TemporaryDirectory() as tmp:
+        events = []
+        ConversionOrchestrator(main_tex, Path(tmp), progress=events.append).run()
+        kinds = {e.kind for e in events}
+        assert {"stage_started", "stage_finished", "chapter_converted", "file_written"} <= kinds
+        chapters = [e for e in events if e.kind == "chapter_converted"]
+        assert sorted(e.current for e in chapters) == [1, 2] and all(e.total == 2 for e in chapters)
+        written = [e for e in events if e.kind == "file_written"]
+        assert written[-1].bytes > 0
+
+def test_cancel_stops_pipeline_and_kills_processes():
+    token = CancellationToken()
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    started = time.perf_counter()
+
+    def slow_stage():
+        with token.track(process):
+            process.wait()
+        token.check()
+
+    pipeline = StagePipeline()
+    pipeline.add("convert:slow", slow_stage)
+    pipeline.add("write:slow", lambda: None, ["convert:slow"])
+    pipeline.add("cancel", token.cancel)
+    pipeline.run(workers=2, token=token)
+
+    assert time.perf_counter() - started < 10
+    assert process.returncode is not None
+    assert pipeline.stages["convert:slow"].status == "cancelled"
+    assert pipeline.stages["write:slow"].status in ("cancelled", "skipped")
+    try:
+        pipeline.raise_failures()
+        assert False, "expected ConversionCancelled"
+    except ConversionCancelled:
+        pass
+
+if __name__ == "__main__":
+    test_progress_events_cover_stages_chapters_and_files()
+    test_cancel_stops_pipeline_and_kills_processes()
+    print("Progress tests passed.")
@@ -0,0 +1,44 @@
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from utils.slugify import SlugAllocator, slugify
+from utils.transliterate import Transliterator
+
+def test_slugify():
+    assert slugify("فصل دوم: روش‌ها") == "فصل-دوم-روش-ها"
+    assert slugify("  Hello World_Test!  ") == "hello-world-test"
+    assert slugify("") == ""
+    assert len(slugify("x" * 80)) == 50
+
+def test_slug_allocator_suffixes_duplicates():
+    slugs = SlugAllocator()
+    assert slugs.allocate_all(["Intro", "Methods", "Intro", "intro", "Intro 2"]) == [
+        "intro", "methods", "intro-2", "intro-3", "intro-2-2"
+    ]
+    # Explicit slugs go through claim(); empty titles fall back
+    assert slugs.claim("methods") == "methods-2"
+    assert slugs.allocate("?!", fallback="chapter") == "chapter"
+
+    # Suffixed slugs still respect the length limit
+    long = SlugAllocator(max_length=10)
+    assert long.allocate_all(["abcdefghij", "abcdefghij"]) == ["abcdefghij", "abcdefgh-2"]
+
+def test_transliterated_slugs():
+    assert slugify("راهنمای عملی نوسازی", transliterate=True) == "rahnamaye-amali-nosazi"
+    assert slugify("خواب و خیال ۲", transliterate=True) == "khab-va-khyal-2"
+    assert slugify("کتاب‌ها Deep Learning", transliterate=True) == "ketab-ha-deep-learning"
+
+    # Overrides win over the built-in spelling, and each word is spelled once
+    transliterator = Transliterator({"خیال": "khiyal"})
+    slugs = SlugAllocator(transliterator=transliterator)
+    assert slugs.allocate_all(["خواب و خیال", "خواب و خیال"]) == ["khab-va-khiyal", "khab-va-khiyal-2"]
+    assert set(transliterator.memo) == {"خواب", "و", "خیال"}
+
+if __name__ == "__main__":
+    test_slugify()
+    test_slug_allocator_suffixes_duplicates()
+    test_transliterated_slugs()
+    print("Slugify tests passed.")
@@ -0,0 +1,43 @@
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.parser import LatexParser
+from core.snapshot import BookSnapshot
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'sample_book'
+
+def test_snapshot_resumes_review_state():
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "book"
+        shutil.copytree(FIXTURE, project)
+        main_tex = project / "main.tex"
+
+        book = LatexParser(main_tex).parse()
+        book.chapters.reverse()
+        book.chapters[0].is_draft = True
+        book.metadata.title = "edited in the wizard"
+        snapshot = BookSnapshot(main_tex)
+        assert snapshot.save(book)
+        # Chapters are stored as ranges of the source, not as text
+        assert book.chapters[1].content_latex.strip()[:40] not in snapshot.path.read_text(encoding="utf-8")
+
+        resumed = snapshot.load()
+        assert resumed.metadata.title == "edited in the wizard"
+        assert [ch.title for ch in resumed.chapters] == [ch.title for ch in book.chapters]
+        assert [ch.is_draft for ch in resumed.chapters] == [True, False]
+        assert [ch.content_latex for ch in resumed.chapters] == [ch.content_latex for ch in book.chapters]
+        assert resumed.label_registry.keys() == book.label_registry.keys()
+
+        # Editing any file of the include graph invalidates the snapshot
+        chapter_file = project / "chapters" / "chap1.tex"
+        chapter_file.write_text(chapter_file.read_text(encoding="utf-8") + "\n% edit\n", encoding="utf-8")
+        assert snapshot.load() is None
+
+if __name__ == "__main__":
+    test_snapshot_resumes_review_state()
+    print("Snapshot tests passed.")
@@ -0,0 +1,94 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.progress import ProgressEvent
+from gui.tasks import BackgroundTask, ConversionRun
+
+def _poll_until_done(run, timeout: float = 5.0) -> list:
+    """Polls like the Tk after() loop does, collecting every event."""
+    events = []
+    deadline = time.monotonic() + timeout
+    while not run.done:
+        assert time.monotonic() < deadline, "worker did not finish"
+        events.extend(run.poll())
+        time.sleep(0.01)
+    return events
+
+def test_background_task_hands_over_events_then_its_outcome():
+    release = threading.Event()
+
+    def work(report):
+        report("first")
+        release.wait(5)
+        report("second")
+        return 42
+
+    task = BackgroundTask(work).start()
+    deadline = time.monotonic() + 5
+    events = []
+    while not events:
+        assert time.monotonic() < deadline
+        events = task.poll()
+    assert events == ["first"] and not task.finished
+    release.set()
+    while not task.finished:
+        assert time.monotonic() < deadline
+        events.extend(task.poll())
+    assert events == ["first", "second"]
+    assert (task.result, task.error) == (42, None)
+    assert task.poll() == []
+
+    failing = BackgroundTask(lambda report: 1 / 0).start()
+    while not failing.finished:
+        assert time.monotonic() < deadline
+        failing.poll()
+    assert isinstance(failing.error, ZeroDivisionError)
+
+def test_conversion_run_succeeds_and_fails():
+    def convert(progress, token):
+        progress(ProgressEvent("chapter_converted", current=1, total=1))
+        return "# Markdown", "pandoc"
+
+    run = ConversionRun(convert).start()
+    events = _poll_until_done(run)
+    assert [e.kind for e in events] == ["chapter_converted"]
+    assert run.state == ConversionRun.SUCCEEDED and run.error is None
+    assert run.result == ("# Markdown", "pandoc")
+    # A finished run cannot be cancelled any more
+    assert not run.cancel()
+
+    def broken(progress, token):
+        raise RuntimeError("pandoc exploded")
+
+    run = ConversionRun(broken).start()
+    _poll_until_done(run)
+    assert run.state == ConversionRun.FAILED
+    assert str(run.error) == "pandoc exploded"
+
+def test_cancelled_conversion_run_ends_cancelled():
+    started = threading.Event()
+
+    def convert(progress, token):
+        started.set()
+        while True:
+            token.check()
+            time.sleep(0.01)
+
+    run = ConversionRun(convert).start()
+    assert started.wait(5)
+    assert run.cancel()
+    assert run.state == ConversionRun.CANCELLING and run.token.cancelled
+    assert not run.cancel()
+    _poll_until_done(run)
+    assert run.state == ConversionRun.CANCELLED
+
+if __name__ == "__main__":
+    test_background_task_hands_over_events_then_its_outcome()
+    test_conversion_run_succeeds_and_fails()
+    test_cancelled_conversion_run_ends_cancelled()
+    print("Task tests passed.")
@@ -0,0 +1,64 @@
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.watch import WatchSession
+
+def test_watch_rebuilds_only_affected_chapters():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "book"
+        shutil.copytree(fixture, project)
+        main_tex = project / "main.tex"
+        text = main_tex.read_text(encoding="utf-8")
+        # The introduction references a label defined in the second chapter
+        text = text.replace("محتوای مقدمه در اینجا قرار می‌گیرد.", "محتوای مقدمه \\ref{sec:moving}.")
+        text = text.replace("این فصل دوم است.", "این فصل دوم است.\n\\section{متحرک}\n\\label{sec:moving}")
+        main_tex.write_text(text, encoding="utf-8")
+
+        session = WatchSession(main_tex, Path(tmp) / "out")
+        session.build()
+        assert not session.poll()
+        chapters = session.orchestrator.book.chapters
+        assert "../ch02-فصل-دوم/#sec:moving" in chapters[0].content_markdown
+
+        # Editing an included file only rebuilds the chapter that includes it
+        chap1 = project / "chapters" / "chap1.tex"
+        chap1.write_text(chap1.read_text(encoding="utf-8") + "\nیک خط تازه.\n", encoding="utf-8")
+        assert chap1 in session.poll()
+        assert [ch.filename for ch in session.rebuild()] == ["ch01-مقدمه.md"]
+
+        # Moving the label to a new chapter also rebuilds the chapter that references it
+        text = main_tex.read_text(encoding="utf-8")
+        text = text.replace("\\section{متحرک}\n\\label{sec:moving}", "")
+        text = text.replace("\\end{document}", "\\chapter{فصل سوم}\n\\label{sec:moving}\n\\end{document}")
+        main_tex.write_text(text, encoding="utf-8")
+        rebuilt = [ch.filename for ch in session.rebuild()]
+        assert rebuilt == ["ch01-مقدمه.md", "ch02-فصل-دوم.md", "ch03-فصل-سوم.md"]
+        intro = session.orchestrator.book.chapters[0]
+        assert "../ch03-فصل-سوم/#sec:moving" in intro.content_markdown
+
+def test_failed_rebuild_is_reported_as_a_warning():
+    main_tex = Path(__file__).parent / 'fixtures' / 'sample_book' / 'main.tex'
+    with tempfile.TemporaryDirectory() as tmp:
+        events = []
+        session = WatchSession(main_tex, Path(tmp) / "out", interval=0.01, debounce=0.01, progress=events.append)
+        session.build = lambda: None
+        changes = iter([{main_tex}])
+        session.poll = lambda: next(changes, set())
+
+        def rebuild():
+            session.stop()
+            raise RuntimeError("half-saved file")
+        session.rebuild = rebuild
+        session.run()
+        assert [(e.kind, e.stage, e.message) for e in events] == [("warning", "rebuild", "Rebuild failed: half-saved file")]
+
+if __name__ == "__main__":
+    test_watch_rebuilds_only_affected_chapters()
+    test_failed_rebuild_is_reported_as_a_warning()
+    print("Watch tests passed.")
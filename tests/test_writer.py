@@ -0,0 +1,171 @@
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.append(str(Path(__file__).parent.parent / 'src'))
+
+from core.writer import OutputWriter
+from core.orchestrator import ConversionOrchestrator
+from core import converter
+from core.converter import MarkdownConverter
+from core.parser import LatexParser
+
+def test_writer_skips_identical_content():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_root = Path(tmp)
+        path = output_root / "books" / "index.md"
+
+        writer = OutputWriter(output_root)
+        record = writer.write_text(path, "# عنوان\n")
+        assert writer.stats == {"written": 1, "skipped": 0}
+
+        mtime = path.stat().st_mtime_ns
+        writer = OutputWriter(output_root, {"books/index.md": record})
+        writer.write_text(path, "# عنوان\n")
+        assert writer.stats == {"written": 0, "skipped": 1}
+        assert path.stat().st_mtime_ns == mtime
+
+        writer.write_text(path, "# عنوان جدید\n")
+        assert writer.stats == {"written": 1, "skipped": 1}
+        assert path.read_text(encoding="utf-8") == "# عنوان جدید\n"
+        assert [p.name for p in path.parent.iterdir()] == ["index.md"]
+
+def test_unchanged_rebuild_writes_nothing():
+    main_tex = Path(__file__).parent / 'fixtures' / 'sample_book' / 'main.tex'
+    with tempfile.TemporaryDirectory() as tmp:
+        output_root = Path(tmp)
+        ConversionOrchestrator(main_tex, output_root).run()
+
+        orchestrator = ConversionOrchestrator(main_tex, output_root)
+        orchestrator.run()
+        assert orchestrator.writer.stats["written"] == 0
+        assert orchestrator.writer.stats["skipped"] > 0
+
+def test_pdf_is_planned_before_index_is_written():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        book_src = tmp / "book"
+        shutil.copytree(fixture, book_src)
+        (book_src / "draft.pdf").write_bytes(b"%PDF draft")
+        (book_src / "main.pdf").write_bytes(b"%PDF main")
+        output_root = tmp / "out"
+
+        ConversionOrchestrator(book_src / "main.tex", output_root).run()
+        orchestrator = ConversionOrchestrator(book_src / "main.tex", output_root)
+        orchestrator.run()
+
+        assert orchestrator.source_pdf == book_src / "main.pdf"
+        assert orchestrator.writer.stats["written"] == 0
+        assert orchestrator.copier.stats["skipped"] == 1
+        index = (orchestrator.content_dir / "index.md").read_text(encoding="utf-8")
+        assert f'pdfUrl: "{orchestrator.book.metadata.pdf_url}"' in index
+        assert (orchestrator.content_dir / "book.pdf").read_bytes() == b"%PDF main"
+
+def test_plan_changes_predicts_without_converting_or_writing():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "book"
+        shutil.copytree(fixture, project)
+        output_root = Path(tmp) / "out"
+        main_tex = project / "main.tex"
+
+        first = ConversionOrchestrator(main_tex, output_root).plan_changes()
+        assert {c["status"] for c in first} == {"create"}
+        assert not output_root.exists()
+
+        ConversionOrchestrator(main_tex, output_root).run()
+        snapshot = sorted((p, p.stat().st_mtime_ns) for p in output_root.rglob("*"))
+
+        unchanged = ConversionOrchestrator(main_tex, output_root)
+        assert {c["status"] for c in unchanged.plan_changes()} == {"unchanged"}
+        assert unchanged.cache.misses == 0
+
+        # Edit the second chapter: only its page changes, and nothing is converted to find out
+        main_tex.write_text(main_tex.read_text(encoding="utf-8").replace("این فصل دوم است.", "متن تازه."),
+                            encoding="utf-8")
+        def no_conversion(*args):
+            raise AssertionError("plan mode must not convert or start pandoc")
+        original, MarkdownConverter._convert = MarkdownConverter._convert, no_conversion
+        original_version, converter.pandoc_version = converter.pandoc_version, no_conversion
+        try:
+            changes = {c["target"].rsplit("/", 1)[-1]: c["status"]
+                       for c in ConversionOrchestrator(main_tex, output_root).plan_changes()}
+        finally:
+            MarkdownConverter._convert = original
+            converter.pandoc_version = original_version
+        assert changes["ch02-فصل-دوم.md"] == "update"
+        assert changes["ch01-مقدمه.md"] == "unchanged"
+        assert sorted((p, p.stat().st_mtime_ns) for p in output_root.rglob("*")) == snapshot
+
+def test_large_chapters_split_into_section_pages():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "book"
+        shutil.copytree(fixture, project)
+        chap1 = project / "chapters" / "chap1.tex"
+        chap1.write_text(chap1.read_text(encoding="utf-8") + "\\section{بخش \\emph{دوم}}\n\\label{sec:sub2}\nبه \\ref{sec:sub1} نگاه کنید.\n",
+                         encoding="utf-8")
+        main_tex = project / "main.tex"
+        main_tex.write_text(main_tex.read_text(encoding="utf-8").replace("این فصل دوم است.", "به \\ref{sec:sub2} نگاه کنید."),
+                            encoding="utf-8")
+        output_root = Path(tmp) / "out"
+
+        orchestrator = ConversionOrchestrator(main_tex, output_root, split_size=100)
+        orchestrator.run()
+        content_dir = orchestrator.content_dir
+        # The short second chapter stays whole; the first becomes an intro page plus one page per section
+        assert sorted(p.relative_to(content_dir).as_posix() for p in content_dir.rglob("*.md")) == [
+            "ch01-مقدمه.md", "ch01-مقدمه/01-بخش-اول-از-فصل-اول.md", "ch01-مقدمه/02-بخش-دوم.md",
+            "ch02-فصل-دوم.md", "index.md",
+        ]
+        intro = (content_dir / "ch01-مقدمه.md").read_text(encoding="utf-8")
+        assert "- [بخش دوم](./02-بخش-دوم/)" in intro and "این بخش در یک فایل جداگانه است" not in intro
+        section = (content_dir / "ch01-مقدمه" / "02-بخش-دوم.md").read_text(encoding="utf-8")
+        assert 'parent: "ch01-مقدمه"' in section
+        assert "(../../ch01-مقدمه/01-بخش-اول-از-فصل-اول/#sec:sub1)" in section
+        second = (content_dir / "ch02-فصل-دوم.md").read_text(encoding="utf-8")
+        assert "(../ch01-مقدمه/02-بخش-دوم/#sec:sub2)" in second
+        assert {c["status"] for c in ConversionOrchestrator(main_tex, output_root, split_size=100).plan_changes()} == {"unchanged"}
+        # Every page of the split chapter maps to its own lines
+        spans = {entry["target"].rsplit("/", 1)[-1]: entry["sources"]
+                 for entry in json.loads(orchestrator.manifest.path.read_text(encoding="utf-8"))["files"]}
+        assert {span["file"] for span in spans["ch01-مقدمه.md"]} == {"main.tex"}
+        assert spans["01-بخش-اول-از-فصل-اول.md"] == [{"file": "chapters/chap1.tex", "start_line": 1, "end_line": 3}]
+        # The last section runs on to the next \chapter, past the end of the included file
+        assert spans["02-بخش-دوم.md"] == [{"file": "chapters/chap1.tex", "start_line": 4, "end_line": 6},
+                                          {"file": "main.tex", "start_line": 23, "end_line": 24}]
+
+        # Without the option the chapter is written whole again and its section pages are pruned
+        ConversionOrchestrator(main_tex, output_root).run()
+        assert not (content_dir / "ch01-مقدمه").exists()
+
+def test_reordered_chapters_are_numbered_by_position():
+    fixture = Path(__file__).parent / 'fixtures' / 'sample_book'
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / "book"
+        shutil.copytree(fixture, project)
+        output_root = Path(tmp) / "out"
+        main_tex = project / "main.tex"
+
+        # What the review step does when the second chapter is moved up
+        book = LatexParser(main_tex).parse()
+        book.chapters.insert(0, book.chapters.pop(1))
+        orchestrator = ConversionOrchestrator(main_tex, output_root, book=book)
+        orchestrator.run()
+
+        content_dir = orchestrator.content_dir
+        assert sorted(p.name for p in content_dir.glob("ch*.md")) == ["ch01-فصل-دوم.md", "ch02-مقدمه.md"]
+        assert "chapterNumber: 1" in (content_dir / "ch01-فصل-دوم.md").read_text(encoding="utf-8")
+
+if __name__ == "__main__":
+    test_writer_skips_identical_content()
+    test_unchanged_rebuild_writes_nothing()
+    test_pdf_is_planned_before_index_is_written()
+    test_plan_changes_predicts_without_converting_or_writing()
+    test_large_chapters_split_into_section_pages()
+    test_reordered_chapters_are_numbered_by_position()
+    print("Writer tests passed.")